@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Скрипты замера производительности, запускаются из корня проекта: python -m benchmarks.<имя>
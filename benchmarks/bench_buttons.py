@@ -0,0 +1,127 @@
+"""
+Замер скорости разбора блока кнопок.
+
+Сравнивает ``parse_button_block`` с прежней реализацией ``parse_buttons``.
+Обе делят текст по строкам, ';' и '|'; текущая определяет вид поля по таблице
+ключевых слов вместо цепочки startswith и не создаёт промежуточных словарей.
+На блоках из 10, 200 и 2000 кнопок она быстрее в 1,1–1,2 раза: выигрыш
+небольшой, основное время уходит на создание кнопок и uuid для копирования.
+
+Запуск: python -m benchmarks.bench_buttons --buttons 2000 --repeat 20
+"""
+
+import re
+import uuid
+from argparse import ArgumentParser
+from random import Random
+from timeit import repeat
+
+from bot.utils.button_parser import parse_button_block
+
+# Шаблоны кнопок, встречающиеся в постах
+_TEMPLATES: tuple[str, ...] = (
+    "Заглушка {i} | void",
+    "Уведомление {i} | msg:Текст уведомления {i}",
+    "Закреп {i} | ntf:Сообщение {i}",
+    "Ссылка {i} | https://example.com/{i}",
+    "Копия {i} | copy:Текст для копирования {i}",
+    "Только для своих {i} | msg:Секрет {i} | 123,456,{i} | msg:Нет доступа",
+    "Инлайн {i} | inline:post_{i}",
+)
+
+
+def legacy_parse_buttons(text: str, post_id: str) -> list[list[dict]]:
+    """Прежняя реализация разбора кнопок, сохранённая для сравнения."""
+    rows: list[list[dict]] = []
+    button_index = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        btn_texts = [b.strip() for b in line.split(';') if b.strip()]
+        row: list[dict] = []
+        for raw in btn_texts:
+            parts = [p.strip() for p in raw.split('|')]
+            if len(parts) < 2:
+                raise ValueError(f"Неверный формат кнопки: '{raw}'")
+            btn = {"text": parts[0]}
+            primary_notification = None
+            primary_alert = False
+            allowed_ids = None
+            unauthorized_message = None
+            for part in parts[1:]:
+                if part == "void":
+                    btn["url"] = "http://void"
+                elif part.startswith("http") or part.startswith("tg://"):
+                    btn["url"] = part
+                elif part.startswith("msg:") and primary_notification is None:
+                    primary_notification = part.split(":", 1)[1]
+                    primary_alert = True
+                elif part.startswith(("ntf:", "notification:")) and primary_notification is None:
+                    primary_notification = part.split(":", 1)[1]
+                    primary_alert = False
+                elif re.fullmatch(r'\d+(?:\s*,\s*\d+)*', part):
+                    allowed_ids = [int(x.strip()) for x in part.split(",")]
+                elif part.startswith("msg:") and primary_notification is not None and allowed_ids is not None:
+                    unauthorized_message = part.split(":", 1)[1]
+                elif part.startswith("copy:"):
+                    btn["callback_data"] = f"copy_{uuid.uuid4().hex}"
+                    btn["copy_text"] = part.split(":", 1)[1]
+                elif part.startswith("inline:"):
+                    btn["switch_inline_query"] = part.split(":", 1)[1]
+                elif part.startswith("inline_current:"):
+                    btn["switch_inline_query_current_chat"] = part.split(":", 1)[1]
+                elif part.startswith("inline_chosen:"):
+                    btn["switch_inline_query_chosen_chat"] = part.split(":", 1)[1]
+                else:
+                    if "callback_data" not in btn and "url" not in btn:
+                        btn["callback_data"] = part
+            if primary_notification is not None:
+                btn["callback_data"] = f"bt_{post_id}_{button_index}"
+                button_index += 1
+                btn["notification"] = primary_notification
+                btn["show_alert"] = primary_alert
+            if allowed_ids is not None:
+                btn["allowed_ids"] = allowed_ids
+            if unauthorized_message is not None:
+                btn["unauthorized_message"] = unauthorized_message
+            row.append(btn)
+        if row:
+            rows.append(row)
+    return rows
+
+
+def make_block(buttons: int, per_row: int = 3, seed: int = 0) -> str:
+    """
+    Генерирует блок кнопок заданного размера.
+
+    :param buttons: Общее число кнопок.
+    :param per_row: Число кнопок в ряду.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Текст блока кнопок.
+    """
+    rnd = Random(seed)
+    lines: list[str] = []
+    for start in range(0, buttons, per_row):
+        row = [rnd.choice(_TEMPLATES).format(i=i) for i in range(start, min(start + per_row, buttons))]
+        lines.append(" ; ".join(row))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Точка входа замера."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--buttons", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'кнопок':>8} {'legacy, мс':>12} {'current, мс':>16} {'ускорение':>10}")
+    for size in args.buttons:
+        block = make_block(size)
+        legacy = min(repeat(lambda: legacy_parse_buttons(block, "bench"), number=1, repeat=args.repeat))
+        current = min(repeat(lambda: parse_button_block(block), number=1, repeat=args.repeat))
+        print(f"{size:>8} {legacy * 1e3:>12.3f} {current * 1e3:>16.3f} {legacy / current:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Замер выбора обработчика callback-запроса.
+
+Один и тот же набор обработчиков регистрируется двумя способами:
+* в обычных ``Router`` с фильтрами ``F.data == ...`` / ``F.data.startswith(...)``;
+* в ``CallbackRouter`` с индексом по ``data=`` / ``prefix=`` / ``CallbackData.filter()``.
+
+Смешанный поток callback-запросов прогоняется через ``dp.feed_update``;
+обработчики ничего не отправляют, поэтому замер отражает только стоимость маршрутизации.
+
+Запуск: python -m benchmarks.bench_callbacks --updates 20000
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from random import Random
+from time import perf_counter
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from bot.core.callbacks import AlertCallback, DeletePostCallback, PostListCallback, ViewPostCallback
+from bot.utils.callback_router import CallbackRouter
+
+# Точные значения callback_data, встречающиеся в боте
+_EXACT: tuple[str, ...] = (
+    "start", "help", "void", "cancel_list", "toggle_privacy", "continue_creation",
+    "no_image", "no_buttons", "finish_buttons", "cancel_creation", "edit_post",
+    "back_to_preview", "confirm_post",
+)
+
+
+async def _noop(callback_query: CallbackQuery) -> None:
+    """Обработчик-заглушка."""
+    return None
+
+
+def build_scanning() -> Router:
+    """Дерево роутеров с последовательной проверкой фильтров, как до индекса."""
+    commands, alerts, posts = Router(name="cmd"), Router(name="alerts"), Router(name="posts")
+    commands.callback_query.register(_noop, F.data == "start")
+    commands.callback_query.register(_noop, F.data == "help")
+    alerts.callback_query.register(_noop, F.data.startswith(("bt:", "bt_", "show_alert_")))
+    alerts.callback_query.register(_noop, F.data == "void")
+    posts.callback_query.register(_noop, PostListCallback.filter())
+    posts.callback_query.register(_noop, F.data == "cancel_list")
+    posts.callback_query.register(_noop, ViewPostCallback.filter())
+    posts.callback_query.register(_noop, lambda c: c.data and c.data.startswith("dp:"))
+    for data in _EXACT[4:]:
+        posts.callback_query.register(_noop, F.data == data)
+    posts.callback_query.register(_noop, F.data.startswith("edit_field:"))
+
+    root = Router(name="root")
+    root.include_routers(commands, alerts, posts)
+    return root
+
+
+def build_indexed() -> Router:
+    """То же дерево на ``CallbackRouter``."""
+    commands, alerts, posts = CallbackRouter(name="cmd"), CallbackRouter(name="alerts"), CallbackRouter(name="posts")
+    commands.callback_query.register(_noop, data="start")
+    commands.callback_query.register(_noop, data="help")
+    alerts.callback_query.register(_noop, prefix=AlertCallback.__prefix__)
+    alerts.callback_query.register(_noop, F.data.startswith(("bt_", "show_alert_")))
+    alerts.callback_query.register(_noop, data="void")
+    posts.callback_query.register(_noop, PostListCallback.filter())
+    posts.callback_query.register(_noop, data="cancel_list")
+    posts.callback_query.register(_noop, ViewPostCallback.filter())
+    posts.callback_query.register(_noop, DeletePostCallback.filter())
+    for data in _EXACT[4:]:
+        posts.callback_query.register(_noop, data=data)
+    posts.callback_query.register(_noop, prefix="edit_field")
+
+    root = Router(name="root")
+    root.include_routers(commands, alerts, posts)
+    return root
+
+
+def make_stream(count: int, seed: int = 0) -> list[Update]:
+    """
+    Генерирует смешанный поток callback-запросов.
+
+    :param count: Количество апдейтов.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Список апдейтов.
+    """
+    rnd = Random(seed)
+    makers = (
+        lambda: AlertCallback(owner=rnd.randrange(1, 10**9), key=rnd.randrange(100), row=0, col=0).pack(),
+        lambda: PostListCallback(page=rnd.randrange(10)).pack(),
+        lambda: ViewPostCallback(key=rnd.randrange(100)).pack(),
+        lambda: DeletePostCallback(key=rnd.randrange(100)).pack(),
+        lambda: f"edit_field:{rnd.choice(('text', 'image', 'buttons', 'id'))}",
+        lambda: f"bt_legacy_{rnd.randrange(100)}",
+        lambda: rnd.choice(_EXACT),
+    )
+    chat = Chat(id=1, type="private")
+    user = User(id=1, is_bot=False, first_name="bench")
+    message = Message(message_id=1, date=0, chat=chat, text="x")
+    return [
+        Update(
+            update_id=i,
+            callback_query=CallbackQuery(
+                id=str(i), from_user=user, chat_instance="0", message=message, data=rnd.choice(makers)(),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+async def measure(router: Router, updates: list[Update]) -> float:
+    """Прогоняет поток через диспетчер и возвращает время в секундах."""
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(token="42:BENCH")
+    start = perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    elapsed = perf_counter() - start
+    await bot.session.close()
+    return elapsed
+
+
+async def amain() -> None:
+    """Точка входа замера."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    updates = make_stream(args.updates, args.seed)
+    scanning = await measure(build_scanning(), updates)
+    indexed = await measure(build_indexed(), updates)
+
+    print(f"{'способ':>10} {'апдейт/с':>12} {'мкс/апдейт':>12}")
+    for name, elapsed in (("фильтры", scanning), ("индекс", indexed)):
+        print(f"{name:>10} {len(updates) / elapsed:>12.0f} {elapsed / len(updates) * 1e6:>12.1f}")
+    print(f"ускорение: {scanning / indexed:.2f}x")
+
+
+if __name__ == "__main__":
+    run(amain())
@@ -0,0 +1,169 @@
+"""
+Сквозной замер пропускной способности бота.
+
+Собирает настоящие ``dp`` и ``router`` бота, подменяет сессию бота на
+``RecordingSession`` (без сети) и прогоняет корпус апдейтов через
+``dp.feed_update``. Хранилище постов заполняется во временной директории.
+
+Выводит апдейты в секунду, задержки p50/p99 по видам апдейтов, число вызовов
+Bot API и, с ``--allocations``, память, выделяемую на один апдейт (tracemalloc
+замедляет обработку, поэтому задержки в этом режиме завышены).
+
+С ``--concurrency`` перед замером все шаги создания поста одним пользователем
+подаются одновременно: проверяется, что переходы FSM остаются последовательными.
+
+Запуск:
+    python -m benchmarks.bench_e2e --updates 5000
+    python -m benchmarks.bench_e2e --record corpus.jsonl
+    python -m benchmarks.bench_e2e --corpus corpus.jsonl --allocations
+    python -m benchmarks.bench_e2e --concurrency 64
+"""
+
+import tracemalloc
+from argparse import ArgumentParser
+from asyncio import Semaphore, create_task, gather, run
+from collections import Counter, defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from aiogram import Bot
+from loguru import logger
+
+from benchmarks.corpus import (
+    CorpusMeta, load_corpus, make_corpus, make_flow, save_corpus, seed_storage, update_kind,
+)
+from benchmarks.fake_session import RecordingSession
+from bot.bots import bot as real_bot, dp
+from bot.core.storage import storage
+from bot.handlers import router
+
+
+async def check_user_ordering(bot: Bot) -> bool:
+    """
+    Подаёт все шаги создания поста одного пользователя одновременно, как при
+    ``handle_as_tasks=True``, и проверяет, что пост создан.
+
+    :param bot: Бот с фиктивной сессией.
+    :return: True, если сценарий дошёл до сохранения поста.
+    """
+    post_id = "burst_ordering_post"
+    flow = make_flow(20_000_000, post_id, image="https://example.com/image.png")
+    await gather(*(create_task(dp.feed_update(bot, update)) for update in flow))
+    return storage.get_post(post_id) is not None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Возвращает перцентиль по отсортированному списку значений."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def amain() -> None:
+    """Точка входа замера."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=20, help="постов на пользователя")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", type=Path, help="воспроизвести сохранённый корпус")
+    parser.add_argument("--record", type=Path, help="сохранить сгенерированный корпус и выйти")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="обрабатывать апдейты задачами, как start_polling(handle_as_tasks=True)")
+    parser.add_argument("--allocations", action="store_true", help="замерить память через tracemalloc")
+    parser.add_argument("--verbose", action="store_true", help="не отключать логи бота")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+
+    with TemporaryDirectory() as tmp:
+        storage.posts_dir = tmp
+        storage.load_all_posts()
+
+        if args.corpus:
+            meta, updates = load_corpus(args.corpus)
+            seed_storage(storage, meta)
+        else:
+            meta = CorpusMeta(users=args.users, posts_per_user=args.posts, seed=args.seed)
+            updates = make_corpus(seed_storage(storage, meta), args.updates, args.seed)
+            if args.record:
+                save_corpus(args.record, meta, updates)
+                print(f"Корпус из {len(updates)} апдейтов сохранён в {args.record}")
+                return
+
+        session = RecordingSession()
+        bot = Bot(token="42:BENCH", session=session, default=real_bot.default)
+        dp.include_router(router)
+
+        if args.concurrency > 1:
+            ordered = await check_user_ordering(bot)
+            print(f"FSM одного пользователя при одновременной подаче: {'OK' if ordered else 'СБОЙ'}")
+
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: Counter[str] = Counter()
+        peaks: list[int] = []
+        if args.allocations:
+            tracemalloc.start()
+        start_current = tracemalloc.get_traced_memory()[0] if args.allocations else 0
+
+        async def process(update) -> None:
+            kind = update_kind(update)
+            if args.allocations:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            t0 = perf_counter()
+            try:
+                await dp.feed_update(bot, update)
+            except Exception:
+                errors[kind] += 1
+            latencies[kind].append(perf_counter() - t0)
+            if args.allocations:
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+
+        started = perf_counter()
+        if args.concurrency > 1:
+            # Как в start_polling: новый апдейт берётся, только когда освободился слот
+            slots = Semaphore(args.concurrency)
+
+            async def limited(update) -> None:
+                try:
+                    await process(update)
+                finally:
+                    slots.release()
+
+            tasks = []
+            for update in updates:
+                await slots.acquire()
+                tasks.append(create_task(limited(update)))
+            await gather(*tasks)
+        else:
+            for update in updates:
+                await process(update)
+        elapsed = perf_counter() - started
+
+        retained = 0
+        if args.allocations:
+            retained = tracemalloc.get_traced_memory()[0] - start_current
+            tracemalloc.stop()
+        await bot.session.close()
+
+    everything = sorted(v for values in latencies.values() for v in values)
+    print(f"Апдейтов: {len(updates)}, время: {elapsed:.2f} с, {len(updates) / elapsed:.0f} апдейт/с")
+    print(f"{'вид':>20} {'кол-во':>8} {'p50, мс':>9} {'p99, мс':>9} {'ошибок':>7}")
+    for kind in sorted(latencies):
+        values = sorted(latencies[kind])
+        print(f"{kind:>20} {len(values):>8} {percentile(values, 0.5) * 1e3:>9.3f} "
+              f"{percentile(values, 0.99) * 1e3:>9.3f} {errors[kind]:>7}")
+    print(f"{'всего':>20} {len(everything):>8} {percentile(everything, 0.5) * 1e3:>9.3f} "
+          f"{percentile(everything, 0.99) * 1e3:>9.3f} {sum(errors.values()):>7}")
+    print("Вызовы Bot API:", ", ".join(f"{name}={n}" for name, n in session.calls.most_common()))
+    if args.allocations:
+        peaks.sort()
+        print(f"Память на апдейт: p50 {percentile(peaks, 0.5) / 1024:.1f} КиБ, "
+              f"p99 {percentile(peaks, 0.99) / 1024:.1f} КиБ; удержано за прогон {retained / 1024:.1f} КиБ")
+
+
+if __name__ == "__main__":
+    run(amain())
@@ -0,0 +1,81 @@
+"""
+Замер скорости экранирования и проверки разметки.
+
+Сравнивает прежний ``textmd2`` (``re.sub`` с собираемым на каждый вызов шаблоном)
+с ``escape_md2``, а также ``str.translate`` и ``html.escape`` с ``escape_html``
+на тексте со спецсимволами и без них. Отдельно замеряет ``check_html``
+на корректной разметке типичного поста, включая блок кода в том виде,
+в каком его отдаёт ``Message.html_text`` aiogram.
+
+Запуск: python -m benchmarks.bench_formatting --chars 200 4000 --repeat 2000
+"""
+
+import html
+from argparse import ArgumentParser
+from re import escape, sub
+from timeit import repeat
+from typing import Callable
+
+from bot.utils.formatting import check_html, escape_html, escape_md2
+
+# Фрагменты текста постов: кириллица, пунктуация и ссылки
+_SPECIAL: str = "Привет, мир! Это (тест) текста_с_разметкой *жирный* и [ссылка](https://x.y/z?a=1&b=2). "
+_PLAIN: str = "Просто длинный текст поста без специальных символов разметки "
+_MARKUP: str = ('<b>Заголовок</b> и <i>курсив</i>, <a href="https://example.com/?a=1&amp;b=2">ссылка</a>, '
+                '<tg-spoiler>спойлер</tg-spoiler> &lt;3\n<blockquote expandable>цитата</blockquote>\n'
+                '<pre><code class="language-python">print(1 &lt; 2)</code></pre>\n'
+                '<pre><code language="language-python">print(2)</code></pre>\n')
+
+_MD2_TABLE = str.maketrans({c: "\\" + c for c in "\\_*[]()~`>#+-=|{}.!"})
+_HTML_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def legacy_textmd2(msg: str, special_chars: str = r"_*[]()~`>#+-=|{}.!") -> str:
+    """Прежняя реализация экранирования MarkdownV2, сохранённая для сравнения."""
+    return sub(rf"([{escape(special_chars)}])", r"\\\1", msg)
+
+
+def make_text(fragment: str, chars: int) -> str:
+    """Повторяет фрагмент до нужной длины."""
+    return (fragment * (chars // len(fragment) + 1))[:chars]
+
+
+def best(func: Callable[[str], object], text: str, number: int) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    return min(repeat(lambda: func(text), number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    """Точка входа замера."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--chars", type=int, nargs="+", default=[200, 4000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases: tuple[tuple[str, Callable[[str], object]], ...] = (
+        ("textmd2 (legacy)", legacy_textmd2),
+        ("md2 translate", lambda t: t.translate(_MD2_TABLE)),
+        ("escape_md2", escape_md2),
+        ("html.escape", lambda t: html.escape(t, quote=False)),
+        ("html translate", lambda t: t.translate(_HTML_TABLE)),
+        ("escape_html", escape_html),
+    )
+
+    print(f"{'функция':<18} {'символов':>9} {'спецсимволы, мкс':>17} {'простой текст, мкс':>19}")
+    for chars in args.chars:
+        special, plain = make_text(_SPECIAL, chars), make_text(_PLAIN, chars)
+        for name, func in cases:
+            print(f"{name:<18} {chars:>9} {best(func, special, args.repeat):>17.2f} "
+                  f"{best(func, plain, args.repeat):>19.2f}")
+
+    print(f"\n{'check_html':<18} {'символов':>9} {'разметка, мкс':>17} {'простой текст, мкс':>19}")
+    for chars in args.chars:
+        markup = _MARKUP * max(1, chars // len(_MARKUP))
+        assert not check_html(markup), check_html(markup)
+        plain = make_text(_PLAIN, chars)
+        print(f"{'':<18} {len(markup):>9} {best(check_html, markup, args.repeat):>17.2f} "
+              f"{best(check_html, plain, args.repeat):>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
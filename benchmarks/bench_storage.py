@@ -0,0 +1,153 @@
+"""
+Микрозамеры ``PostStorage`` на синтетических каталогах разного размера.
+
+Каталоги создаются ``benchmarks.dataset`` во временной директории. Для каждого
+размера замеряются загрузка всех постов, загрузка/сохранение/удаление постов
+самого крупного пользователя, запись одного поста, путь инлайн-запроса (поиск по метаданным и чтение
+тел первой страницы), чтение тела поста с диска и из кэша, поиск уведомления и загрузка всех постов по файлу индекса.
+
+Результаты (медиана, мс) сохраняются в ``benchmarks/results/storage.json``:
+файл хранится в репозитории, поэтому регрессии видны в диффе, а ``--compare``
+печатает изменение относительно сохранённых значений.
+
+Запуск:
+    python -m benchmarks.bench_storage --sizes small medium
+    python -m benchmarks.bench_storage --save
+    python -m benchmarks.bench_storage --compare
+"""
+
+import json
+from asyncio import new_event_loop
+from argparse import ArgumentParser
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Optional
+
+from loguru import logger
+
+from benchmarks.dataset import generate_posts_tree
+from bot.core.storage import PostStorage
+from configs.config import Inline
+
+RESULTS: Path = Path(__file__).parent / "results" / "storage.json"
+
+# Размеры каталогов: (пользователей, максимум постов у пользователя)
+SIZES: dict[str, tuple[int, int]] = {
+    "small": (50, 100),
+    "medium": (500, 500),
+    "large": (2_000, 2_000),
+}
+
+
+def timed(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> float:
+    """Медиана времени выполнения в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        func()
+        samples.append(perf_counter() - start)
+    return round(median(samples) * 1e3, 3)
+
+
+def bench_size(users: int, max_posts: int, repeat: int) -> dict[str, float]:
+    """Замеряет операции хранилища на каталоге заданного размера."""
+    with TemporaryDirectory() as tmp:
+        total = generate_posts_tree(Path(tmp), users, max_posts)
+        owner = 100_000  # у первого пользователя max_posts постов
+        results: dict[str, float] = {"posts": total}
+
+        results["load_all_posts"] = timed(lambda: PostStorage(tmp).load_all_posts(), repeat)
+
+        storage = PostStorage(tmp)
+        results["load_user_posts"] = timed(lambda: storage.load_user_posts(owner), repeat)
+
+        posts = storage.load_user_posts(owner)
+        results["save_user_posts"] = timed(lambda: storage.save_user_posts(owner, posts), repeat)
+
+        victim = next(iter(posts))
+        results["delete_user_post"] = timed(
+            lambda: storage.delete_user_post(owner, victim), repeat,
+            setup=lambda: storage.save_user_posts(owner, posts),
+        )
+        storage.save_user_posts(owner, posts)
+
+        # Запись одного поста: строка журнала и новая версия снимка
+        edited = storage.get_post(victim)
+        results["save_post"] = timed(lambda: storage.save_post(owner, edited), repeat * 5)
+
+        # Путь инлайн-запроса, как в обработчике: проверка загрузки, поиск по метаданным
+        # и чтение тел постов первой страницы
+        loop = new_event_loop()
+        loop.run_until_complete(storage.ensure_loaded())
+
+        def inline_query() -> None:
+            loop.run_until_complete(storage.ensure_loaded())
+            found = storage.search_posts(owner, "u10000")
+            storage.get_posts(meta.post_id for meta in found[:Inline.PAGE_SIZE])
+
+        results["inline_query"] = timed(inline_query, repeat * 5)
+        loop.close()
+        results["search_posts"] = timed(lambda: storage.search_posts(owner, "u10000"), repeat * 5)
+
+        # Тело поста: чтение файла владельца при промахе кэша и попадание в кэш
+        victim = next(iter(storage.load_user_posts(owner)))
+        results["get_post_cold"] = timed(lambda: storage.get_post(victim), repeat, setup=storage.bodies.clear)
+        results["get_post_hit"] = timed(lambda: storage.get_post(victim), repeat * 5)
+
+        keys = [
+            b.callback_data for user_id in storage.post_keys
+            for post in storage.load_user_posts(user_id).values()
+            for _, _, b in post.iter_buttons() if b.notification is not None
+        ]
+        results["notification_hit"] = timed(lambda: [storage.get_notification(k) for k in keys[:1000]], repeat)
+
+        # Промах по кнопке самого крупного владельца: разбирается только его файл
+        alert = next(k for k in keys if k.startswith(f"bt:{owner}:"))
+        results["notification_cold"] = timed(lambda: PostStorage(tmp).get_notification(alert), repeat)
+
+        # Холодный запуск по файлу индекса: файлы не разбираются
+        storage.write_index()
+        results["load_all_posts_index"] = timed(lambda: PostStorage(tmp).load_all_posts(), repeat)
+        return results
+
+
+def compare(current: dict, saved: dict) -> None:
+    """Печатает изменение результатов относительно сохранённых."""
+    for size, ops in current.items():
+        for op, value in ops.items():
+            old = saved.get(size, {}).get(op)
+            if op == "posts" or not old:
+                continue
+            delta = (value - old) / old * 100
+            print(f"{size:>7} {op:>20} {old:>10.3f} → {value:>10.3f} мс ({delta:+.1f}%)")
+
+
+def main() -> None:
+    """Точка входа замера."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="записать результаты в benchmarks/results")
+    parser.add_argument("--compare", action="store_true", help="сравнить с сохранёнными результатами")
+    args = parser.parse_args()
+    logger.remove()
+
+    current = {size: bench_size(*SIZES[size], repeat=args.repeat) for size in args.sizes}
+    for size, ops in current.items():
+        print(f"[{size}] " + ", ".join(f"{op}={value}" for op, value in ops.items()))
+
+    saved = json.loads(RESULTS.read_text(encoding="utf-8")) if RESULTS.exists() else {}
+    if args.compare:
+        compare(current, saved)
+    if args.save:
+        RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        RESULTS.write_text(json.dumps({**saved, **current}, ensure_ascii=False, indent=4) + "\n", encoding="utf-8")
+        print(f"Результаты сохранены в {RESULTS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Корпус апдейтов для сквозных замеров.
+
+Синтетический корпус воспроизводит основные сценарии бота: инлайн-поиск,
+листание и просмотр списка постов, нажатия на кнопки-уведомления и полный
+сценарий создания поста через FSM. Корпус сохраняется в JSONL: первая строка —
+параметры набора постов, на котором он записан, далее — по апдейту в строке.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from random import Random
+from typing import Iterator, Optional
+
+from aiogram.types import CallbackQuery, Chat, InlineQuery, Message, Update, User
+
+from bot.core import AlertCallback, Button, Notification, Post, PostListCallback, PostStorage, ViewPostCallback
+
+# Экспортируемые объекты
+__all__ = ('CorpusMeta', 'seed_storage', 'make_corpus', 'make_flow', 'save_corpus', 'load_corpus', 'update_kind')
+
+# Доля сценариев в синтетическом корпусе
+_WEIGHTS: dict[str, int] = {"inline": 4, "page": 2, "view": 2, "alert": 4, "flow": 1}
+
+_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class CorpusMeta:
+    """Параметры набора постов, на котором записан корпус."""
+    users: int = 50
+    posts_per_user: int = 20
+    seed: int = 0
+
+
+def seed_storage(storage: PostStorage, meta: CorpusMeta) -> list[Post]:
+    """
+    Заполняет хранилище детерминированным набором постов.
+
+    :param storage: Хранилище с пустой директорией постов.
+    :param meta: Параметры набора.
+    :return: Сохранённые посты.
+    """
+    rnd = Random(meta.seed)
+    saved: list[Post] = []
+    for user_id in range(1, meta.users + 1):
+        posts: dict[str, Post] = {}
+        for n in range(meta.posts_per_user):
+            pid = f"u{user_id}_post_{n}"
+            buttons = [[
+                Button(text="Уведомление", notification=Notification(text=f"Для вас {n}", show_alert=True)),
+                Button(text="Ссылка", url=f"https://example.com/{pid}"),
+            ]]
+            if rnd.random() < 0.3:
+                buttons.append([Button(
+                    text="Только своим",
+                    notification=Notification(text="Секрет", allowed_ids=frozenset({user_id}),
+                                              unauthorized_message="Нет доступа"),
+                )])
+            posts[pid] = Post(post_id=pid, user_id=user_id, text=f"Текст поста {pid}", private=rnd.random() < 0.2,
+                              buttons=buttons)
+        storage.save_user_posts(user_id, posts)
+        saved.extend(posts.values())
+    return saved
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name=f"user{user_id}", username=f"user{user_id}")
+
+
+def _message(message_id: int, user_id: int, text: Optional[str] = None) -> Message:
+    return Message(message_id=message_id, date=_DATE, chat=Chat(id=user_id, type="private"),
+                   from_user=_user(user_id), text=text)
+
+
+def _flow(user_id: int, post_id: str, image: Optional[str] = None) -> list[tuple[str, Optional[str]]]:
+    """
+    Шаги создания поста: ("message", текст) или ("callback", данные).
+    С ``image`` после ID отправляется ссылка на изображение, и пост подтверждается без кнопок.
+    """
+    steps = [
+        ("message", "Создать пост📔"),
+        ("message", f"Текст поста <b>{post_id}</b>"),
+        ("callback", "edit_post"),
+        ("callback", "edit_field:id"),
+        ("message", post_id),
+    ]
+    if image is not None:
+        steps.append(("message", image))
+    else:
+        steps.append(("callback", "no_image"))
+        steps.append(("message", "Уведомление | msg:Привет ; Ссылка | https://example.com\nКопия | copy:текст"))
+    steps.append(("callback", "confirm_post"))
+    return steps
+
+
+def _step_update(ids: Iterator[int], user_id: int, kind: str, payload: Optional[str]) -> Update:
+    """Собирает апдейт одного шага сценария создания поста."""
+    if kind == "message":
+        return Update(update_id=next(ids), message=_message(next(ids), user_id, payload))
+    return Update(update_id=next(ids), callback_query=CallbackQuery(
+        id=str(next(ids)), from_user=_user(user_id), chat_instance="0",
+        message=_message(next(ids), user_id, "x"), data=payload,
+    ))
+
+
+def make_flow(user_id: int, post_id: str, image: Optional[str] = None) -> list[Update]:
+    """
+    Возвращает апдейты полного сценария создания поста одним пользователем.
+
+    :param user_id: ID пользователя.
+    :param post_id: ID создаваемого поста.
+    :param image: Ссылка на изображение вместо нажатия «Без изображения».
+    :return: Апдейты в порядке отправки.
+    """
+    ids = count(1)
+    return [_step_update(ids, user_id, kind, payload) for kind, payload in _flow(user_id, post_id, image)]
+
+
+def make_corpus(posts: list[Post], size: int, seed: int = 0) -> list[Update]:
+    """
+    Генерирует смешанный корпус апдейтов. Шаги одного сценария создания поста
+    идут в исходном порядке, но перемежаются с остальными апдейтами.
+
+    :param posts: Посты, на которые ссылаются апдейты.
+    :param size: Приблизительное число апдейтов.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Список апдейтов.
+    """
+    rnd = Random(seed)
+    ids = count(1)
+    kinds = [k for k, w in _WEIGHTS.items() for _ in range(w)]
+    alerts = [(p, r, c) for p in posts for r, c, b in p.iter_buttons() if b.notification is not None]
+    owners = sorted({p.user_id for p in posts})
+    flows: list[Iterator[tuple[int, tuple[str, Optional[str]]]]] = []
+    updates: list[Update] = []
+
+    while len(updates) < size:
+        if flows and rnd.random() < 0.3:
+            flow = rnd.choice(flows)
+            step = next(flow, None)
+            if step is None:
+                flows.remove(flow)
+                continue
+            user_id, (kind, payload) = step
+            updates.append(_step_update(ids, user_id, kind, payload))
+            continue
+
+        kind = rnd.choice(kinds)
+        update_id = next(ids)
+        if kind == "inline":
+            post = rnd.choice(posts)
+            query = post.post_id[:rnd.randint(0, len(post.post_id))]
+            updates.append(Update(update_id=update_id, inline_query=InlineQuery(
+                id=str(update_id), from_user=_user(rnd.choice(owners)), query=query, offset="",
+            )))
+        elif kind == "flow":
+            user_id = 10_000 + update_id
+            steps = _flow(user_id, f"flow_{update_id}")
+            flows.append(iter([(user_id, step) for step in steps]))
+        else:
+            if kind == "alert":
+                post, row, col = rnd.choice(alerts)
+                user_id = rnd.choice(owners)
+                data = AlertCallback(owner=post.user_id, key=post.key, row=row, col=col).pack()
+            elif kind == "page":
+                user_id = rnd.choice(owners)
+                data = PostListCallback(page=rnd.randrange(5)).pack()
+            else:
+                post = rnd.choice(posts)
+                user_id = post.user_id
+                data = ViewPostCallback(key=post.key).pack()
+            updates.append(Update(update_id=update_id, callback_query=CallbackQuery(
+                id=str(update_id), from_user=_user(user_id), chat_instance="0",
+                message=_message(next(ids), user_id, "x"), data=data,
+            )))
+    return updates
+
+
+def update_kind(update: Update) -> str:
+    """Возвращает вид апдейта для группировки задержек."""
+    if update.inline_query is not None:
+        return "inline"
+    if update.callback_query is not None:
+        return f"callback:{(update.callback_query.data or '').partition(':')[0]}"
+    return "message"
+
+
+def save_corpus(path: Path, meta: CorpusMeta, updates: list[Update]) -> None:
+    """Сохраняет корпус в JSONL."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": asdict(meta)}, ensure_ascii=False) + "\n")
+        for update in updates:
+            f.write(update.model_dump_json(exclude_none=True) + "\n")
+
+
+def load_corpus(path: Path) -> tuple[CorpusMeta, list[Update]]:
+    """Загружает корпус из JSONL."""
+    with open(path, "r", encoding="utf-8") as f:
+        meta = CorpusMeta(**json.loads(f.readline())["meta"])
+        updates = [Update.model_validate_json(line) for line in f if line.strip()]
+    return meta, updates
@@ -0,0 +1,105 @@
+"""
+Генератор синтетического каталога постов.
+
+Создаёт дерево ``posts/`` в формате хранилища: много пользователей, число постов
+на пользователя распределено с длинным хвостом (единицы у большинства, тысячи
+у немногих), кнопки разной формы — уведомления с ``allowed_ids``, ссылки,
+копирование, инлайн-режим и заглушки.
+
+Запуск: python -m benchmarks.dataset --out /tmp/posts --users 1000 --max-posts 2000
+"""
+
+import json
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+
+# Экспортируемые объекты
+__all__ = ('generate_posts_tree', 'make_post')
+
+_WORDS: tuple[str, ...] = (
+    "сказитель", "история", "глава", "герой", "дорога", "ночь", "город", "письмо",
+    "ветер", "тайна", "замок", "море", "песня", "огонь", "лес", "встреча",
+)
+
+
+def _text(rnd: Random, words: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(words))
+
+
+def _button(rnd: Random, user_id: int, post_id: str, n: int) -> dict:
+    """Кнопка случайного вида в формате хранилища."""
+    kind = rnd.random()
+    if kind < 0.4:
+        btn = {"text": f"Уведомление {n}", "notification": _text(rnd, rnd.randint(2, 20)),
+               "show_alert": rnd.random() < 0.7}
+        if rnd.random() < 0.3:
+            btn["allowed_ids"] = sorted({user_id, *(rnd.randrange(1, 10**10) for _ in range(rnd.randint(1, 5)))})
+            btn["unauthorized_message"] = "Нет доступа"
+        return btn
+    if kind < 0.6:
+        return {"text": f"Ссылка {n}", "url": f"https://example.com/{post_id}/{n}"}
+    if kind < 0.7:
+        return {"text": f"Заглушка {n}", "url": "http://void"}
+    if kind < 0.85:
+        return {"text": f"Копия {n}", "copy_text": _text(rnd, 5)}
+    return {"text": f"Инлайн {n}", "switch_inline_query": post_id}
+
+
+def make_post(rnd: Random, user_id: int, post_id: str) -> dict:
+    """Пост в формате хранилища с 0–4 рядами по 1–3 кнопки."""
+    rows = [
+        [_button(rnd, user_id, post_id, r * 3 + c) for c in range(rnd.randint(1, 3))]
+        for r in range(rnd.choice((0, 1, 1, 2, 2, 3, 4)))
+    ]
+    return {
+        "post_id": post_id,
+        "user_id": user_id,
+        "text": _text(rnd, rnd.randint(5, 200)),
+        "image": f"https://img.example.com/{post_id}.jpg" if rnd.random() < 0.5 else "",
+        "private": rnd.random() < 0.2,
+        "buttons": rows,
+    }
+
+
+def generate_posts_tree(out: Path, users: int, max_posts: int, seed: int = 0) -> int:
+    """
+    Создаёт файлы ``posts_<user_id>.json`` в директории.
+
+    :param out: Директория каталога постов.
+    :param users: Число пользователей.
+    :param max_posts: Верхняя граница числа постов у одного пользователя.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Общее число постов.
+    """
+    rnd = Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for index in range(users):
+        user_id = 100_000 + index
+        # Парето: у большинства пара постов, у немногих — до max_posts
+        count = min(max_posts, int(rnd.paretovariate(1.2)))
+        if index == 0:
+            count = max_posts
+        posts = {f"u{user_id}_{n}": make_post(rnd, user_id, f"u{user_id}_{n}") for n in range(count)}
+        with open(out / f"posts_{user_id}.json", "w", encoding="utf-8") as f:
+            json.dump(posts, f, ensure_ascii=False, indent=4)
+        total += count
+    return total
+
+
+def main() -> None:
+    """Точка входа генератора."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--max-posts", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    total = generate_posts_tree(args.out, args.users, args.max_posts, args.seed)
+    print(f"Создано {total} постов у {args.users} пользователей в {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Сессия бота без сети для замеров.
+
+Записывает вызванные методы Bot API и возвращает правдоподобные ответы,
+чтобы обработчики работали так же, как с настоящим Telegram.
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, AsyncGenerator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, Message, User
+
+# Экспортируемые объекты
+__all__ = ('RecordingSession',)
+
+
+class RecordingSession(BaseSession):
+    """
+    Сессия, которая не обращается к сети.
+
+    Методы, возвращающие ``Message``, получают сообщение с новым message_id,
+    ``GetMe`` — пользователя-бота, остальные — ``True``.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.calls: Counter[str] = Counter()
+        self._message_ids = count(1)
+
+    def _result(self, bot: Bot, method: TelegramMethod[TelegramType]) -> Any:
+        """Собирает ответ на вызов метода."""
+        returning = method.__returning__
+        if returning is Message:
+            chat_id = getattr(method, "chat_id", None)
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=chat_id if isinstance(chat_id, int) else 0, type="private"),
+                text=getattr(method, "text", None),
+            ).as_(bot)
+        if returning is User:
+            return User(id=bot.id, is_bot=True, first_name="bench", username="bench_bot")
+        return True
+
+    async def make_request(
+            self,
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+            timeout: Optional[int] = None,
+    ) -> TelegramType:
+        self.calls[type(method).__name__] += 1
+        return self._result(bot, method)
+
+    async def stream_content(
+            self,
+            url: str,
+            headers: Optional[dict[str, Any]] = None,
+            timeout: int = 30,
+            chunk_size: int = 65536,
+            raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,80 @@
+"""
+Фаззинг разбора блока кнопок.
+
+Проверяет на случайных входах, что ``parse_button_block``:
+* не бросает исключений, кроме собранных ``ButtonSyntaxError``;
+* указывает позиции ошибок внутри исходного текста;
+* совпадает с прежней реализацией на корректных блоках.
+
+Запуск: python -m benchmarks.fuzz_buttons --iterations 100000
+"""
+
+from argparse import ArgumentParser
+from random import Random
+
+from benchmarks.bench_buttons import legacy_parse_buttons, make_block
+from bot.utils.button_parser import parse_button_block
+
+# Алфавит, насыщенный служебными символами и ключевыми словами шаблона
+_ALPHABET: tuple[str, ...] = (
+    "a", "Я", " ", "|", ";", "\n", "\r\n", ":", ",", "1", "42",
+    "msg:", "ntf:", "notification:", "void", "http://x", "tg://y",
+    "copy:", "inline:", "inline_current:", "inline_chosen:",
+)
+
+
+def _normalize(rows: list[list[dict]]) -> list[list[dict]]:
+    """
+    Приводит кнопки к сравнимому виду: убирает callback_data, которые не задаются шаблоном
+    (случайные у копирования и назначаемые хранилищем у уведомлений), и порядок allowed_ids.
+    """
+    normalized = []
+    for row in rows:
+        out_row = []
+        for btn in row:
+            out = {k: v for k, v in btn.items() if k != "callback_data" or not ("copy_" in str(v) or "notification" in btn)}
+            if "allowed_ids" in out:
+                out["allowed_ids"] = sorted(out["allowed_ids"])
+            out_row.append(out)
+        normalized.append(out_row)
+    return normalized
+
+
+def fuzz_random(rnd: Random, iterations: int) -> None:
+    """Случайные входы: разбор не падает, позиции ошибок корректны."""
+    for _ in range(iterations):
+        text = "".join(rnd.choice(_ALPHABET) for _ in range(rnd.randint(0, 40)))
+        result = parse_button_block(text)
+        lines = text.splitlines() or [""]
+        for error in result.errors:
+            assert 1 <= error.line <= len(lines) + 1, (text, error)
+            assert error.column >= 1, (text, error)
+        for row in result.rows:
+            for btn in row:
+                assert btn.text, (text, btn)
+
+
+def fuzz_equivalence(rnd: Random, iterations: int) -> None:
+    """Корректные блоки: результат совпадает с прежней реализацией."""
+    for _ in range(iterations):
+        block = make_block(rnd.randint(1, 30), per_row=rnd.randint(1, 4), seed=rnd.randrange(1 << 30))
+        result = parse_button_block(block)
+        assert not result.errors, (block, result.errors)
+        assert _normalize(result.as_dicts()) == _normalize(legacy_parse_buttons(block, "fuzz")), block
+
+
+def main() -> None:
+    """Точка входа фаззинга."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = Random(args.seed)
+    fuzz_random(rnd, args.iterations)
+    fuzz_equivalence(rnd, max(1, args.iterations // 20))
+    print(f"OK: {args.iterations} случайных входов без ошибок")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ from aiogram.utils.i18n import ConstI18nMiddleware, I18n
 from middleware.loggers import loggers
 from configs.config import BotSettings, BotEdit, Webhook
 from middleware.loggers import log
+from bot.utils.command_matcher import CommandMiddleware
+from middleware.throttling import (
+    SendScheduler, CallbackDedupMiddleware, UserOrderingMiddleware, InlineSupersedeMiddleware,
+)
 
 # Экспортируем объекты модуля
 __all__ = ("dp", "bot", "BotInfo", "i18n",)
@@ -17,7 +21,15 @@ i18n: I18n = I18n(path="locales", default_locale="ru", domain="bot")
 # Диспетчер бота, языковых настроек и его хранилища
 storage: MemoryStorage = MemoryStorage()
 dp: Dispatcher = Dispatcher(storage=storage)
+# Очередь пользователя должна стоять до загрузки состояния FSM: иначе апдейты,
+# ожидающие своей очереди, фильтруются по состоянию до предыдущего перехода
+dp.update.outer_middleware.unregister(dp.fsm)
+dp.update.outer_middleware(UserOrderingMiddleware())
+dp.update.outer_middleware(dp.fsm)
 dp.message.outer_middleware(ConstI18nMiddleware(locale='ru', i18n=i18n))
+dp.message.outer_middleware(CommandMiddleware())
+dp.callback_query.outer_middleware(CallbackDedupMiddleware())
+dp.inline_query.outer_middleware(InlineSupersedeMiddleware())
 dp["is_active"]: bool = True
 
 # Экземпляр бота с настройками по умолчанию
@@ -35,6 +47,9 @@ bot: Bot = Bot(token=BotSettings.BOT_TOKEN,
     )
 )
 
+# Планировщик исходящих запросов с учётом flood control
+bot.session.middleware(SendScheduler())
+
 
 class BotInfo:
     """Класс для хранения и инициализации данных бота."""
@@ -1 +1,12 @@
+from .bodies import *
+from .callbacks import *
+from .models import *
+from .limits import *
+from .notifications import *
+from .index import *
+from .popularity import *
+from .reservations import *
+from .snapshot import *
+from .tasks import *
 from .storage import *
+from .watcher import *
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from sys import getsizeof
+from typing import Dict, Optional, Tuple
+
+from configs.config import Project
+from .models import Post
+
+# Настройки экспорта
+__all__ = ("BodyCache", "post_size")
+
+
+def post_size(post: Post) -> int:
+    """
+    Оценивает объём памяти, занимаемый постом: сам объект, строки и кнопки.
+    Оценка приблизительная и нужна только для ограничения кэша.
+    """
+    size = getsizeof(post) + getsizeof(post.text) + getsizeof(post.image) + getsizeof(post.buttons)
+    for row in post.buttons:
+        size += getsizeof(row)
+        for button in row:
+            size += getsizeof(button) + getsizeof(button.text)
+            for value in (button.url, button.callback_data, button.copy_text):
+                if value is not None:
+                    size += getsizeof(value)
+            if button.notification is not None:
+                size += getsizeof(button.notification) + getsizeof(button.notification.text)
+    return size
+
+
+class BodyCache:
+    """
+    Кэш тел постов (текст и кнопки) ограниченного объёма.
+
+    При переполнении вытесняются давно не использованные посты; вытесненный пост
+    хранилище при следующем обращении читает с диска. Методы не содержат ожиданий,
+    поэтому безопасны для корутин одного цикла событий. Объём 0 отключает кэш.
+    """
+    __slots__ = ("max_bytes", "hits", "misses", "resident_bytes", "_data")
+
+    def __init__(self, max_bytes: int = Project.BODY_CACHE_BYTES) -> None:
+        """
+        :param max_bytes: Максимальный оценочный объём постов в байтах (см. ``post_size``).
+        """
+        self.max_bytes = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.resident_bytes: int = 0
+        # post_id → (пост, его оценочный объём)
+        self._data: OrderedDict[str, Tuple[Post, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, post_id: str, revision: Optional[int] = None) -> Optional[Post]:
+        """
+        Возвращает пост и отмечает его как недавно использованный.
+
+        :param post_id: Идентификатор поста.
+        :param revision: Ожидаемый номер изменения; пост другой ревизии считается промахом.
+        """
+        entry = self._data.get(post_id)
+        if entry is None or (revision is not None and entry[0].revision != revision):
+            self.misses += 1
+            return None
+        self._data.move_to_end(post_id)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, post: Post) -> None:
+        """Сохраняет пост, вытесняя самые старые посты сверх объёма."""
+        self.discard(post.post_id)
+        size = post_size(post)
+        if size > self.max_bytes:
+            return
+        self._data[post.post_id] = (post, size)
+        self.resident_bytes += size
+        while self.resident_bytes > self.max_bytes:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.resident_bytes -= evicted
+
+    def discard(self, post_id: str) -> None:
+        """Убирает пост из кэша, если он там есть."""
+        entry = self._data.pop(post_id, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._data.clear()
+        self.resident_bytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных из кэша."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def metrics(self) -> Dict[str, float]:
+        """Возвращает показатели кэша: число и объём постов в памяти, попадания и промахи."""
+        return {
+            "resident_posts": len(self._data),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
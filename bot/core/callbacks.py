@@ -0,0 +1,55 @@
+from typing import Optional
+
+from aiogram.filters.callback_data import CallbackData
+
+# Настройки экспорта
+__all__ = (
+    "AlertCallback",
+    "PostListCallback",
+    "ViewPostCallback",
+    "DeletePostCallback",
+    "alert_owner",
+)
+
+
+class AlertCallback(CallbackData, prefix="bt"):
+    """
+    Кнопка-уведомление поста: ``bt:<owner>:<key>:<row>:<col>``.
+    Владелец и числовой ключ поста позволяют найти пост без полной загрузки хранилища.
+    """
+    owner: int
+    key: int
+    row: int
+    col: int
+
+
+class PostListCallback(CallbackData, prefix="pl"):
+    """Страница списка постов пользователя: ``pl:<page>``."""
+    page: int = 0
+
+
+class ViewPostCallback(CallbackData, prefix="vp"):
+    """Просмотр поста по числовому ключу: ``vp:<key>``."""
+    key: int
+
+
+class DeletePostCallback(CallbackData, prefix="dp"):
+    """Удаление поста по числовому ключу: ``dp:<key>``."""
+    key: int
+
+
+def alert_owner(callback_data: str) -> Optional[int]:
+    """
+    Извлекает владельца поста из callback_data кнопки-уведомления.
+
+    :param callback_data: Данные нажатой кнопки.
+    :return: ID владельца или None для данных старого формата (bt_/show_alert_).
+    """
+    prefix, sep, rest = callback_data.partition(":")
+    if prefix != AlertCallback.__prefix__ or not sep:
+        return None
+    owner, _, _ = rest.partition(":")
+    try:
+        return int(owner)
+    except ValueError:
+        return None
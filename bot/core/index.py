@@ -0,0 +1,219 @@
+import marshal
+from dataclasses import dataclass
+from mmap import ACCESS_READ, mmap
+from os import makedirs, path, replace
+from struct import Struct, error as StructError
+from sys import version_info
+from typing import Dict, Final, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from bot.loggers import logs
+from .models import Notification, Post, PostMeta
+from .notifications import post_notifications
+
+# Настройки экспорта
+__all__ = ("INDEX_FILE", "OwnerIndex", "SnapshotIndex")
+
+# Имя файла индекса в директории постов; скрытые файлы хранилище не считает файлами постов
+INDEX_FILE: Final[str] = ".index.bin"
+
+_MAGIC: Final[bytes] = b"PIDX"
+# Версия 2: ключи постов старого формата назначаются по основному файлу, до журнала
+_FORMAT: Final[int] = 2
+# Записи владельцев кодируются marshal, формат которого зависит от версии Python
+_PYTHON: Final[int] = version_info[0] << 8 | version_info[1]
+
+# Заголовок: сигнатура, версия формата, версия Python, число владельцев
+_HEADER: Final[Struct] = Struct("<4sHHQ")
+# Запись таблицы владельцев, отсортированной по ID: владелец, mtime_ns и размер его файлов,
+# смещение и длина данных владельца
+_RECORD: Final[Struct] = Struct("<qqqQQ")
+
+
+@dataclass(slots=True)
+class OwnerIndex:
+    """
+    Всё, что хранилище держит в памяти о постах одного владельца:
+    метаданные постов и уведомления их кнопок. Тела постов сюда не входят.
+    """
+    posts: Dict[str, PostMeta]
+    notifications: Dict[str, Tuple[Tuple[str, Notification], ...]]
+
+    @classmethod
+    def of(cls, posts: Mapping[str, Post]) -> "OwnerIndex":
+        """Собирает индекс владельца по его постам с нормализованными кнопками."""
+        notifications = {}
+        for pid, post in posts.items():
+            entries = post_notifications(post)
+            if entries:
+                notifications[pid] = entries
+        return cls({pid: PostMeta.of(post) for pid, post in posts.items()}, notifications)
+
+    def encode(self) -> bytes:
+        """Кодирует индекс владельца для записи в файл индекса."""
+        posts = [(m.post_id, m.key, m.private, m.created_at, m.revision) for m in self.posts.values()]
+        notifications = [
+            (pid, cb, n.text, n.show_alert,
+             sorted(n.allowed_ids) if n.allowed_ids is not None else None, n.unauthorized_message)
+            for pid, entries in self.notifications.items() for cb, n in entries
+        ]
+        return marshal.dumps((posts, notifications))
+
+    @classmethod
+    def decode(cls, data: bytes, user_id: int) -> "OwnerIndex":
+        """
+        Восстанавливает индекс владельца из файла индекса.
+
+        :raises ValueError: Если данные повреждены.
+        """
+        try:
+            posts, notifications = marshal.loads(data)
+            metas = {
+                pid: PostMeta(pid, user_id, key, private, created_at, revision)
+                for pid, key, private, created_at, revision in posts
+            }
+            grouped: Dict[str, List[Tuple[str, Notification]]] = {}
+            for pid, cb, text, show_alert, allowed, unauthorized in notifications:
+                grouped.setdefault(pid, []).append((cb, Notification(
+                    text, show_alert, frozenset(allowed) if allowed is not None else None, unauthorized,
+                )))
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError(f"corrupted owner {user_id} record: {e}") from e
+        return cls(metas, {pid: tuple(entries) for pid, entries in grouped.items()})
+
+
+class SnapshotIndex:
+    """
+    Файл индекса хранилища: метаданные постов и уведомления всех владельцев в одном файле.
+
+    Файл отображается в память (mmap), владелец ищется двоичным поиском по таблице
+    с записями фиксированного размера, а его данные декодируются только по запросу.
+    Поэтому открытие индекса не зависит от числа постов. Данные владельца используются,
+    только если состояние его файлов (mtime_ns, размер) совпадает с записанным в индексе;
+    иначе хранилище перечитывает файлы владельца.
+    """
+    __slots__ = ("file_path", "_file", "_map", "_count")
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Открывает индекс; отсутствующий, повреждённый или записанный другой версией Python
+        индекс считается пустым.
+
+        :param file_path: Путь к файлу индекса.
+        """
+        self.file_path = file_path
+        self._file = None
+        self._map: Optional[mmap] = None
+        self._count: int = 0
+        self._open()
+
+    def _open(self) -> None:
+        """Отображает файл индекса в память и проверяет заголовок."""
+        if not path.isfile(self.file_path):
+            return
+        try:
+            self._file = open(self.file_path, 'rb')
+            self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+            magic, fmt, python, count = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or fmt != _FORMAT or python != _PYTHON:
+                raise ValueError("unsupported index format")
+            if len(self._map) < _HEADER.size + count * _RECORD.size:
+                raise ValueError("truncated owners table")
+            self._count = count
+        except (OSError, ValueError, StructError) as e:
+            logs.warning(
+                f"Ignored posts index {self.file_path}: {str(e)}",
+                log_type="STORAGE",
+            )
+            self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Закрывает файл индекса; после закрытия индекс пуст."""
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+        self._count = 0
+
+    def _record(self, position: int) -> Tuple[int, int, int, int, int]:
+        """Читает запись таблицы владельцев по номеру."""
+        return _RECORD.unpack_from(self._map, _HEADER.size + position * _RECORD.size)
+
+    def _find(self, user_id: int) -> Optional[Tuple[int, int, int, int, int]]:
+        """Ищет запись владельца двоичным поиском."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            if record[0] < user_id:
+                low = middle + 1
+            elif record[0] > user_id:
+                high = middle
+            else:
+                return record
+        return None
+
+    def owners(self) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        """Перебирает владельцев индекса и состояние их файлов на момент записи."""
+        for position in range(self._count):
+            user_id, mtime_ns, size, _, _ = self._record(position)
+            yield user_id, (mtime_ns, size)
+
+    def raw(self, user_id: int) -> Optional[Tuple[Tuple[int, int], bytes]]:
+        """Возвращает состояние файлов владельца и его закодированные данные без декодирования."""
+        record = self._find(user_id)
+        if record is None:
+            return None
+        _, mtime_ns, size, offset, length = record
+        return (mtime_ns, size), self._map[offset:offset + length]
+
+    def load(self, user_id: int, file_stat: Optional[Tuple[int, int]]) -> Optional[OwnerIndex]:
+        """
+        Возвращает индекс владельца, если его файлы не менялись с момента записи индекса.
+
+        :param user_id: ID владельца.
+        :param file_stat: Текущее состояние файлов владельца (mtime_ns, размер).
+        :return: Индекс владельца или None, если записи нет, она устарела или повреждена.
+        """
+        if file_stat is None or not self._count:
+            return None
+        raw = self.raw(user_id)
+        if raw is None or raw[0] != tuple(file_stat):
+            return None
+        try:
+            return OwnerIndex.decode(raw[1], user_id)
+        except ValueError as e:
+            logs.warning(
+                f"Ignored posts index entry: {str(e)}",
+                log_type="STORAGE",
+            )
+            return None
+
+    @staticmethod
+    def write(file_path: str, entries: Iterable[Tuple[int, Tuple[int, int], bytes]]) -> int:
+        """
+        Записывает файл индекса целиком: во временный файл, затем заменой.
+        Открытый ``SnapshotIndex`` этого файла нужно закрыть до записи.
+
+        :param file_path: Путь к файлу индекса.
+        :param entries: Тройки (владелец, состояние его файлов, закодированные данные).
+        :return: Количество записанных владельцев.
+        """
+        entries = sorted(entries, key=lambda entry: entry[0])
+        offset = _HEADER.size + len(entries) * _RECORD.size
+        table = bytearray(_HEADER.pack(_MAGIC, _FORMAT, _PYTHON, len(entries)))
+        for user_id, (mtime_ns, size), data in entries:
+            table += _RECORD.pack(user_id, mtime_ns, size, offset, len(data))
+            offset += len(data)
+
+        tmp_path = f"{file_path}.tmp"
+        makedirs(path.dirname(file_path) or '.', exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(table)
+            for _, _, data in entries:
+                f.write(data)
+        replace(tmp_path, file_path)
+        return len(entries)
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Final, List, Tuple
+
+from bot.utils.formatting import html_stats
+from .models import Button, Post
+
+# Настройки экспорта
+__all__ = (
+    "MAX_TEXT_LENGTH", "MAX_ENTITIES", "MAX_BUTTONS", "MAX_ROW_BUTTONS", "MAX_CALLBACK_DATA",
+    "MAX_ALERT_LENGTH", "MAX_COPY_TEXT", "MAX_INLINE_QUERY", "MAX_RESULT_ID",
+    "PostCheck", "utf16_length", "check_text", "check_post", "sendability",
+)
+
+# Ограничения Bot API. Длины текстов — в единицах UTF-16, как их считает Telegram
+MAX_TEXT_LENGTH: Final[int] = 4096      # текст сообщения после разбора разметки
+MAX_ENTITIES: Final[int] = 100          # сущностей разметки в сообщении
+MAX_BUTTONS: Final[int] = 100           # кнопок в клавиатуре
+MAX_ROW_BUTTONS: Final[int] = 8         # кнопок в ряду
+MAX_CALLBACK_DATA: Final[int] = 64      # байт callback_data
+MAX_ALERT_LENGTH: Final[int] = 200      # текст ответа на нажатие кнопки
+MAX_COPY_TEXT: Final[int] = 256         # текст кнопки копирования
+MAX_INLINE_QUERY: Final[int] = 256      # запрос кнопок переключения в инлайн-режим
+MAX_RESULT_ID: Final[int] = 64          # байт идентификатора результата инлайн-запроса
+
+
+def utf16_length(text: str) -> int:
+    """Длина текста в единицах UTF-16: символы вне BMP (эмодзи) занимают две единицы."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+@dataclass(frozen=True, slots=True)
+class PostCheck:
+    """
+    Результат проверки поста на ограничения Bot API.
+
+    ``errors`` — нарушения, из-за которых сообщение с постом не будет отправлено,
+    ``inline_errors`` — нарушения, из-за которых пост нельзя отправить в инлайн-режиме.
+    """
+    text_length: int
+    entities: int
+    buttons: int
+    rows: int
+    errors: Tuple[str, ...] = ()
+    inline_errors: Tuple[str, ...] = ()
+
+    @property
+    def sendable(self) -> bool:
+        """Можно ли отправить пост сообщением."""
+        return not self.errors
+
+    @property
+    def inline_ok(self) -> bool:
+        """Можно ли отправить пост в инлайн-режиме."""
+        return not self.errors and not self.inline_errors
+
+
+def check_text(text: str, image: bool = False) -> Tuple[int, int, List[str]]:
+    """
+    Проверяет текст поста в разметке HTML.
+
+    :param text: Текст поста.
+    :param image: Есть ли у поста изображение: ссылка на него добавляет символ и сущность.
+    :return: Длина текста после разбора разметки (UTF-16), число сущностей и список ошибок.
+    """
+    plain, entities = html_stats(text)
+    length = utf16_length(plain) + image
+    entities += image
+    errors: List[str] = []
+    if not length:
+        errors.append("Текст поста пуст")
+    elif length > MAX_TEXT_LENGTH:
+        errors.append(f"Текст поста длиннее {MAX_TEXT_LENGTH} символов: {length}")
+    if entities > MAX_ENTITIES:
+        errors.append(f"В тексте больше {MAX_ENTITIES} элементов разметки: {entities}")
+    return length, entities, errors
+
+
+def _check_button(button: Button) -> List[str]:
+    """Проверяет поля кнопки, которые уходят в Bot API."""
+    errors: List[str] = []
+    label = f"Кнопка «{button.text}»"
+    if button.copy_text is not None:
+        if not 1 <= len(button.copy_text) <= MAX_COPY_TEXT:
+            errors.append(f"{label}: текст для копирования должен быть от 1 до {MAX_COPY_TEXT} символов")
+    elif button.callback_data is not None and button.url is None:
+        if len(button.callback_data.encode()) > MAX_CALLBACK_DATA:
+            errors.append(f"{label}: callback_data длиннее {MAX_CALLBACK_DATA} байт")
+    for query in (button.switch_inline_query, button.switch_inline_query_current_chat):
+        if query is not None and len(query) > MAX_INLINE_QUERY:
+            errors.append(f"{label}: инлайн-запрос длиннее {MAX_INLINE_QUERY} символов")
+    notification = button.notification
+    if notification is not None:
+        for text in (notification.text, notification.unauthorized_message):
+            if text is not None and len(text) > MAX_ALERT_LENGTH:
+                errors.append(f"{label}: уведомление длиннее {MAX_ALERT_LENGTH} символов")
+    return errors
+
+
+def check_post(post: Post) -> PostCheck:
+    """
+    Проверяет пост на ограничения Bot API: длину текста и число сущностей,
+    размер клавиатуры, поля кнопок и идентификатор для инлайн-режима.
+    Кнопки проверяются с уже назначенными хранилищем callback_data.
+
+    :param post: Пост.
+    :return: Результат проверки.
+    """
+    length, entities, errors = check_text(post.text, post.image.startswith("http"))
+
+    buttons = 0
+    for row in post.buttons:
+        buttons += len(row)
+        if len(row) > MAX_ROW_BUTTONS:
+            errors.append(f"В ряду больше {MAX_ROW_BUTTONS} кнопок: {len(row)}")
+        for button in row:
+            errors.extend(_check_button(button))
+    if buttons > MAX_BUTTONS:
+        errors.append(f"У поста больше {MAX_BUTTONS} кнопок: {buttons}")
+
+    inline_errors: Tuple[str, ...] = ()
+    if len(post.post_id.encode()) > MAX_RESULT_ID:
+        inline_errors = (f"ID поста длиннее {MAX_RESULT_ID} байт",)
+
+    return PostCheck(
+        text_length=length,
+        entities=entities,
+        buttons=buttons,
+        rows=len(post.buttons),
+        errors=tuple(errors),
+        inline_errors=inline_errors,
+    )
+
+
+def sendability(post: Post) -> PostCheck:
+    """
+    Возвращает результат проверки поста, проверяя его только при первом обращении.
+    Хранилище проверяет посты при сохранении, а прочитанные с диска — при первом обращении
+    через этот вызов; пока тело поста в кэше хранилища, это чтение готового значения.
+    """
+    check = post.check
+    if check is None:
+        check = post.check = check_post(post)
+    return check
@@ -0,0 +1,274 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Union
+
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    SwitchInlineQueryChosenChat,
+    CopyTextButton,
+)
+
+if TYPE_CHECKING:
+    from .limits import PostCheck
+
+# Настройки экспорта
+__all__ = ("Notification", "Button", "Post", "PostMeta")
+
+
+def _opt_int(data: Dict[str, Any], key: str) -> Optional[int]:
+    """Достаёт необязательное неотрицательное целое поле, проверяя его тип."""
+    value = data.get(key)
+    if value is None:
+        return value
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"Field '{key}' must be a non-negative int")
+    return value
+
+
+def _opt_str(data: Dict[str, Any], key: str) -> Optional[str]:
+    """Достаёт необязательное строковое поле, проверяя его тип."""
+    value = data.get(key)
+    if value is None or isinstance(value, str):
+        return value
+    raise ValueError(f"Field '{key}' must be a string, got {type(value).__name__}")
+
+
+@dataclass(slots=True)
+class Notification:
+    """Уведомление, показываемое при нажатии на кнопку."""
+    text: str
+    show_alert: bool = False
+    allowed_ids: Optional[FrozenSet[int]] = None
+    unauthorized_message: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Button:
+    """Кнопка поста. Ровно одно действие: ссылка, копирование, инлайн-режим или callback."""
+    text: str
+    url: Optional[str] = None
+    callback_data: Optional[str] = None
+    copy_text: Optional[str] = None
+    switch_inline_query: Optional[str] = None
+    switch_inline_query_current_chat: Optional[str] = None
+    switch_inline_query_chosen_chat: Optional[Union[str, Dict[str, Any]]] = None
+    notification: Optional[Notification] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Button":
+        """
+        Создаёт кнопку из словаря формата хранилища.
+
+        :raises ValueError: Если словарь не описывает кнопку.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Button must be a dict, got {type(data).__name__}")
+        text = _opt_str(data, "text")
+        if not text:
+            raise ValueError("Button text is empty")
+
+        chosen = data.get("switch_inline_query_chosen_chat")
+        if chosen is not None and not isinstance(chosen, (str, dict)):
+            raise ValueError("Field 'switch_inline_query_chosen_chat' must be a string or dict")
+
+        notification = None
+        if data.get("notification") is not None:
+            allowed = data.get("allowed_ids")
+            if allowed is not None and not (
+                isinstance(allowed, list) and all(isinstance(i, int) for i in allowed)
+            ):
+                raise ValueError("Field 'allowed_ids' must be a list of ints")
+            notification = Notification(
+                text=str(data["notification"]),
+                show_alert=bool(data.get("show_alert", False)),
+                allowed_ids=frozenset(allowed) if allowed is not None else None,
+                unauthorized_message=_opt_str(data, "unauthorized_message"),
+            )
+
+        return cls(
+            text=text,
+            url=_opt_str(data, "url"),
+            callback_data=_opt_str(data, "callback_data"),
+            copy_text=_opt_str(data, "copy_text"),
+            switch_inline_query=_opt_str(data, "switch_inline_query"),
+            switch_inline_query_current_chat=_opt_str(data, "switch_inline_query_current_chat"),
+            switch_inline_query_chosen_chat=chosen,
+            notification=notification,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает кнопку в формате хранилища, без пустых полей."""
+        data: Dict[str, Any] = {"text": self.text}
+        for name in ("url", "callback_data", "copy_text", "switch_inline_query",
+                     "switch_inline_query_current_chat", "switch_inline_query_chosen_chat"):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self.notification is not None:
+            data["notification"] = self.notification.text
+            data["show_alert"] = self.notification.show_alert
+            if self.notification.allowed_ids is not None:
+                data["allowed_ids"] = sorted(self.notification.allowed_ids)
+            if self.notification.unauthorized_message is not None:
+                data["unauthorized_message"] = self.notification.unauthorized_message
+        return data
+
+    def as_inline(self) -> Optional[InlineKeyboardButton]:
+        """
+        Создаёт InlineKeyboardButton для отправки.
+        Ссылка, оканчивающаяся на "void", превращается в callback_data="void".
+        """
+        if self.copy_text is not None:
+            return InlineKeyboardButton(text=self.text, copy_text=CopyTextButton(text=self.copy_text))
+        if self.switch_inline_query is not None:
+            return InlineKeyboardButton(text=self.text, switch_inline_query=self.switch_inline_query)
+        if self.switch_inline_query_current_chat is not None:
+            return InlineKeyboardButton(
+                text=self.text,
+                switch_inline_query_current_chat=self.switch_inline_query_current_chat
+            )
+        if self.switch_inline_query_chosen_chat is not None:
+            query = self.switch_inline_query_chosen_chat
+            cfg = query if isinstance(query, dict) else {"query": query}
+            return InlineKeyboardButton(
+                text=self.text,
+                switch_inline_query_chosen_chat=SwitchInlineQueryChosenChat(
+                    query=cfg.get("query", ""),
+                    allow_user_chats=cfg.get("allow_user_chats", True),
+                    allow_group_chats=cfg.get("allow_group_chats", True),
+                    allow_channel_chats=cfg.get("allow_channel_chats", True),
+                    allow_bot_chats=cfg.get("allow_bot_chats", False),
+                )
+            )
+        if self.url is not None:
+            if self.url.lower().endswith("void"):
+                return InlineKeyboardButton(text=self.text, callback_data="void")
+            return InlineKeyboardButton(text=self.text, url=self.url)
+        if self.callback_data is not None:
+            return InlineKeyboardButton(text=self.text, callback_data=self.callback_data)
+        return None
+
+
+@dataclass(slots=True)
+class Post:
+    """
+    Пост пользователя.
+    ``key`` — короткий числовой ключ, уникальный в пределах владельца; используется в callback_data.
+    ``created_at``/``updated_at`` — время создания и изменения (unix-время, секунды),
+    ``revision`` — номер изменения поста; у постов, сохранённых до их появления, не заданы.
+    ``check`` — результат проверки на ограничения Bot API (см. ``limits.sendability``); не сохраняется.
+    """
+    post_id: str
+    user_id: Optional[int] = None
+    text: str = ""
+    image: str = ""
+    private: bool = False
+    buttons: List[List[Button]] = field(default_factory=list)
+    key: Optional[int] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    revision: int = 0
+    check: Optional["PostCheck"] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, post_id: str, data: Dict[str, Any], user_id: Optional[int] = None) -> "Post":
+        """
+        Создаёт пост из словаря формата хранилища. Ряд из одной кнопки-словаря
+        допускается и оборачивается в список.
+
+        :param post_id: Идентификатор поста.
+        :param data: Словарь поста.
+        :param user_id: Владелец поста, если он не записан в словаре.
+        :raises ValueError: Если словарь не описывает пост.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Post must be a dict, got {type(data).__name__}")
+
+        owner = data.get("user_id")
+        if owner is None:
+            owner = user_id
+        if owner is not None and not isinstance(owner, int):
+            raise ValueError("Field 'user_id' must be an int")
+
+        key = _opt_int(data, "key")
+
+        raw_buttons = data.get("buttons") or []
+        if not isinstance(raw_buttons, list):
+            raise ValueError("Field 'buttons' must be a list")
+        buttons = [
+            [Button.from_dict(b) for b in (row if isinstance(row, list) else [row])]
+            for row in raw_buttons
+        ]
+
+        return cls(
+            post_id=post_id,
+            user_id=owner,
+            text=_opt_str(data, "text") or "",
+            image=_opt_str(data, "image") or "",
+            private=bool(data.get("private", False)),
+            buttons=[row for row in buttons if row],
+            key=key,
+            created_at=_opt_int(data, "created_at"),
+            updated_at=_opt_int(data, "updated_at"),
+            revision=_opt_int(data, "revision") or 0,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает пост в формате хранилища."""
+        data: Dict[str, Any] = {
+            "post_id": self.post_id,
+            "user_id": self.user_id,
+            "text": self.text,
+            "image": self.image,
+            "private": self.private,
+            "buttons": [[b.to_dict() for b in row] for row in self.buttons],
+        }
+        if self.key is not None:
+            data["key"] = self.key
+        if self.created_at is not None:
+            data["created_at"] = self.created_at
+        if self.updated_at is not None:
+            data["updated_at"] = self.updated_at
+        if self.revision:
+            data["revision"] = self.revision
+        return data
+
+    def iter_buttons(self):
+        """Перебирает кнопки поста вместе с их позицией (ряд, колонка)."""
+        for row_idx, row in enumerate(self.buttons):
+            for col_idx, button in enumerate(row):
+                yield row_idx, col_idx, button
+
+    def inline_rows(self) -> List[List[InlineKeyboardButton]]:
+        """Возвращает ряды инлайн-кнопок поста, пропуская кнопки без действия."""
+        rows: List[List[InlineKeyboardButton]] = []
+        for row in self.buttons:
+            kb_row = [btn for btn in (b.as_inline() for b in row) if btn is not None]
+            if kb_row:
+                rows.append(kb_row)
+        return rows
+
+    def markup(self) -> Optional[InlineKeyboardMarkup]:
+        """Возвращает клавиатуру поста или None, если кнопок нет."""
+        rows = self.inline_rows()
+        return InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
+@dataclass(frozen=True, slots=True)
+class PostMeta:
+    """
+    Метаданные поста, которые хранятся в памяти для всех постов: их достаточно для списков,
+    поиска по идентификатору и проверки видимости. Текст и кнопки поста (``Post``)
+    читаются отдельно, по запросу.
+    """
+    post_id: str
+    user_id: Optional[int]
+    key: Optional[int]
+    private: bool = False
+    created_at: Optional[int] = None
+    revision: int = 0
+
+    @classmethod
+    def of(cls, post: Post) -> "PostMeta":
+        """Возвращает метаданные поста."""
+        return cls(post.post_id, post.user_id, post.key, post.private, post.created_at, post.revision)
@@ -0,0 +1,97 @@
+from sys import intern
+from typing import Dict, Iterable, KeysView, Optional, Tuple
+
+from .models import Notification, Post
+
+# Настройки экспорта
+__all__ = ("NotificationIndex", "post_notifications")
+
+
+def post_notifications(post: Post) -> Tuple[Tuple[str, Notification], ...]:
+    """
+    Возвращает уведомления кнопок поста.
+
+    :param post: Пост с уже нормализованными callback_data.
+    :return: Пары (callback_data, уведомление).
+    """
+    return tuple(
+        (button.callback_data, button.notification) for _, _, button in post.iter_buttons()
+        if button.notification is not None and button.callback_data
+    )
+
+
+class NotificationIndex:
+    """
+    Индекс уведомлений кнопок: callback_data → уведомление.
+
+    Ключи интернируются, уведомления хранятся в единственном экземпляре,
+    а обратная карта post_id → ключи позволяет обновлять индекс по одному посту.
+    """
+    __slots__ = ("_by_key", "_by_post")
+
+    def __init__(self) -> None:
+        self._by_key: Dict[str, Notification] = {}
+        self._by_post: Dict[str, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, callback_data: str) -> bool:
+        return callback_data in self._by_key
+
+    def get(self, callback_data: str) -> Optional[Notification]:
+        """Возвращает уведомление по callback_data за один поиск в словаре."""
+        return self._by_key.get(callback_data)
+
+    def register_post(self, post: Post) -> int:
+        """
+        Заменяет уведомления поста актуальными.
+
+        :param post: Пост с уже нормализованными callback_data.
+        :return: Количество зарегистрированных уведомлений.
+        """
+        return self.register(post.post_id, post_notifications(post))
+
+    def register(self, post_id: str, entries: Iterable[Tuple[str, Notification]]) -> int:
+        """
+        Заменяет уведомления поста переданными.
+
+        :param post_id: Идентификатор поста.
+        :param entries: Пары (callback_data, уведомление).
+        :return: Количество зарегистрированных уведомлений.
+        """
+        self.drop_post(post_id)
+        keys = []
+        for callback_data, notification in entries:
+            key = intern(callback_data)
+            self._by_key[key] = notification
+            keys.append(key)
+        if keys:
+            self._by_post[post_id] = tuple(keys)
+        return len(keys)
+
+    @property
+    def posts(self) -> KeysView[str]:
+        """Идентификаторы постов, у которых есть уведомления."""
+        return self._by_post.keys()
+
+    def entries(self, post_id: str) -> Tuple[Tuple[str, Notification], ...]:
+        """Возвращает уведомления поста: пары (callback_data, уведомление)."""
+        return tuple((key, self._by_key[key]) for key in self._by_post.get(post_id, ()) if key in self._by_key)
+
+    def drop_post(self, post_id: str) -> int:
+        """
+        Удаляет все уведомления поста.
+
+        :param post_id: Идентификатор поста.
+        :return: Количество удалённых уведомлений.
+        """
+        keys = self._by_post.pop(post_id, ())
+        for key in keys:
+            self._by_key.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self._by_key.clear()
+        self._by_post.clear()
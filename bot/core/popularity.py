@@ -0,0 +1,154 @@
+import json
+from asyncio import CancelledError, Task, create_task, sleep
+from math import exp, log
+from os import makedirs, path, replace
+from time import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from configs.config import Popularity
+from bot.loggers import logs
+
+# Настройки экспорта
+__all__ = ("PopularityCounters", "popularity", )
+
+# Показатель роста, после которого счётчики пересчитываются к новой точке отсчёта
+_REBASE_EXPONENT: float = 50.0
+# Счётчики, затухшие ниже этого значения (≈ одно использование 7 периодов назад), удаляются
+_MIN_SCORE: float = 0.01
+
+
+class PopularityCounters:
+    """
+    Счётчики использования постов с экспоненциальным затуханием.
+
+    Использование поста (выбор его в инлайн-режиме) добавляет к счётчику единицу,
+    и каждые ``half_life`` секунд вклад уменьшается вдвое. Счётчики хранятся
+    относительно точки отсчёта ``t0``: запись — O(1) и не трогает остальные посты,
+    а порядок по сохранённым значениям совпадает с порядком по затухшим.
+
+    Порядок для поиска (``ranks``) пересчитывается пачкой при сохранении на диск,
+    раз в ``flush_interval`` секунд, поэтому кэш инлайн-ответов не сбрасывается
+    на каждое использование.
+    """
+
+    def __init__(self, file_path: str = Popularity.FILE, half_life: float = Popularity.HALF_LIFE,
+                 flush_interval: float = Popularity.FLUSH_INTERVAL) -> None:
+        """
+        :param file_path: Файл, в котором сохраняются счётчики.
+        :param half_life: Период полураспада счётчика в секундах.
+        :param flush_interval: Интервал сохранения и пересчёта порядка в секундах.
+        """
+        self.file_path = str(file_path)
+        self.rate = log(2) / half_life
+        self.flush_interval = flush_interval
+        self._t0: float = time()
+        self._scores: Dict[str, float] = {}
+        self._dirty: bool = False
+        self._task: Optional[Task] = None
+
+        # Опубликованный порядок: post_id → затухший счётчик на момент пересчёта
+        self.ranks: Mapping[str, float] = MappingProxyType({})
+        # Номер версии порядка; растёт с каждым пересчётом
+        self.version: int = 0
+
+    def record(self, post_id: str, now: Optional[float] = None) -> None:
+        """Засчитывает использование поста."""
+        now = time() if now is None else now
+        if self.rate * (now - self._t0) > _REBASE_EXPONENT:
+            self._rebase(now)
+        self._scores[post_id] = self._scores.get(post_id, 0.0) + exp(self.rate * (now - self._t0))
+        self._dirty = True
+
+    def score(self, post_id: str, now: Optional[float] = None) -> float:
+        """Возвращает текущее затухшее значение счётчика поста."""
+        now = time() if now is None else now
+        return self._scores.get(post_id, 0.0) * exp(-self.rate * (now - self._t0))
+
+    def _rebase(self, now: float) -> None:
+        """Переносит точку отсчёта в ``now`` и удаляет затухшие счётчики."""
+        factor = exp(-self.rate * (now - self._t0))
+        self._scores = {pid: s * factor for pid, s in self._scores.items() if s * factor >= _MIN_SCORE}
+        self._t0 = now
+
+    def publish(self, now: Optional[float] = None) -> bool:
+        """
+        Пересчитывает порядок для поиска по накопленным использованиям.
+
+        :return: Изменился ли порядок.
+        """
+        if not self._dirty:
+            return False
+        now = time() if now is None else now
+        self._rebase(now)
+        self.ranks = MappingProxyType(dict(self._scores))
+        self.version += 1
+        return True
+
+    def load(self) -> None:
+        """Загружает счётчики из файла, если он есть."""
+        try:
+            if not path.isfile(self.file_path):
+                return
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._t0 = float(raw["t0"])
+            self._scores = {str(pid): float(s) for pid, s in raw["scores"].items()}
+        except Exception as e:
+            logs.error(
+                f"Error loading popularity from {self.file_path}: {str(e)}",
+                log_type="STORAGE",
+            )
+            return
+        self._dirty = True
+        self.publish()
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Пересчитывает порядок и, если были использования, сохраняет счётчики на диск."""
+        if not self.publish():
+            return
+        tmp_path = f"{self.file_path}.tmp"
+        try:
+            makedirs(path.dirname(self.file_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"t0": self._t0, "scores": self._scores}, f, ensure_ascii=False)
+            replace(tmp_path, self.file_path)
+        except Exception as e:
+            logs.error(
+                f"Error saving popularity to {self.file_path}: {str(e)}",
+                log_type="STORAGE",
+            )
+            return
+        self._dirty = False
+        logs.debug(
+            f"Saved popularity of {len(self._scores)} posts",
+            log_type="STORAGE",
+        )
+
+    async def start(self) -> None:
+        """Загружает счётчики и запускает периодическое сохранение."""
+        if self._task is None or self._task.done():
+            self.load()
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает периодическое сохранение и сохраняет накопленное."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except CancelledError:
+                pass
+        self.flush()
+
+    async def _run(self) -> None:
+        """Цикл периодического сохранения."""
+        while True:
+            await sleep(self.flush_interval)
+            self.flush()
+
+
+# Счётчики популярности постов бота
+popularity: PopularityCounters = PopularityCounters()
@@ -0,0 +1,82 @@
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+
+from configs.config import Project
+
+# Настройки экспорта
+__all__ = ("IdReservations",)
+
+
+class IdReservations:
+    """
+    Реестр идентификаторов постов, закреплённых за черновиками пользователей.
+
+    Пользователь держит не больше одного идентификатора: новая бронь снимает прежнюю.
+    Бронь истекает через ``ttl`` секунд после последнего закрепления. Методы не содержат
+    ожиданий, поэтому в цикле событий каждый вызов выполняется атомарно, без блокировок.
+    Брони хранятся в порядке истечения, и устаревшие снимаются с начала за O(1) в среднем.
+    """
+    __slots__ = ("ttl", "_clock", "_by_id", "_by_user")
+
+    def __init__(self, ttl: float = Project.RESERVE_TTL, clock: Callable[[], float] = monotonic) -> None:
+        """
+        :param ttl: Время жизни брони в секундах.
+        :param clock: Источник времени.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        # post_id → (владелец брони, момент истечения); порядок вставки совпадает с порядком истечения
+        self._by_id: Dict[str, Tuple[int, float]] = {}
+        self._by_user: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._by_id)
+
+    def _expire(self) -> None:
+        """Снимает истёкшие брони."""
+        now = self._clock()
+        while self._by_id:
+            post_id, (user_id, expires) = next(iter(self._by_id.items()))
+            if expires > now:
+                break
+            del self._by_id[post_id]
+            if self._by_user.get(user_id) == post_id:
+                del self._by_user[user_id]
+
+    def holder(self, post_id: str) -> Optional[int]:
+        """Возвращает пользователя, за которым закреплён идентификатор, или None."""
+        self._expire()
+        entry = self._by_id.get(post_id)
+        return entry[0] if entry is not None else None
+
+    def reserve(self, post_id: str, user_id: int) -> bool:
+        """
+        Закрепляет идентификатор за пользователем или продлевает его бронь.
+
+        :param post_id: Идентификатор поста.
+        :param user_id: ID пользователя.
+        :return: False, если идентификатор закреплён за другим пользователем.
+        """
+        holder = self.holder(post_id)
+        if holder is not None and holder != user_id:
+            return False
+        self.release(user_id)
+        self._by_id[post_id] = (user_id, self._clock() + self.ttl)
+        self._by_user[user_id] = post_id
+        return True
+
+    def release(self, user_id: int, post_id: Optional[str] = None) -> bool:
+        """
+        Снимает бронь пользователя.
+
+        :param user_id: ID пользователя.
+        :param post_id: Снять бронь, только если она на этот идентификатор.
+        :return: Была ли снята бронь.
+        """
+        held = self._by_user.get(user_id)
+        if held is None or (post_id is not None and held != post_id):
+            return False
+        del self._by_user[user_id]
+        self._by_id.pop(held, None)
+        return True
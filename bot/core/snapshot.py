@@ -0,0 +1,140 @@
+from itertools import chain
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, Optional, Tuple
+
+from bot.utils.persistent import PersistentMap
+from .models import PostMeta
+
+# Настройки экспорта
+__all__ = ("PostsSnapshot",)
+
+
+class PostsSnapshot:
+    """
+    Неизменяемый снимок метаданных постов хранилища.
+
+    Читатели берут текущий снимок и работают с ним без блокировок: снимок не меняется,
+    поэтому перебор не ломается от параллельных записей и видит согласованное состояние.
+    Писатели строят новый снимок (``evolve``, ``put``, ``remove``) и публикуют его одним
+    присваиванием. Снимок разбит на части по владельцам (``owners``, ``keys``), а поиск
+    по идентификатору идёт через ``posts``; все три словаря — ``PersistentMap``. Новая
+    версия копирует только часть изменённого владельца и путь к посту в ``posts``,
+    а остальное делит с предыдущей, поэтому запись одного поста не зависит от общего
+    числа постов. Тексты и кнопки постов в снимок не входят: хранилище читает их по запросу.
+    """
+    __slots__ = ("version", "posts", "owners", "keys")
+
+    def __init__(self, owners: Optional[Mapping[int, Mapping[str, PostMeta]]] = None, version: int = 0) -> None:
+        """
+        Строит снимок целиком; идентификаторы постов уникальны между владельцами.
+
+        :param owners: Метаданные постов по владельцам: владелец → {post_id: метаданные}.
+        :param version: Номер версии; растёт с каждой публикацией.
+        """
+        owners = owners or {}
+        self.version: int = version
+        # post_id → метаданные
+        self.posts: PersistentMap[str, PostMeta] = PersistentMap(
+            {pid: post for owner_posts in owners.values() for pid, post in owner_posts.items()}
+        )
+        # Владелец → метаданные его постов; кортеж перебирается быстрее словаря
+        self.owners: PersistentMap[int, Tuple[PostMeta, ...]] = PersistentMap(
+            {user_id: tuple(owner_posts.values()) for user_id, owner_posts in owners.items()}
+        )
+        # Реестр числовых ключей: владелец → {ключ поста: post_id}
+        self.keys: PersistentMap[int, Mapping[int, str]] = PersistentMap(
+            {user_id: _owner_keys(owner_posts) for user_id, owner_posts in owners.items()}
+        )
+
+    @classmethod
+    def _of(cls, posts: PersistentMap, owners: PersistentMap, keys: PersistentMap, version: int) -> "PostsSnapshot":
+        """Создаёт снимок из готовых словарей."""
+        snapshot = cls.__new__(cls)
+        snapshot.version = version
+        snapshot.posts = posts
+        snapshot.owners = owners
+        snapshot.keys = keys
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def __iter__(self) -> Iterator[PostMeta]:
+        """
+        Перебирает метаданные всех постов по владельцам.
+        Перебор идёт по кортежам владельцев целиком и заметно быстрее ``posts.values()``.
+        """
+        return chain.from_iterable(self.owners.values())
+
+    def owner_posts(self, user_id: int) -> Iterable[str]:
+        """Возвращает идентификаторы постов владельца, известные снимку."""
+        return [post.post_id for post in self.owners.get(user_id, ())]
+
+    def evolve(self, owners: Mapping[int, Optional[Mapping[str, PostMeta]]]) -> "PostsSnapshot":
+        """
+        Строит следующую версию снимка, в которой посты владельцев заменены целиком.
+
+        :param owners: Владелец → метаданные его постов; None убирает владельца из снимка.
+        :return: Новый снимок; текущий не изменяется.
+        """
+        posts, shards, keys = self.posts, self.owners, self.keys
+        for user_id, owner_posts in owners.items():
+            for pid in self.owner_posts(user_id):
+                current = posts.get(pid)
+                if current is not None and current.user_id == user_id:
+                    posts = posts.delete(pid)
+            if owner_posts is None:
+                shards = shards.delete(user_id)
+                keys = keys.delete(user_id)
+                continue
+            for pid, post in owner_posts.items():
+                posts = posts.set(pid, post)
+            shards = shards.set(user_id, tuple(owner_posts.values()))
+            keys = keys.set(user_id, _owner_keys(owner_posts))
+        return self._of(posts, shards, keys, self.version + 1)
+
+    def put(self, post: PostMeta) -> "PostsSnapshot":
+        """
+        Строит следующую версию снимка с добавленным или заменённым постом.
+
+        :param post: Метаданные поста с назначенными владельцем и ключом.
+        :return: Новый снимок; текущий не изменяется.
+        """
+        owner_posts = self.owners.get(post.user_id, ())
+        current = self.posts.get(post.post_id)
+        if current is not None and current.user_id == post.user_id:
+            owner_posts = tuple(post if meta.post_id == post.post_id else meta for meta in owner_posts)
+        else:
+            owner_posts += (post,)
+        owner_keys = dict(self.keys.get(post.user_id, {}))
+        owner_keys[post.key] = post.post_id
+        return self._of(
+            self.posts.set(post.post_id, post),
+            self.owners.set(post.user_id, owner_posts),
+            self.keys.set(post.user_id, MappingProxyType(owner_keys)),
+            self.version + 1,
+        )
+
+    def remove(self, post_id: str) -> "PostsSnapshot":
+        """
+        Строит следующую версию снимка без поста.
+
+        :param post_id: Идентификатор поста.
+        :return: Новый снимок; текущий, если поста нет.
+        """
+        post = self.posts.get(post_id)
+        if post is None:
+            return self
+        owner_posts = tuple(meta for meta in self.owners.get(post.user_id, ()) if meta.post_id != post_id)
+        owner_keys = {key: pid for key, pid in self.keys.get(post.user_id, {}).items() if pid != post_id}
+        return self._of(
+            self.posts.delete(post_id),
+            self.owners.set(post.user_id, owner_posts),
+            self.keys.set(post.user_id, MappingProxyType(owner_keys)),
+            self.version + 1,
+        )
+
+
+def _owner_keys(owner_posts: Mapping[str, PostMeta]) -> Mapping[int, str]:
+    """Собирает реестр ключей владельца: {ключ поста: post_id}."""
+    return MappingProxyType({post.key: pid for pid, post in owner_posts.items()})
@@ -1,23 +1,109 @@
 import json
-from os import path, makedirs, listdir
-from typing import Any, Dict, List, Optional
-from configs.config import Project
+from asyncio import Task, ensure_future, shield
+from os import path, makedirs, remove, scandir, stat
+from time import time
+from typing import Any, Dict, Final, Iterable, List, Mapping, Optional, Set, Tuple
+from configs.config import Project, Tasks
 from bot.loggers import logs
+from .bodies import BodyCache
+from .callbacks import AlertCallback, alert_owner
+from .index import INDEX_FILE, OwnerIndex, SnapshotIndex
+from .limits import PostCheck, check_post
+from .models import Notification, Post, PostMeta
+from .notifications import NotificationIndex
+from .reservations import IdReservations
+from .snapshot import PostsSnapshot
+from .tasks import TaskRunner, tasks
 
 # Настройки экспорта
-__all__ = ("storage", )
+__all__ = ("PostStorage", "storage", "PostIdTaken", "PostLimitsExceeded", "StorageError", )
+
+# Журнал меньше этого размера не сворачивается, даже если он больше основного файла
+JOURNAL_COMPACT_BYTES: Final[int] = 64 * 1024
+
+
+class PostIdTaken(ValueError):
+    """Идентификатор поста занят постом или бронью другого пользователя."""
+
+    def __init__(self, post_id: str) -> None:
+        """
+        :param post_id: Занятый идентификатор.
+        """
+        super().__init__(f"Идентификатор поста {post_id} уже занят")
+        self.post_id = post_id
+
+
+class PostLimitsExceeded(ValueError):
+    """Пост нарушает ограничения Bot API и не будет принят Telegram."""
+
+    def __init__(self, post_id: str, check: PostCheck) -> None:
+        """
+        :param post_id: Идентификатор поста.
+        :param check: Результат проверки с причинами.
+        """
+        super().__init__(f"Пост {post_id} нарушает ограничения Bot API: {'; '.join(check.errors)}")
+        self.post_id = post_id
+        self.check = check
+
+
+class StorageError(OSError):
+    """Изменение поста не удалось записать на диск."""
+
 
 class PostStorage:
-    """Класс для управления хранением постов и связанных уведомлений."""
+    """
+    Класс для управления хранением постов и связанных уведомлений.
+
+    В памяти постоянно хранятся только метаданные всех постов (``snapshot``) и индекс
+    уведомлений; тексты и кнопки читаются с диска по запросу (``get_post``) и держатся
+    в кэше ограниченного объёма (``bodies``). Метаданные и уведомления сохраняются
+    в файл индекса (``write_index``), из которого владельцы с неизменёнными файлами
+    загружаются без разбора их файлов.
+    """
 
-    def __init__(self, posts_dir: str = Project.POSTS_DIR):
+    def __init__(self, posts_dir: str = Project.POSTS_DIR, preload: bool = Project.PRELOAD_POSTS,
+                 use_index: bool = Project.INDEX_POSTS):
         self.posts_dir = posts_dir
-        self.global_posts: Dict[str, Dict[str, Any]] = {}
-        self.notifications: Dict[str, Dict[str, Any]] = {}
-        self.alert_texts: Dict[str, Dict[str, Any]] = {}
+        self.use_index = use_index
+        # Файл индекса, открытый для текущей директории постов
+        self._index: Optional[SnapshotIndex] = None
+        # Текущий снимок метаданных постов: читатели берут его целиком, писатели публикуют новый
+        self._snapshot: PostsSnapshot = PostsSnapshot()
+        # Тела недавно использованных постов
+        self.bodies: BodyCache = BodyCache()
+        self.notifications: NotificationIndex = NotificationIndex()
+        # Идентификаторы, закреплённые за черновиками постов
+        self.reservations: IdReservations = IdReservations()
+
+        # Владельцы, в основном файле которых нет постов старого формата без ключа
+        self._keyed_owners: Set[int] = set()
+        # Владельцы, чьи файлы уже загружены в память, и признак полной загрузки
+        self._loaded_owners: Set[int] = set()
+        self._all_loaded: bool = False
+        # Состояние файлов (mtime_ns, размер), по которому загружены посты владельцев
+        self._file_stats: Dict[int, Tuple[int, int]] = {}
+        self._refresh_task: Optional[Task] = None
 
         self._ensure_posts_dir()
-        self.load_all_posts()
+        # Файл индекса только отображается в память: владельцы декодируются по мере загрузки
+        self._open_index()
+        if preload:
+            self.load_all_posts()
+
+    @property
+    def snapshot(self) -> PostsSnapshot:
+        """Текущий неизменяемый снимок метаданных постов."""
+        return self._snapshot
+
+    @property
+    def global_posts(self) -> Mapping[str, PostMeta]:
+        """Метаданные постов текущего снимка, только для чтения: post_id → метаданные."""
+        return self._snapshot.posts
+
+    @property
+    def post_keys(self) -> Mapping[int, Mapping[int, str]]:
+        """Реестр числовых ключей текущего снимка: владелец → {ключ поста: post_id}."""
+        return self._snapshot.keys
 
     def _ensure_posts_dir(self, directory: Optional[str] = None) -> None:
         """Создаёт директорию для хранения постов, если она не существует."""
@@ -33,92 +119,196 @@ class PostStorage:
         """Возвращает путь к файлу с постами пользователя."""
         return path.join(self.posts_dir, f"posts_{user_id}.json")
 
-    def _update_button_notifications(self, callback_data: str, notification_data: Dict[str, Any]) -> None:
-        """Регистрирует данные уведомления кнопки во внутренних хранилищах."""
-        if not callback_data:
-            return
-        self.alert_texts[callback_data] = notification_data
-        self.notifications[callback_data] = notification_data
-
-    def _process_buttons(self, post_id: str, buttons: List[Any]) -> None:
+    def _stat(self, user_id: int) -> Optional[Tuple[int, int]]:
         """
-        Обрабатывает кнопки поста, нормализует callback_data и регистрирует уведомления.
-        Поддерживает различные типы кнопок: callback, url, copy, inline.
+        Возвращает состояние файлов постов владельца: наибольшее mtime_ns и суммарный размер
+        основного файла и журнала; None, если нет ни одного из них.
         """
-        if not buttons:
-            return
+        file_path = self._get_user_posts_file(user_id)
+        file_stat = None
+        for file in (file_path, journal_path(file_path)):
+            try:
+                st = stat(file)
+            except OSError:
+                continue
+            file_stat = _merge_stat(file_stat, (st.st_mtime_ns, st.st_size))
+        return file_stat
 
-        for row_idx, row in enumerate(buttons):
-            btns = row if isinstance(row, list) else [row]
-            for col_idx, button in enumerate(btns):
-                if not isinstance(button, dict):
-                    continue
+    def _get_user_seq_file(self, user_id: int) -> str:
+        """Возвращает путь к файлу со следующим свободным ключом постов пользователя."""
+        return path.join(self.posts_dir, f"posts_{user_id}.seq")
 
-                if 'callback_data' in button:
-                    cb_data = button['callback_data']
-                    if not cb_data or not (cb_data.startswith('bt_') or cb_data.startswith('show_alert_')):
-                        prefix = 'show_alert_' if button.get('show_alert') else 'bt_'
-                        button['callback_data'] = f"{prefix}{post_id}_{row_idx}_{col_idx}"
-                        cb_data = button['callback_data']
-
-                    if 'notification' in button:
-                        notification = {
-                            'text': button['notification'],
-                            'show_alert': button.get('show_alert', False),
-                            'allowed_ids': button.get('allowed_ids'),
-                            'unauthorized_message': button.get('unauthorized_message')
-                        }
-                        self._update_button_notifications(cb_data, notification)
-                        logs.debug(
-                            f"Registered notification for {cb_data}",
-                            log_type="STORAGE",
-                        )
-
-    def load_user_posts(self, user_id: int) -> Dict[str, Any]:
-        """Загружает посты пользователя из файла."""
-        file_path = self._get_user_posts_file(user_id)
+    @staticmethod
+    def _assign_keys(posts: Iterable[Post], next_key: int = 0) -> int:
+        """
+        Назначает числовые ключи постам без ключа и с повторяющимся ключом.
+        Порядок назначения совпадает с порядком постов, поэтому повторная загрузка
+        того же файла даёт те же ключи.
+
+        :param posts: Посты одного владельца.
+        :param next_key: Минимальное значение для новых ключей.
+        :return: Следующий свободный ключ.
+        """
+        posts = list(posts)
+        used: Set[int] = set()
+        for post in posts:
+            if post.key is not None:
+                next_key = max(next_key, post.key + 1)
+        for post in posts:
+            if post.key is None or post.key in used:
+                post.key = next_key
+                next_key += 1
+            used.add(post.key)
+        return next_key
+
+    def _read_seq(self, user_id: int) -> int:
+        """Читает следующий свободный ключ владельца, 0 если файла нет."""
         try:
-            if path.isfile(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    posts = json.load(f)
-                    if isinstance(posts, dict):
-                        return posts
-                    logs.warning(
-                        f"Invalid posts format in {file_path}",
-                        log_type="STORAGE",
-                    )
-        except json.JSONDecodeError as e:
-            logs.error(
-                f"JSON decode error in {file_path}: {str(e)}",
+            with open(self._get_user_seq_file(user_id), 'r', encoding='utf-8') as f:
+                return max(0, int(f.read().strip() or 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _register_post(self, post: Post) -> None:
+        """
+        Регистрирует уведомления поста с уже нормализованными callback_data.
+
+        :param post: Пост.
+        """
+        registered = self.notifications.register_post(post)
+        if registered:
+            logs.debug(
+                f"Registered {registered} notifications for post {post.post_id}",
                 log_type="STORAGE",
             )
+
+    def _publish(self, owners: Dict[int, Optional[OwnerIndex]]) -> None:
+        """
+        Заменяет посты владельцев: обновляет индекс уведомлений, убирает из кэша прежние
+        тела постов и публикует новый снимок с их метаданными.
+        Выполняется без ожиданий; читатели видят либо прежний снимок, либо новый целиком.
+
+        :param owners: Владелец → метаданные и уведомления его постов; None убирает владельца.
+        """
+        if not owners:
+            return
+        snapshot = self._snapshot
+        for user_id, owner in owners.items():
+            for pid in snapshot.owner_posts(user_id):
+                self.bodies.discard(pid)
+                self.notifications.drop_post(pid)
+            if owner is not None:
+                for pid, entries in owner.notifications.items():
+                    self.notifications.register(pid, entries)
+        self._snapshot = snapshot.evolve({
+            user_id: None if owner is None else owner.posts for user_id, owner in owners.items()
+        })
+
+    def _open_index(self) -> Optional[SnapshotIndex]:
+        """Возвращает файл индекса текущей директории постов, открывая его при первом обращении."""
+        if not self.use_index:
+            return None
+        file_path = path.join(self.posts_dir, INDEX_FILE)
+        if self._index is None or self._index.file_path != file_path:
+            if self._index is not None:
+                self._index.close()
+            self._index = SnapshotIndex(file_path)
+        return self._index
+
+    def _load_owner(self, user_id: int, file_stat: Optional[Tuple[int, int]]) -> OwnerIndex:
+        """
+        Загружает метаданные и уведомления постов владельца: из файла индекса,
+        если файлы владельца не менялись с его записи, иначе разбором файлов.
+        """
+        index = self._open_index()
+        owner = index.load(user_id, file_stat) if index is not None else None
+        if owner is None:
+            owner = OwnerIndex.of(self.load_user_posts(user_id))
+        return owner
+
+    def write_index(self) -> int:
+        """
+        Записывает файл индекса: метаданные и уведомления загруженных владельцев
+        и прежние записи владельцев, которые ещё не загружались.
+
+        :return: Количество записанных владельцев.
+        """
+        index = self._open_index()
+        if index is None:
+            return 0
+        snapshot = self._snapshot
+        entries = []
+        for user_id, file_stat in self._file_stats.items():
+            if user_id not in self._loaded_owners:
+                continue
+            owner_posts = {meta.post_id: meta for meta in snapshot.owners.get(user_id, ())}
+            owner = OwnerIndex(
+                owner_posts,
+                {pid: self.notifications.entries(pid) for pid in owner_posts if pid in self.notifications.posts},
+            )
+            entries.append((user_id, file_stat, owner.encode()))
+        for user_id, _ in index.owners():
+            if user_id not in self._loaded_owners:
+                file_stat, data = index.raw(user_id)
+                entries.append((user_id, file_stat, data))
+
+        # Данные прежних записей уже скопированы из отображения; старый индекс закрывается
+        # до замены файла: открытый и отображённый в память файл на Windows не заменить
+        file_path = index.file_path
+        index.close()
+        self._index = None
+        try:
+            written = SnapshotIndex.write(file_path, entries)
         except Exception as e:
             logs.error(
-                f"Error loading posts from {file_path}: {str(e)}",
+                f"Error writing posts index {file_path}: {str(e)}",
                 log_type="STORAGE",
             )
-        return {}
+            return 0
+        logs.info(
+            f"Wrote posts index of {written} owners",
+            log_type="STORAGE",
+        )
+        return written
 
-    def save_user_posts(self, user_id: int, posts: Dict[str, Any]) -> None:
+    def load_user_posts(self, user_id: int) -> Dict[str, Post]:
+        """
+        Загружает посты пользователя из файла и журнала изменений. Некорректные записи пропускаются.
+        Постам старого формата без ключа ключи назначаются в порядке основного файла.
         """
-        Сохраняет посты пользователя в файл и обновляет внутренние хранилища.
-        Обрабатывает кнопки и уведомления перед сохранением.
+        return read_posts_file(self._get_user_posts_file(user_id), user_id)
+
+    def save_user_posts(self, user_id: int, posts: Dict[str, Post]) -> None:
         """
-        if not isinstance(posts, dict):
+        Сохраняет все посты пользователя в файл и обновляет внутренние хранилища.
+        Обрабатывает кнопки и уведомления перед сохранением. Журнал изменений
+        владельца после записи больше не нужен и удаляется.
+        """
+        if not isinstance(posts, dict) or not all(isinstance(p, Post) for p in posts.values()):
             logs.error(
-                "Invalid posts format, expected dict",
+                "Invalid posts format, expected dict of Post",
                 log_type="STORAGE",
             )
             return
 
-        for post_id, post in posts.items():
-            if isinstance(post, dict) and 'buttons' in post:
-                self._process_buttons(post_id, post['buttons'])
+        # Новым постам выдаются ключи, не использованные ранее, даже удалёнными постами
+        seq = self._read_seq(user_id)
+        next_key = self._assign_keys(posts.values(), seq)
+
+        for post in posts.values():
+            if post.user_id is None:
+                post.user_id = user_id
+            normalize_buttons(post)
+            post.check = check_post(post)
 
         file_path = self._get_user_posts_file(user_id)
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(posts, f, ensure_ascii=False, indent=4)
+                json.dump({pid: post.to_dict() for pid, post in posts.items()}, f, ensure_ascii=False, indent=4)
+            if next_key != seq:
+                self._write_seq(user_id, next_key)
+            if path.isfile(journal_path(file_path)):
+                remove(journal_path(file_path))
             logs.info(
                 f"Saved posts for user {user_id}",
                 log_type="STORAGE",
@@ -130,107 +320,658 @@ class PostStorage:
             )
             return
 
-        # Обновление кэша: перезагружаем записи этого пользователя
-        # Удаляем старые записи
-        for pid in list(self.global_posts):
-            if pid in posts:
-                self.global_posts.pop(pid, None)
-        # Загружаем свежие
-        fresh = self.load_user_posts(user_id)
-        for pid, post in fresh.items():
-            if isinstance(post, dict) and 'buttons' in post:
-                self._process_buttons(pid, post['buttons'])
-            self.global_posts[pid] = post
+        # Обновление кэша: посты уже разобраны и проверены, перечитывать файл не нужно
+        self._keyed_owners.add(user_id)
+        self._loaded_owners.add(user_id)
+        self._set_file_stat(user_id, self._stat(user_id))
+        self._publish({user_id: OwnerIndex.of(posts)})
+
+    def _write_seq(self, user_id: int, next_key: int) -> None:
+        """Записывает следующий свободный ключ владельца."""
+        with open(self._get_user_seq_file(user_id), 'w', encoding='utf-8') as f:
+            f.write(str(next_key))
+
+    def _append_journal(self, user_id: int, record: Dict[str, Any]) -> bool:
+        """
+        Дописывает изменение в журнал владельца. Возвращает статус операции.
+
+        :param user_id: ID владельца.
+        :param record: Запись журнала: ``{"op": "put", "post": {...}}`` или ``{"op": "delete", "post_id": ...}``.
+        """
+        file_path = journal_path(self._get_user_posts_file(user_id))
+        try:
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logs.error(
+                f"Error writing journal {file_path}: {str(e)}",
+                log_type="STORAGE",
+            )
+            return False
+        self._set_file_stat(user_id, self._stat(user_id))
+        return True
+
+    def _persist_keys(self, user_id: int) -> None:
+        """
+        Перед записью в журнал владельца сохраняет в основной файл ключи его постов старого формата.
+        Такие ключи назначаются по порядку основного файла при каждом чтении; после записи
+        они хранятся с постами и не зависят от этого порядка. Файл проверяется один раз на владельца.
+        """
+        if user_id in self._keyed_owners:
+            return
+        self._keyed_owners.add(user_id)
+        file_path = self._get_user_posts_file(user_id)
+        if any(post.key is None for post in _read_base(file_path, user_id).values()):
+            self.save_user_posts(user_id, self.load_user_posts(user_id))
+            logs.info(
+                f"Persisted keys of legacy posts of user {user_id}",
+                log_type="STORAGE",
+            )
+
+    def _maybe_compact(self, user_id: int) -> None:
+        """Сворачивает журнал владельца в основной файл, когда журнал перерастает этот файл."""
+        file_path = self._get_user_posts_file(user_id)
+        try:
+            journal_size = stat(journal_path(file_path)).st_size
+        except OSError:
+            return
+        try:
+            base_size = stat(file_path).st_size
+        except OSError:
+            base_size = 0
+        if journal_size <= max(base_size, JOURNAL_COMPACT_BYTES):
+            return
+
+        # Текущее состояние владельца — основной файл с применённым журналом
+        self.save_user_posts(user_id, self.load_user_posts(user_id))
+        logs.debug(
+            f"Compacted journal of user {user_id} ({journal_size} bytes)",
+            log_type="STORAGE",
+        )
+
+    def save_post(self, user_id: int, post: Post) -> Post:
+        """
+        Создаёт или обновляет один пост владельца.
+        Записывается только изменение поста (строка журнала), индексы в памяти
+        обновляются для одного поста, без перезаписи и перечитывания всех постов владельца.
+        Для нового поста все посты должны быть загружены (``ensure_loaded``).
+
+        :param user_id: ID владельца.
+        :param post: Пост; ключ, время создания и номер изменения назначаются хранилищем.
+        :return: Сохранённый пост.
+        :raises PostIdTaken: Если идентификатор занят другим пользователем.
+        :raises PostLimitsExceeded: Если пост нарушает ограничения Bot API.
+        :raises StorageError: Если изменение не удалось записать.
+        """
+        self.fault_in(user_id)
+        self._persist_keys(user_id)
+        snapshot = self._snapshot
+        current = snapshot.posts.get(post.post_id)
+        if current is not None and current.user_id != user_id:
+            current = None
+        if current is None and not self.is_post_available(post.post_id, user_id):
+            logs.warning(
+                f"Post id {post.post_id} is already taken",
+                log_type="STORAGE",
+            )
+            raise PostIdTaken(post.post_id)
+
+        now = int(time())
+        post.user_id = user_id
+        post.updated_at = now
+        next_key: Optional[int] = None
+        if current is not None:
+            post.key = current.key
+            post.created_at = current.created_at if current.created_at is not None else now
+            post.revision = current.revision + 1
+        else:
+            # Новый ключ не совпадает ни с одним выданным ранее, даже удалённым постам
+            seq = self._read_seq(user_id)
+            floor = max((key + 1 for key in snapshot.keys.get(user_id, {})), default=0)
+            post.key = None
+            next_key = self._assign_keys([post], max(seq, floor))
+            post.created_at = now
+            post.revision = 1
+        normalize_buttons(post)
+
+        # Проверка на ограничения Bot API выполняется один раз, при сохранении:
+        # пост, который Telegram не примет, не записывается
+        post.check = check_post(post)
+        if not post.check.sendable:
+            logs.warning(
+                f"Post {post.post_id} exceeds Bot API limits: {'; '.join(post.check.errors)}",
+                log_type="STORAGE",
+            )
+            raise PostLimitsExceeded(post.post_id, post.check)
+
+        if next_key is not None:
+            try:
+                self._write_seq(user_id, next_key)
+            except Exception as e:
+                logs.error(
+                    f"Error reserving key for post {post.post_id}: {str(e)}",
+                    log_type="STORAGE",
+                )
+                raise StorageError(f"Не удалось закрепить ключ поста {post.post_id}") from e
+
+        if not self._append_journal(user_id, {"op": "put", "post": post.to_dict()}):
+            raise StorageError(f"Не удалось записать пост {post.post_id} в журнал")
+
+        # Посты владельца загружены (или файлов не было), и теперь у него есть журнал
+        self._loaded_owners.add(user_id)
+        self._register_post(post)
+        self.bodies.put(post)
+        self._snapshot = self._snapshot.put(PostMeta.of(post))
+        self.reservations.release(user_id, post.post_id)
+        logs.info(
+            f"Saved post {post.post_id} (revision {post.revision}) for user {user_id}",
+            log_type="STORAGE",
+        )
+        self._maybe_compact(user_id)
+        return post
 
     def delete_user_post(self, user_id: int, post_id: str) -> bool:
-        """Удаляет пост пользователя и связанные уведомления. Возвращает статус операции."""
-        user_posts = self.load_user_posts(user_id)
-        if post_id not in user_posts:
+        """
+        Удаляет пост пользователя и связанные уведомления. Возвращает статус операции.
+        Записывается только отметка об удалении в журнале владельца.
+        """
+        self.fault_in(user_id)
+        post = self._snapshot.posts.get(post_id)
+        if post is None or post.user_id != user_id:
             logs.warning(
                 f"Post {post_id} not found for user {user_id}",
                 log_type="STORAGE",
             )
             return False
 
-        post = user_posts.pop(post_id)
-        notification_count = 0
-        if isinstance(post.get('buttons'), list):
-            for row in post['buttons']:
-                btns = row if isinstance(row, list) else [row]
-                for button in btns:
-                    if isinstance(button, dict):
-                        cb = button.get('callback_data')
-                        if cb and cb in self.alert_texts:
-                            self.alert_texts.pop(cb)
-                            self.notifications.pop(cb, None)
-                            notification_count += 1
+        self._persist_keys(user_id)
+        if not self._append_journal(user_id, {"op": "delete", "post_id": post_id}):
+            return False
+
+        notification_count = self.notifications.drop_post(post_id)
         logs.debug(
             f"Removed {notification_count} notifications for post {post_id}",
             log_type="STORAGE",
         )
-
-        # Сохраняем и обновляем кэш
-        self.save_user_posts(user_id, user_posts)
-        self.global_posts.pop(post_id, None)
+        self.bodies.discard(post_id)
+        self._snapshot = self._snapshot.remove(post_id)
         logs.info(
             f"Deleted post {post_id} for user {user_id}",
             log_type="STORAGE",
         )
+        self._maybe_compact(user_id)
         return True
 
-    def is_post_available(self, post_id: str) -> bool:
-        """Проверяет доступность идентификатора поста."""
-        return post_id not in self.global_posts
+    def is_post_available(self, post_id: str, user_id: Optional[int] = None) -> bool:
+        """
+        Проверяет доступность идентификатора поста. Требует знания всех постов:
+        до вызова из цикла событий их нужно загрузить через ``ensure_loaded``.
 
-    def load_all_posts(self) -> None:
-        """Загружает все посты из файлов в рабочей директории."""
-        self.global_posts.clear()
-        self.alert_texts.clear()
-        self.notifications.clear()
+        :param post_id: Идентификатор поста.
+        :param user_id: Пользователь, для которого проверяется идентификатор: его собственная бронь не мешает.
+        :raises RuntimeError: Если посты ещё не загружены.
+        """
+        if not self._all_loaded:
+            # Синхронная загрузка разобрала бы файлы всех владельцев в цикле событий
+            raise RuntimeError("Посты не загружены: перед проверкой идентификатора вызовите ensure_loaded")
+        if post_id in self._snapshot.posts:
+            return False
+        holder = self.reservations.holder(post_id)
+        return holder is None or holder == user_id
 
-        self._ensure_posts_dir()
-        loaded_files = 0
-        loaded_posts = 0
+    async def reserve_id(self, post_id: str, user_id: int) -> bool:
+        """
+        Закрепляет свободный идентификатор за черновиком пользователя до подтверждения,
+        отмены или истечения брони. Прежняя бронь пользователя снимается.
+        Проверка и закрепление выполняются без ожиданий между ними, поэтому
+        два пользователя не могут получить один идентификатор.
+
+        :param post_id: Идентификатор поста.
+        :param user_id: ID пользователя.
+        :return: False, если идентификатор занят постом или чужой бронью.
+        """
+        await self.ensure_loaded()
+        if post_id in self._snapshot.posts:
+            return False
+        return self.reservations.reserve(post_id, user_id)
+
+    def release_id(self, user_id: int) -> bool:
+        """Снимает бронь идентификатора, закреплённого за черновиком пользователя."""
+        return self.reservations.release(user_id)
+
+    def fault_in(self, user_id: int) -> int:
+        """
+        Подгружает в память посты одного владельца, если они ещё не загружены.
+
+        Владелец без файлов не запоминается и не публикуется: новые пользователи и
+        callback_data с выдуманным владельцем не меняют снимок и не сбрасывают кэши читателей.
+
+        :param user_id: ID владельца.
+        :return: Количество подгруженных постов.
+        """
+        if user_id in self._loaded_owners:
+            return 0
+        # После полной загрузки все файлы известны: владельца без файла не нужно даже искать
+        if self._all_loaded and user_id not in self._file_stats:
+            return 0
+        file_stat = self._stat(user_id)
+        if file_stat is None:
+            return 0
+
+        self._loaded_owners.add(user_id)
+        self._set_file_stat(user_id, file_stat)
+        owner = self._load_owner(user_id, file_stat)
+        if not owner.posts:
+            return 0
+        self._publish({user_id: owner})
+        logs.debug(
+            f"Faulted in {len(owner.posts)} posts of user {user_id}",
+            log_type="STORAGE",
+        )
+        return len(owner.posts)
+
+    def _set_file_stat(self, user_id: int, file_stat: Optional[Tuple[int, int]]) -> None:
+        """Запоминает состояние файла, по которому загружены посты владельца."""
+        if file_stat is None:
+            self._file_stats.pop(user_id, None)
+        else:
+            self._file_stats[user_id] = file_stat
+
+    def _scan_stats(self) -> Dict[int, Tuple[int, int]]:
+        """Возвращает состояние файлов постов рабочей директории по владельцам (см. ``_stat``)."""
+        stats: Dict[int, Tuple[int, int]] = {}
+        with scandir(self.posts_dir) as entries:
+            for entry in entries:
+                filename = entry.name
+                user_id_str, ext = path.splitext(filename[len('posts_'):])
+                # Скрытые файлы — служебные (счётчики популярности, временные файлы)
+                if ext not in ('.json', '.log') or filename.startswith('.'):
+                    continue
+                try:
+                    user_id = int(user_id_str)
+                except ValueError:
+                    logs.warning(
+                        f"Invalid filename format: {filename}",
+                        log_type="STORAGE",
+                    )
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                stats[user_id] = _merge_stat(stats.get(user_id), (st.st_mtime_ns, st.st_size))
+        return stats
+
+    def _install(self, loaded: Iterable[Tuple[int, OwnerIndex]], file_stats: Dict[int, Tuple[int, int]]) -> int:
+        """
+        Строит индексы по загруженным постам и заменяет ими текущие;
+        старые остаются доступны читателям до самой замены.
+
+        :param loaded: Пары (владелец, метаданные и уведомления его постов) всех файлов.
+        :param file_stats: Состояние файлов на момент чтения.
+        :return: Количество постов.
+        """
+        owners: Dict[int, Mapping[str, PostMeta]] = {}
+        notifications = NotificationIndex()
+        for user_id, owner in loaded:
+            for pid, entries in owner.notifications.items():
+                notifications.register(pid, entries)
+            owners[user_id] = owner.posts
 
+        self._snapshot = PostsSnapshot(owners, self._snapshot.version + 1)
+        self.bodies.clear()
+        self.notifications = notifications
+        self._file_stats = file_stats
+        self._loaded_owners = set(owners)
+        self._all_loaded = True
+        return len(self._snapshot)
+
+    def load_all_posts(self) -> None:
+        """
+        Загружает все посты из файлов в рабочей директории.
+        Владельцы, чьи файлы не менялись с записи индекса, загружаются из индекса.
+        """
+        self._ensure_posts_dir()
         try:
-            for filename in listdir(self.posts_dir):
-                if filename.endswith('.json'):
-                    user_id_str = filename[len('posts_'):-len('.json')]
-                    try:
-                        user_id = int(user_id_str)
-                    except ValueError:
-                        logs.warning(
-                            f"Invalid filename format: {filename}",
-                            log_type="STORAGE",
-                        )
-                        continue
-
-                    posts = self.load_user_posts(user_id)
-                    for pid, post in posts.items():
-                        if isinstance(post, dict) and 'buttons' in post:
-                            self._process_buttons(pid, post['buttons'])
-                        self.global_posts[pid] = post
-                        loaded_posts += 1
-                    loaded_files += 1
+            stats = self._scan_stats()
         except Exception as e:
             logs.error(
                 f"Error loading all posts: {str(e)}",
                 log_type="STORAGE",
             )
+            return
 
+        owners = list(stats)
+        loaded_posts = self._install(((user_id, self._load_owner(user_id, stats[user_id])) for user_id in owners), stats)
         logs.info(
-            f"Loaded {loaded_posts} posts from {loaded_files} files",
+            f"Loaded {loaded_posts} posts from {len(owners)} files",
             log_type="STORAGE",
         )
 
-    def get_post(self, post_id: str) -> Optional[Dict[str, Any]]:
-        """Возвращает пост по идентификатору или None если не найден."""
-        return self.global_posts.get(post_id)
+    async def refresh(self, runner: TaskRunner = tasks) -> int:
+        """
+        Перечитывает только добавленные, изменённые и удалённые файлы постов.
+        Изменения определяются по mtime и размеру файла; неизменённые файлы не разбираются.
+        Одновременные вызовы ожидают одно и то же обновление.
 
-    def get_notification(self, callback_data: str) -> Optional[Dict[str, Any]]:
-        """Возвращает данные уведомления для указанного callback."""
+        :param runner: Исполнитель фоновых задач.
+        :return: Количество обновлённых владельцев.
+        """
+        task = self._refresh_task
+        if task is None or task.done():
+            task = self._refresh_task = ensure_future(self._refresh(runner))
+        return await shield(task)
+
+    async def _refresh(self, runner: TaskRunner) -> int:
+        """Выполняет обновление для ``refresh``."""
+        self._ensure_posts_dir()
+        try:
+            stats = self._scan_stats()
+        except Exception as e:
+            logs.error(
+                f"Error scanning posts directory: {str(e)}",
+                log_type="STORAGE",
+            )
+            return 0
+
+        first_load = not self._all_loaded
+        known = dict(self._file_stats)
+        changed = [user_id for user_id, file_stat in stats.items() if known.get(user_id) != file_stat]
+        removed = [user_id for user_id in known if user_id not in stats]
+
+        # Владельцы с неизменёнными с записи индекса файлами берутся из индекса, остальные разбираются
+        index = self._open_index()
+        chunks: List[List[Tuple[int, OwnerIndex]]] = [[]]
+        parsed = []
+        for user_id in changed:
+            owner = index.load(user_id, stats[user_id]) if index is not None else None
+            if owner is not None:
+                chunks[0].append((user_id, owner))
+            else:
+                parsed.append((user_id, self._get_user_posts_file(user_id)))
+        if parsed:
+            chunks += await runner.map(
+                read_posts_files, runner.split(parsed), size=len(parsed), threshold=Tasks.INLINE_FILES,
+            )
+
+        # Владельцы, записанные самим хранилищем за время чтения, уже актуальны в памяти
+        owners: Dict[int, Optional[OwnerIndex]] = {}
+        for user_id, owner in (pair for chunk in chunks for pair in chunk):
+            if self._file_stats.get(user_id) == known.get(user_id):
+                owners[user_id] = owner
+        for user_id in removed:
+            if self._file_stats.get(user_id) == known.get(user_id):
+                owners[user_id] = None
+        for user_id, owner in owners.items():
+            if owner is None:
+                self._loaded_owners.discard(user_id)
+            else:
+                self._loaded_owners.add(user_id)
+            self._set_file_stat(user_id, stats.get(user_id))
+        self._publish(owners)
+        self._all_loaded = True
+
+        updated = len(owners)
+        if updated:
+            logs.info(
+                f"Refreshed posts of {updated} owners ({len(parsed)} files parsed)",
+                log_type="STORAGE",
+            )
+        # После первой полной загрузки индекс обновляется, чтобы следующий запуск не разбирал те же файлы
+        if first_load and parsed:
+            self.write_index()
+        return updated
+
+    async def ensure_loaded(self, runner: TaskRunner = tasks) -> None:
+        """Загружает все посты, если они ещё не загружены; дальнейшие изменения подхватывает наблюдатель."""
+        if not self._all_loaded:
+            await self.refresh(runner)
+
+    def get_post(self, post_id: str) -> Optional[Post]:
+        """
+        Возвращает пост по идентификатору или None если не найден.
+        Тело поста берётся из кэша, а при промахе читается из файла владельца.
+        """
+        return self.get_posts((post_id,)).get(post_id)
+
+    def get_posts(self, post_ids: Iterable[str]) -> Dict[str, Post]:
+        """
+        Возвращает посты по идентификаторам; ненайденные пропускаются.
+        Тела берутся из кэша, а при промахах файл каждого владельца читается один раз.
+
+        :param post_ids: Идентификаторы постов.
+        :return: post_id → пост, в порядке идентификаторов.
+        """
+        snapshot = self._snapshot
+        found: Dict[str, Optional[Post]] = {}
+        missing: Dict[int, List[str]] = {}
+        for post_id in post_ids:
+            meta = snapshot.posts.get(post_id)
+            if meta is None:
+                continue
+            found[post_id] = post = self.bodies.get(post_id, meta.revision)
+            if post is None:
+                missing.setdefault(meta.user_id, []).append(post_id)
+
+        for user_id, owner_ids in missing.items():
+            posts = self.load_user_posts(user_id)
+            for post_id in owner_ids:
+                post = found[post_id] = posts.get(post_id)
+                if post is not None:
+                    self.bodies.put(post)
+        return {post_id: post for post_id, post in found.items() if post is not None}
+
+    def list_user_posts(self, user_id: int) -> List[PostMeta]:
+        """
+        Возвращает метаданные постов владельца в порядке их ключей, не читая тела постов.
+
+        :param user_id: ID владельца.
+        """
+        self.fault_in(user_id)
+        snapshot = self._snapshot
+        owner_keys = snapshot.keys.get(user_id, {})
+        return [snapshot.posts[owner_keys[key]] for key in sorted(owner_keys) if owner_keys[key] in snapshot.posts]
+
+    def metrics(self) -> Dict[str, float]:
+        """Возвращает показатели хранилища: число постов в памяти и показатели кэша тел постов."""
+        return {"posts": len(self._snapshot), "owners": len(self._snapshot.owners), **self.bodies.metrics()}
+
+    def search_posts(self, user_id: int, query: str = "",
+                     ranks: Optional[Mapping[str, float]] = None) -> List[PostMeta]:
+        """
+        Возвращает посты, доступные пользователю в инлайн-режиме. Перебираются только
+        метаданные; тела найденных постов читаются через ``get_post``.
+
+        :param user_id: ID пользователя, выполняющего поиск.
+        :param query: Подстрока идентификатора поста, без учёта регистра.
+        :param ranks: Вес постов для сортировки по убыванию; посты без веса идут в порядке хранилища.
+        :return: Метаданные публичных постов и приватных постов самого пользователя.
+        """
+        needle = query.lower()
+        found = [
+            post for post in self._snapshot
+            if (not post.private or post.user_id == user_id)
+            and (not needle or needle in post.post_id.lower())
+        ]
+        if ranks:
+            found.sort(key=lambda post: ranks.get(post.post_id, 0.0), reverse=True)
+        return found
+
+    def has_private_match(self, user_id: int, query: str = "") -> bool:
+        """
+        Проверяет, попадут ли в поиск пользователя его приватные посты.
+        Перебирает только посты самого пользователя.
+
+        :param user_id: ID пользователя, выполняющего поиск.
+        :param query: Подстрока идентификатора поста, без учёта регистра.
+        """
+        needle = query.lower()
+        for post in self._snapshot.owners.get(user_id, ()):
+            if post.private and (not needle or needle in post.post_id.lower()):
+                return True
+        return False
+
+    def resolve_key(self, user_id: int, key: int) -> Optional[str]:
+        """
+        Возвращает идентификатор поста владельца по его числовому ключу.
+
+        :param user_id: ID владельца.
+        :param key: Числовой ключ поста из callback_data.
+        :return: post_id или None, если пост не найден.
+        """
+        self.fault_in(user_id)
+        return self._snapshot.keys.get(user_id, {}).get(key)
+
+    def get_notification(self, callback_data: str) -> Optional[Notification]:
+        """
+        Возвращает данные уведомления для указанного callback.
+        При промахе подгружает только файл владельца, закодированного в callback_data.
+        Данные старого формата владельца не содержат: до поиска по ним все посты
+        загружаются через ``ensure_loaded``, чтобы не разбирать файлы в цикле событий.
+        """
+        notification = self.notifications.get(callback_data)
+        if notification is not None:
+            return notification
+
+        owner = alert_owner(callback_data)
+        if owner is None or not self.fault_in(owner):
+            return None
         return self.notifications.get(callback_data)
 
 
+def normalize_buttons(post: Post) -> None:
+    """
+    Назначает кнопкам-уведомлениям callback_data вида ``bt:<owner>:<key>:<row>:<col>``.
+    Данные старого формата (bt_/show_alert_) сохраняются: они уже разосланы в чатах.
+
+    :param post: Пост с назначенными владельцем и ключом.
+    """
+    for row_idx, col_idx, button in post.iter_buttons():
+        cb_data = button.callback_data
+        if cb_data is None and button.notification is None:
+            continue
+        if not cb_data or not cb_data.startswith(('bt_', 'show_alert_')):
+            button.callback_data = AlertCallback(
+                owner=post.user_id, key=post.key, row=row_idx, col=col_idx,
+            ).pack()
+
+
+def journal_path(file_path: str) -> str:
+    """Возвращает путь к журналу изменений файла постов: ``posts_<id>.log``."""
+    return path.splitext(file_path)[0] + '.log'
+
+
+def _merge_stat(a: Optional[Tuple[int, int]], b: Tuple[int, int]) -> Tuple[int, int]:
+    """Объединяет состояния файлов одного владельца: наибольшее mtime и суммарный размер."""
+    if a is None:
+        return b
+    return max(a[0], b[0]), a[1] + b[1]
+
+
+def _read_base(file_path: str, user_id: int) -> Dict[str, Post]:
+    """Читает основной файл постов; пустой словарь, если файл отсутствует или повреждён."""
+    try:
+        if path.isfile(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if not isinstance(raw, dict):
+                logs.warning(
+                    f"Invalid posts format in {file_path}",
+                    log_type="STORAGE",
+                )
+                return {}
+
+            posts: Dict[str, Post] = {}
+            for pid, data in raw.items():
+                try:
+                    posts[pid] = Post.from_dict(pid, data, user_id)
+                except ValueError as e:
+                    logs.warning(
+                        f"Skipped invalid post {pid} in {file_path}: {e}",
+                        log_type="STORAGE",
+                    )
+            return posts
+    except json.JSONDecodeError as e:
+        logs.error(
+            f"JSON decode error in {file_path}: {str(e)}",
+            log_type="STORAGE",
+        )
+    except Exception as e:
+        logs.error(
+            f"Error loading posts from {file_path}: {str(e)}",
+            log_type="STORAGE",
+        )
+    return {}
+
+
+def _replay_journal(file_path: str, user_id: int, posts: Dict[str, Post]) -> None:
+    """
+    Применяет к постам записи журнала изменений по порядку.
+    Повреждённые строки (например, недописанная при сбое последняя) пропускаются.
+    """
+    try:
+        if not path.isfile(file_path):
+            return
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except Exception as e:
+        logs.error(
+            f"Error loading journal {file_path}: {str(e)}",
+            log_type="STORAGE",
+        )
+        return
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if record.get("op") == "put":
+                data = record["post"]
+                post = Post.from_dict(data["post_id"], data, user_id)
+                posts[post.post_id] = post
+            elif record.get("op") == "delete":
+                posts.pop(record["post_id"], None)
+            else:
+                raise ValueError(f"unknown operation {record.get('op')!r}")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logs.warning(
+                f"Skipped invalid journal record {number} in {file_path}: {e}",
+                log_type="STORAGE",
+            )
+
+
+def read_posts_file(file_path: str, user_id: int) -> Dict[str, Post]:
+    """
+    Читает посты пользователя из файла и применяет журнал изменений. Некорректные записи пропускаются.
+    Постам старого формата без ключа ключи назначаются в порядке основного файла.
+    Не зависит от состояния хранилища, поэтому может выполняться в пуле процессов.
+
+    :param file_path: Путь к файлу постов.
+    :param user_id: Владелец постов.
+    :return: Посты по идентификаторам; пустой словарь, если файлов нет или они повреждены.
+    """
+    posts = _read_base(file_path, user_id)
+    # Ключи постам старого формата назначаются только по основному файлу, до журнала:
+    # иначе ключи из журнала сдвигали бы их, и уже разосланные callback_data перестали бы совпадать
+    PostStorage._assign_keys(posts.values())
+    _replay_journal(journal_path(file_path), user_id, posts)
+    PostStorage._assign_keys(posts.values())
+    for post in posts.values():
+        normalize_buttons(post)
+    return posts
+
+
+def read_posts_files(entries: List[Tuple[int, str]]) -> List[Tuple[int, OwnerIndex]]:
+    """
+    Читает порцию файлов постов для фонового обновления. Возвращаются только метаданные
+    и уведомления: тела постов хранилищу не нужны, и их не приходится передавать между процессами.
+
+    :param entries: Пары (владелец, путь к файлу).
+    :return: Пары (владелец, метаданные и уведомления его постов).
+    """
+    return [(user_id, OwnerIndex.of(read_posts_file(file_path, user_id))) for user_id, file_path in entries]
+
+
 # Инициализация хранилища при импорте модуля
 storage: PostStorage = PostStorage()
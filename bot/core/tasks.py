@@ -0,0 +1,138 @@
+from asyncio import gather, get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_all_start_methods, get_context
+from threading import enumerate as threads, main_thread
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+from configs.config import Tasks
+from bot.loggers import logs
+
+# Настройки экспорта
+__all__ = ("TaskRunner", "tasks", )
+
+T = TypeVar("T")
+
+
+def _has_threads() -> bool:
+    """Проверяет, есть ли в процессе потоки, кроме главного и потоков записи loguru."""
+    main = main_thread()
+    return any(thread is not main and not thread.name.startswith("loguru-") for thread in threads())
+
+
+def _ready() -> None:
+    """Пустая задача: первая отправка в пул с fork запускает все его процессы."""
+
+
+class TaskRunner:
+    """
+    Исполнитель CPU-ёмких задач, например разбора большого числа файлов постов.
+
+    Задачи выполняются в пуле процессов, чтобы не останавливать цикл событий.
+    Небольшие входы (размер меньше порога) и режим без пула выполняются на месте:
+    передача данных между процессами для них дороже самой работы.
+    Функции задач должны быть определены на уровне модуля, а аргументы и
+    результаты — сериализуемы pickle.
+
+    Процессы пула создаются через fork: spawn и forkserver заново импортируют ``main``,
+    а с ним весь бот. Fork безопасен, только пока в процессе нет других потоков
+    (их блокировки остались бы захваченными в дочерних процессах), поэтому бот
+    запускает пул через :meth:`start` до запуска цикла событий. Позже пул создаётся
+    лишь в однопоточном процессе (например, в замерах); иначе задачи выполняются на месте.
+    Потоки loguru (``enqueue=True``) допустимы: их блокировки loguru освобождает при fork.
+    """
+
+    def __init__(self, workers: int = Tasks.WORKERS) -> None:
+        """
+        :param workers: Количество процессов пула; 0 отключает пул.
+        """
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._warned = False
+
+    def _create(self) -> ProcessPoolExecutor:
+        """Создаёт пул и сразу запускает все его процессы."""
+        # fork не импортирует модули бота заново (и не создаёт их глобальные объекты)
+        context = get_context("fork") if "fork" in get_all_start_methods() else None
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        # С fork процессы запускаются при первой отправке, до потока управления пулом
+        pool.submit(_ready).result()
+        return pool
+
+    def start(self) -> None:
+        """
+        Запускает процессы пула. Вызывается при старте бота, до цикла событий
+        и до любых потоков, кроме потоков loguru.
+        """
+        if self.workers > 0 and self._pool is None:
+            self._pool = self._create()
+
+    def _executor(self) -> Optional[Executor]:
+        """Возвращает пул; создаёт его при первом обращении, только если процесс однопоточный."""
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            if _has_threads():
+                if not self._warned:
+                    self._warned = True
+                    logs.warning(
+                        "Process pool was not started before other threads, running tasks inline",
+                        log_type="TASKS",
+                    )
+                return None
+            self._pool = self._create()
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any, size: int = 0, threshold: int = 0) -> T:
+        """
+        Выполняет функцию в пуле или на месте.
+
+        :param func: Функция уровня модуля.
+        :param args: Аргументы функции.
+        :param size: Размер входа в единицах порога (например, файлы).
+        :param threshold: Входы меньше порога выполняются на месте.
+        :return: Результат функции.
+        """
+        executor = self._executor() if size >= threshold else None
+        if executor is None:
+            return func(*args)
+        try:
+            return await get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            logs.error(
+                f"Process pool is broken, running {func.__name__} inline",
+                log_type="TASKS",
+            )
+            self.shutdown()
+            return func(*args)
+
+    async def map(self, func: Callable[[Any], T], chunks: Iterable[Any], size: int = 0, threshold: int = 0) -> List[T]:
+        """
+        Выполняет функцию для каждой порции входа, в пуле — параллельно.
+
+        :param func: Функция уровня модуля от одной порции.
+        :param chunks: Порции входа.
+        :param size: Общий размер входа в единицах порога.
+        :param threshold: Входы меньше порога выполняются на месте.
+        :return: Результаты в порядке порций.
+        """
+        chunks = list(chunks)
+        if size < threshold or self.workers <= 0:
+            return [func(chunk) for chunk in chunks]
+        return list(await gather(*(self.run(func, chunk, size=size, threshold=threshold) for chunk in chunks)))
+
+    def split(self, items: List[T]) -> List[List[T]]:
+        """Делит вход на порции: по несколько на процесс, чтобы выровнять нагрузку."""
+        parts = max(1, self.workers * 4)
+        step = max(1, -(-len(items) // parts))
+        return [items[i:i + step] for i in range(0, len(items), step)]
+
+    def shutdown(self) -> None:
+        """Останавливает пул; следующий вызов создаст новый, если процесс однопоточный."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Исполнитель фоновых задач бота
+tasks: TaskRunner = TaskRunner()
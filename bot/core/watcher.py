@@ -0,0 +1,95 @@
+from asyncio import CancelledError, Task, create_task, sleep
+from os import path
+from typing import Optional
+
+from configs.config import Project
+from bot.loggers import logs
+from .storage import PostStorage, storage
+
+try:
+    from watchfiles import awatch
+except ImportError:  # необязательная зависимость: без неё используется опрос
+    awatch = None
+
+# Настройки экспорта
+__all__ = ("PostsWatcher", "watcher", )
+
+
+class PostsWatcher:
+    """
+    Фоновое отслеживание директории постов.
+
+    При изменении файлов хранилище перечитывает только изменённые файлы
+    (``PostStorage.refresh``). События файловой системы берутся из ``watchfiles``,
+    если пакет установлен, иначе раз в интервал сравниваются mtime и размеры файлов.
+    """
+
+    def __init__(self, posts: PostStorage = storage, interval: float = Project.WATCH_INTERVAL) -> None:
+        """
+        :param posts: Отслеживаемое хранилище.
+        :param interval: Интервал опроса в секундах (и задержка группировки событий watchfiles).
+        """
+        self.storage = posts
+        self.interval = interval
+        self._task: Optional[Task] = None
+
+    async def start(self) -> None:
+        """Запускает отслеживание; первый проход загружает все посты."""
+        if self._task is None or self._task.done():
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает отслеживание."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except CancelledError:
+            pass
+
+    async def _refresh(self) -> None:
+        """Обновляет хранилище; ошибки не останавливают отслеживание."""
+        try:
+            await self.storage.refresh()
+        except CancelledError:
+            raise
+        except Exception as e:
+            logs.error(
+                f"Error refreshing posts: {str(e)}",
+                log_type="STORAGE",
+            )
+
+    async def _run(self) -> None:
+        """Цикл отслеживания."""
+        await self._refresh()
+        if awatch is not None:
+            logs.info(
+                f"Watching {self.storage.posts_dir} for changes",
+                log_type="STORAGE",
+            )
+            async for changes in awatch(self.storage.posts_dir, debounce=int(self.interval * 1000)):
+                if any(_is_posts_file(changed) for _, changed in changes):
+                    await self._refresh()
+        else:
+            logs.info(
+                f"Polling {self.storage.posts_dir} every {self.interval} s",
+                log_type="STORAGE",
+            )
+            while True:
+                await sleep(self.interval)
+                await self._refresh()
+
+
+def _is_posts_file(file_path: str) -> bool:
+    """
+    Проверяет, что изменённый файл — файл или журнал постов. Скрытые файлы служебные
+    (счётчики популярности, файл индекса, временные файлы) и обновления не требуют.
+    """
+    name = path.basename(file_path)
+    return not name.startswith('.') and name.endswith((".json", ".log"))
+
+
+# Наблюдатель за директорией постов бота
+watcher: PostsWatcher = PostsWatcher()
@@ -1,17 +1,22 @@
 from typing import Optional
 
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import CallbackQuery
-from bot.core import storage
+from bot.core import storage, AlertCallback, alert_owner
+from bot.utils import CallbackRouter
 
-router: Router = Router(name="callback_router")
+router: CallbackRouter = CallbackRouter(name="callback_router")
 
-@router.callback_query(F.data.startswith("bt_"))
-@router.callback_query(F.data.startswith("show_alert_"))
+@router.callback_query(prefix=AlertCallback.__prefix__)
+@router.callback_query(F.data.startswith(("bt_", "show_alert_")))
 async def handle_button_alert(callback_query: CallbackQuery) -> None:
     key: Optional[str] = callback_query.data
     user_id: int = callback_query.from_user.id
 
+    # Данные старого формата не указывают владельца: посты загружаются целиком в пуле процессов
+    if alert_owner(key) is None:
+        await storage.ensure_loaded()
+
     # Получаем уведомление через хранилище
     notif = storage.get_notification(key)
     if not notif:
@@ -19,22 +24,18 @@ async def handle_button_alert(callback_query: CallbackQuery) -> None:
         return
 
     # Проверяем права доступа
-    allowed = notif.get("allowed_ids")
-    if allowed and user_id not in allowed:
-        msg = notif.get("unauthorized_message", "У вас нет доступа к этому уведомлению.")
+    if notif.allowed_ids and user_id not in notif.allowed_ids:
+        msg = notif.unauthorized_message or "У вас нет доступа к этому уведомлению."
         await callback_query.answer(text=msg, show_alert=True)
         return
 
-    text = notif.get("text", "")
-    show_alert = notif.get("show_alert", False)
-
     try:
-        await callback_query.answer(text=text, show_alert=show_alert)
+        await callback_query.answer(text=notif.text, show_alert=notif.show_alert)
     except Exception:
         await callback_query.answer(text="Произошла ошибка при отображении уведомления.", show_alert=True)
 
 
-@router.callback_query(F.data == "void")
+@router.callback_query(data="void")
 async def handle_void_callback(callback_query: CallbackQuery) -> None:
     """
     Обработка пустых callback-запросов (void).
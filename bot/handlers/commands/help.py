@@ -1,5 +1,3 @@
-from aiogram import Router, F
-from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery, KeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
@@ -7,18 +5,19 @@ from aiogram.utils.i18n import gettext as _
 
 from bot.templates import msg_photo
 from bot.utils.interesting_facts import interesting_fact
+from bot.utils.callback_router import CallbackRouter
+from bot.utils.command_matcher import CommandFilter
 from middleware.loggers import log
-from bot.bots import BotInfo
-from configs import COMMANDS, BotEdit
+from configs import BotEdit
 
 # Настройки экспорта и роутера
 __all__ = ("router",)
 CMD: str = "help".lower()
-router: Router = Router(name=f"{CMD}_cmd_router")
+router: CallbackRouter = CallbackRouter(name=f"{CMD}_cmd_router")
 
 
-@router.callback_query(F.data == CMD)
-@router.message(Command(*COMMANDS[CMD], prefix=BotInfo.prefix, ignore_case=True))
+@router.callback_query(data=CMD)
+@router.message(CommandFilter(CMD))
 @log(level='INFO', log_type=CMD.upper(), text=f"использовал команду /{CMD}")
 async def help_cmd(message: Message | CallbackQuery, state: FSMContext) -> None:
     """
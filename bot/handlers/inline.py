@@ -1,174 +1,126 @@
 # BotCode/handlers/inline.py
+from typing import List, Optional, Tuple
+
 from aiogram import Router
 from aiogram.types import (
-    InlineKeyboardButton,
-    InlineKeyboardMarkup,
+    ChosenInlineResult,
     InlineQuery,
     InputTextMessageContent,
     InlineQueryResultArticle,
-    SwitchInlineQueryChosenChat,
-    CopyTextButton,
 )
 from aiogram.utils.markdown import hide_link
 
-from bot.core import storage
+from bot.core import Post, PostMeta, popularity, sendability, storage
 from bot.loggers import logs
+from bot.utils import LRUCache, html_stats
+from configs.config import Inline
 
 router: Router = Router(name="inline_send")
 
+# Готовые страницы ответов по ключу
+# (запрос, владелец приватных результатов или None, ревизия постов, версия порядка популярности, смещение).
+# Ревизии меняются при изменении постов и порядка, поэтому устаревшие страницы просто перестают запрашиваться
+answers: LRUCache[Tuple[str, Optional[int], int, int, int], Tuple[List[InlineQueryResultArticle], str]] = \
+    LRUCache(Inline.CACHE_SIZE)
 
 
-def build_markup(buttons_def: list[list[dict]]) -> InlineKeyboardMarkup | None:
-    """
-    Создаёт InlineKeyboardMarkup из списка описаний кнопок.
-    Поддерживает URL, callback, inline-моды.
-    Обрабатывает "void"-кнопки как callback_data="void".
-    Для switch_inline_query_chosen_chat устанавливает хотя бы один allow_* True.
+def render_post(post: Post) -> InlineQueryResultArticle:
+    """Собирает результат инлайн-запроса для поста."""
+    # Тело сообщения
+    text = post.text
+    if post.image.startswith("http"):
+        text = f"{hide_link(post.image)}{text}"
+
+    # Описание показывается без разметки
+    plain = html_stats(post.text)[0]
+    return InlineQueryResultArticle(
+        id=post.post_id,
+        title=f"Пост {post.post_id}",
+        description=(plain[:100] + "...") if len(plain) > 100 else plain,
+        input_message_content=InputTextMessageContent(message_text=text),
+        reply_markup=post.markup()
+    )
+
+
+def render_page(posts: List[PostMeta], offset: int) -> Tuple[List[InlineQueryResultArticle], str]:
     """
-    if not buttons_def:
-        return None
+    Собирает страницу результатов: не больше ``Inline.PAGE_SIZE`` постов начиная со смещения.
+    Посты, нарушающие ограничения Bot API, пропускаются: иначе Telegram отклонил бы всю страницу.
 
-    rows: list[list[InlineKeyboardButton]] = []
-    for row_idx, row in enumerate(buttons_def):
-        if not isinstance(row, list):
-            logs.warning(f"Некорректный формат ряда кнопок: {row}")
+    :param posts: Метаданные всех найденных постов; тела читаются только для постов страницы.
+    :param offset: Смещение страницы.
+    :return: Результаты и смещение следующей страницы (пустое, если страниц больше нет).
+    """
+    results = []
+    bodies = storage.get_posts(meta.post_id for meta in posts[offset:offset + Inline.PAGE_SIZE])
+    for post in bodies.values():
+        check = sendability(post)
+        if not check.inline_ok:
+            logs.debug(f"Пост {post.post_id} пропущен: {'; '.join(check.errors + check.inline_errors)}")
             continue
-
-        kb_row: list[InlineKeyboardButton] = []
-        for col_idx, b in enumerate(row):
-            if not isinstance(b, dict):
-                logs.warning(f"Некорректный формат кнопки в ряду {row_idx}: {b}")
-                continue
-
-            text = b.get("text", "")
-            if not text:
-                logs.warning(f"Пустой текст кнопки в ряду {row_idx}, колонке {col_idx}")
-                continue
-
-            btn = None
-            try:
-                if "url" in b:
-                    url = b["url"]
-                    if url.lower().endswith("void"):
-                        btn = InlineKeyboardButton(text=text, callback_data="void")
-                    else:
-                        btn = InlineKeyboardButton(text=text, url=url)
-                elif "switch_inline_query" in b:
-                    btn = InlineKeyboardButton(
-                        text=text,
-                        switch_inline_query=b["switch_inline_query"]
-                    )
-                elif "switch_inline_query_current_chat" in b:
-                    btn = InlineKeyboardButton(
-                        text=text,
-                        switch_inline_query_current_chat=b["switch_inline_query_current_chat"]
-                    )
-                elif "switch_inline_query_chosen_chat" in b:
-                    query = b["switch_inline_query_chosen_chat"]
-                    if isinstance(query, dict):
-                        siqcc = SwitchInlineQueryChosenChat(
-                            query=query.get("query", ""),
-                            allow_user_chats=query.get("allow_user_chats", True),
-                            allow_group_chats=query.get("allow_group_chats", True),
-                            allow_channel_chats=query.get("allow_channel_chats", True),
-                            allow_bot_chats=query.get("allow_bot_chats", False),
-                        )
-                    else:
-                        siqcc = SwitchInlineQueryChosenChat(
-                            query=query,
-                            allow_user_chats=True,
-                            allow_group_chats=True,
-                            allow_channel_chats=True,
-                            allow_bot_chats=False,
-                        )
-                    btn = InlineKeyboardButton(
-                        text=text,
-                        switch_inline_query_chosen_chat=siqcc
-                    )
-                elif "copy_text" in b:
-                    btn = InlineKeyboardButton(
-                        text=text,
-                        copy_text=CopyTextButton(text=b["copy_text"])
-                    )
-                elif "callback_data" in b:
-                    btn = InlineKeyboardButton(
-                        text=text,
-                        callback_data=b["callback_data"]
-                    )
-            except Exception as e:
-                logs.error(f"Ошибка при создании кнопки в ряду {row_idx}, колонке {col_idx}: {e}")
-                continue
-
-            if btn:
-                kb_row.append(btn)
-
-        if kb_row:
-            rows.append(kb_row)
-
-    if not rows:
-        return None
-
-    return InlineKeyboardMarkup(inline_keyboard=rows)
+        try:
+            results.append(render_post(post))
+        except Exception as e:
+            logs.error(f"Ошибка при обработке поста {post.post_id}: {e}")
+            continue
+    next_offset = offset + Inline.PAGE_SIZE
+    return results, str(next_offset) if next_offset < len(posts) else ""
 
 
 @router.inline_query()
 async def inline_query_handler(inline_query: InlineQuery):
     """
     Обрабатывает инлайн-запросы для поиска и отправки постов.
-    Фильтрует посты по приватности и поисковому запросу.
+    Фильтрует посты по приватности и поисковому запросу, чаще используемые посты идут первыми.
+    Ответы кэшируются: только из публичных постов — общие для всех пользователей
+    (их кэширует и Telegram), с приватными постами — личные.
     """
-    # Перезагружаем все посты из файлов на случай изменений
-    storage.load_all_posts()
+    # Посты загружаются один раз; изменения файлов подхватывает наблюдатель за директорией
+    await storage.ensure_loaded()
 
-    query = inline_query.query or ""
+    query = (inline_query.query or "").strip()
     user_id = inline_query.from_user.id
     username = inline_query.from_user.username or f"user_{user_id}"
+    try:
+        offset = max(0, int(inline_query.offset or 0))
+    except ValueError:
+        offset = 0
 
     logs.debug(f"Получен инлайн-запрос от {username} (ID: {user_id}): {query}")
 
-    results = []
-    for post_id, post in storage.global_posts.items():
-        try:
-            # Проверка приватности
-            if post.get("private") and post.get("user_id") != user_id:
-                continue
-
-            # Проверка поискового запроса
-            if query and query.lower() not in post_id.lower():
-                continue
-
-            # Тело сообщения
-            text = post.get("text", "")
-            image = post.get("image", "")
-            if image and image.startswith("http"):
-                text = f"{hide_link(image)}{text}"
-
-            # Клавиатура
-            markup = build_markup(post.get("buttons", []))
-
-            results.append(
-                InlineQueryResultArticle(
-                    id=post_id,
-                    title=f"Пост {post_id}",
-                    description=(post.get("text", "")[:100] + "...") if len(post.get("text", "")) > 100 else post.get(
-                        "text", ""),
-                    input_message_content=InputTextMessageContent(message_text=text),
-                    reply_markup=markup
-                )
-            )
-        except Exception as e:
-            logs.error(f"Ошибка при обработке поста {post_id}: {e}")
-            continue
+    # Без собственных приватных постов пользователь видит то же, что и все остальные
+    personal = storage.has_private_match(user_id, query)
+    key = (query.lower(), user_id if personal else None, storage.snapshot.version, popularity.version, offset)
+    page = answers.get(key)
+    if page is None:
+        page = render_page(storage.search_posts(user_id, query, popularity.ranks), offset)
+        answers.put(key, page)
+    results, next_offset = page
 
     logs.info(f"Отправлено {len(results)} результатов для запроса '{query}' от {username} (ID: {user_id})")
 
     try:
-        await inline_query.answer(results, cache_time=0, is_personal=True)
+        await inline_query.answer(
+            results,
+            cache_time=0 if personal else Inline.CACHE_TIME,
+            is_personal=personal,
+            next_offset=next_offset,
+        )
     except Exception as e:
         logs.error(f"Ошибка при отправке результатов инлайн-запроса: {e}")
 
 
+@router.chosen_inline_result()
+async def chosen_inline_result_handler(chosen: ChosenInlineResult):
+    """
+    Засчитывает использование выбранного поста для порядка результатов.
+    Telegram присылает эти апдейты, только если для бота включена обратная связь (/setinlinefeedback).
+    """
+    popularity.record(chosen.result_id)
+
+
 __all__ = [
     'router',
-    'inline_query_handler'
+    'inline_query_handler',
+    'chosen_inline_result_handler',
 ]
@@ -1,9 +1,5 @@
 # bot/modules/create_post.py
-import re
-import uuid
-from threading import Lock
-
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import (
     Message, CallbackQuery,
     InlineKeyboardButton, InlineKeyboardMarkup
@@ -11,9 +7,10 @@ from aiogram.types import (
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 
-from bot.core import storage
+from bot.core import storage, check_text, Button, Post, PostIdTaken, PostLimitsExceeded, StorageError, MAX_RESULT_ID
+from bot.utils import parse_button_block, CallbackRouter, check_html, escape_html
 
-router: Router = Router(name="create_post_router")
+router: CallbackRouter = CallbackRouter(name="create_post_router")
 
 
 class PostState(StatesGroup):
@@ -26,9 +23,6 @@ class PostState(StatesGroup):
     editing_choice = State()
 
 
-post_id_lock: Lock = Lock()
-
-
 # --- Utility functions ---
 def make_inline_markup(rows: list[list[InlineKeyboardButton]]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -47,103 +41,11 @@ def privacy_markup(is_private: bool) -> InlineKeyboardMarkup:
     return make_inline_markup([[toggle], [cont]])
 
 
-def parse_buttons(text: str, post_id: str) -> list[list[dict]]:
-    """
-    Поддерживается синтаксис:
-      Текст | msg:Только для боссов | 123,456 | msg:Для всех остальных
-      Текст | ntf:Без алерта | 789 | msg:Нет доступа
-    """
-    rows: list[list[dict]] = []
-    button_index = 0
-
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-
-        # каждая строка может содержать несколько кнопок через ';'
-        btn_texts = [b.strip() for b in line.split(';') if b.strip()]
-        row: list[dict] = []
-
-        for raw in btn_texts:
-            parts = [p.strip() for p in raw.split('|')]
-            if len(parts) < 2:
-                raise ValueError(f"Неверный формат кнопки: '{raw}'")
-
-            btn = {"text": parts[0]}
-            primary_notification = None
-            primary_alert = False
-            allowed_ids = None
-            unauthorized_message = None
-
-            # обрабатываем параметры слева направо
-            for part in parts[1:]:
-                # URL / void
-                if part == "void":
-                    btn["url"] = "http://void"
-                elif part.startswith("http") or part.startswith("tg://"):
-                    btn["url"] = part
-
-                # первое уведомление (msg: — с алертом)
-                elif part.startswith("msg:") and primary_notification is None:
-                    primary_notification = part.split(":", 1)[1]
-                    primary_alert = True
-
-                # первое уведомление без алерта
-                elif part.startswith(("ntf:", "notification:")) and primary_notification is None:
-                    primary_notification = part.split(":", 1)[1]
-                    primary_alert = False
-
-                # список разрешённых ID
-                elif re.fullmatch(r'\d+(?:\s*,\s*\d+)*', part):
-                    allowed_ids = [int(x.strip()) for x in part.split(",")]
-
-                # второе сообщение — для неавторизованных
-                elif part.startswith("msg:") and primary_notification is not None and allowed_ids is not None:
-                    unauthorized_message = part.split(":", 1)[1]
-
-                # копирование текста
-                elif part.startswith("copy:"):
-                    btn["callback_data"] = f"copy_{uuid.uuid4().hex}"
-                    btn["copy_text"] = part.split(":", 1)[1]
-
-                # inline-параметры
-                elif part.startswith("inline:"):
-                    btn["switch_inline_query"] = part.split(":", 1)[1]
-                elif part.startswith("inline_current:"):
-                    btn["switch_inline_query_current_chat"] = part.split(":", 1)[1]
-                elif part.startswith("inline_chosen:"):
-                    btn["switch_inline_query_chosen_chat"] = part.split(":", 1)[1]
-
-                # произвольный callback_data (если ещё не задан)
-                else:
-                    if "callback_data" not in btn and "url" not in btn:
-                        btn["callback_data"] = part
-
-            # если было уведомление — добавляем поля
-            if primary_notification is not None:
-                btn["callback_data"] = f"bt_{post_id}_{button_index}"
-                button_index += 1
-                btn["notification"] = primary_notification
-                btn["show_alert"] = primary_alert
-
-            if allowed_ids is not None:
-                btn["allowed_ids"] = allowed_ids
-            if unauthorized_message is not None:
-                btn["unauthorized_message"] = unauthorized_message
-
-            # финализируем кнопку
-            row.append(btn)
-
-        if row:
-            rows.append(row)
-
-    return rows
-
-
 # --- Handlers ---
 @router.message(F.text == "Создать пост📔")
 async def start_creation(message: Message, state: FSMContext) -> None:
+    # Новый черновик заменяет брошенный: его ID освобождается
+    storage.release_id(message.from_user.id)
     await state.set_state(PostState.waiting_for_text)
     await state.update_data(private=False, buttons=[])
     await message.reply(
@@ -155,11 +57,21 @@ async def start_creation(message: Message, state: FSMContext) -> None:
 @router.message(PostState.waiting_for_text)
 async def got_text(message: Message, state: FSMContext) -> None:
     html_text = message.html_text or message.text or message.caption or ""
+    # Разметка проверяется заранее, чтобы пост не упал при отправке
+    errors = check_html(html_text) or check_text(html_text)[2]
+    if errors:
+        listed = "\n".join(f"• {e}" for e in errors)
+        await message.reply(
+            text=f"Разметка текста некорректна:\n{listed}\n\nИсправьте текст и отправьте его ещё раз.",
+            reply_markup=cancel_button(),
+            parse_mode=None
+        )
+        return
     await state.update_data(text=html_text)
     await show_preview(message, state)
 
 
-@router.callback_query(F.data == "toggle_privacy")
+@router.callback_query(data="toggle_privacy")
 async def toggle_privacy(cq: CallbackQuery, state: FSMContext) -> None:
     data = await state.get_data()
     is_priv = not data.get('private', False)
@@ -168,7 +80,7 @@ async def toggle_privacy(cq: CallbackQuery, state: FSMContext) -> None:
     await cq.answer()
 
 
-@router.callback_query(F.data == "continue_creation")
+@router.callback_query(data="continue_creation")
 async def continue_to_id(cq: CallbackQuery, state: FSMContext) -> None:
     await state.set_state(PostState.waiting_for_id)
     await cq.message.edit_text(
@@ -183,10 +95,15 @@ async def got_id(message: Message, state: FSMContext) -> None:
         await message.reply(text="ID должен содержать только латиницу, цифры и подчёркивания.",
                             reply_markup=cancel_button())
         return
-    with post_id_lock:
-        if not storage.is_post_available(pid):
-            await message.reply(text="Этот ID уже занят, введите другой:", reply_markup=cancel_button())
-            return
+    # ID поста становится ID результата инлайн-запроса, а его длина ограничена
+    if len(pid.encode()) > MAX_RESULT_ID:
+        await message.reply(text=f"ID должен быть не длиннее {MAX_RESULT_ID} символов.",
+                            reply_markup=cancel_button())
+        return
+    # ID закрепляется за черновиком до подтверждения, отмены или истечения брони
+    if not await storage.reserve_id(pid, message.from_user.id):
+        await message.reply(text="Этот ID уже занят, введите другой:", reply_markup=cancel_button())
+        return
 
     # Создаем клавиатуру с кнопкой "Без изображения"
     image_markup = InlineKeyboardMarkup(inline_keyboard=[
@@ -202,7 +119,7 @@ async def got_id(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data == "no_image", PostState.waiting_for_image)
+@router.callback_query(PostState.waiting_for_image, data="no_image")
 async def no_image_callback(cq: CallbackQuery, state: FSMContext):
     await state.update_data(image='')
     await state.set_state(PostState.waiting_for_buttons)
@@ -245,42 +162,47 @@ async def got_image(message: Message, state: FSMContext) -> None:
     await show_preview(message, state)
 
 
-@router.callback_query(PostState.waiting_for_buttons, F.data == "no_buttons")
+@router.message(PostState.waiting_for_buttons)
+async def got_buttons(message: Message, state: FSMContext) -> None:
+    # Сообщение не длиннее 4096 символов разбирается за доли миллисекунды: пул процессов здесь не нужен
+    result = parse_button_block(message.text or "")
+
+    # Сообщаем обо всех ошибках сразу, чтобы не исправлять их по одной
+    if result.errors:
+        errors = "\n".join(f"• {e}" for e in result.errors)
+        await message.reply(
+            text=f"Не удалось разобрать кнопки:\n{errors}\n\nИсправьте шаблон и отправьте кнопки ещё раз.",
+            reply_markup=cancel_button(),
+            parse_mode=None
+        )
+        return
+
+    await state.update_data(buttons=result.as_dicts())
+    await show_preview(message, state)
+
+
+@router.callback_query(PostState.waiting_for_buttons, data="no_buttons")
 async def no_buttons_handler(callback: CallbackQuery, state: FSMContext) -> None:
     await state.update_data(buttons=[])
     await show_preview(callback.message, state)
     await callback.answer()
 
 
-@router.callback_query(PostState.waiting_for_buttons, F.data == "finish_buttons")
+@router.callback_query(PostState.waiting_for_buttons, data="finish_buttons")
 async def finish_buttons_handler(callback: CallbackQuery, state: FSMContext) -> None:
     data = await state.get_data()
 
-    # Формируем финальные кнопки
-    final = []
-    for row in data.get('buttons', []):
-        final_row = []
-        for b in row:
-            btn = {"text": b["text"]}
-            if "url" in b:
-                btn["url"] = b["url"]
-            if "switch_inline_query" in b:
-                btn["switch_inline_query"] = b["switch_inline_query"]
-            if "callback_data" in b:
-                btn["callback_data"] = b["callback_data"]
-                if "notification" in b:
-                    btn["notification"] = b["notification"]
-                    btn["show_alert"] = b.get("show_alert", False)
-            final_row.append(btn)
-        final.append(final_row)
+    # Нормализуем кнопки через модель: лишние поля отбрасываются, типы проверяются один раз
+    final = [[Button.from_dict(b).to_dict() for b in row] for row in data.get('buttons', [])]
 
     await state.update_data(buttons=final)
     await show_preview(callback.message, state)
     await callback.answer()
 
 
-@router.callback_query(F.data == "cancel_creation")
+@router.callback_query(data="cancel_creation")
 async def cancel_handler(callback: CallbackQuery, state: FSMContext):
+    storage.release_id(callback.from_user.id)
     await state.clear()
     await callback.message.edit_text("❌ Создание поста отменено")
     await callback.answer()
@@ -301,14 +223,14 @@ async def show_preview(message: Message, state: FSMContext) -> None:
     preview_text += f"🔒 Приватность: {'Приватный' if private else 'Публичный'}\n"
 
     if image:
-        preview_text += f"🖼 Изображение: {image}\n"
+        preview_text += f"🖼 Изображение: {escape_html(image)}\n"
     else:
         preview_text += f"🖼 Изображение: отсутствует\n"
 
     if buttons:
         preview_text += "\n🔘 Кнопки:\n"
         for row in buttons:
-            preview_text += " | ".join([btn['text'] for btn in row]) + "\n"
+            preview_text += " | ".join([escape_html(btn['text']) for btn in row]) + "\n"
     else:
         preview_text += "\n🔘 Кнопки: отсутствуют\n"
 
@@ -327,7 +249,7 @@ async def show_preview(message: Message, state: FSMContext) -> None:
     await message.answer(preview_text, reply_markup=preview_markup, disable_web_page_preview=True)
 
 
-@router.callback_query(PostState.preview, F.data == "edit_post")
+@router.callback_query(PostState.preview, data="edit_post")
 async def edit_post_handler(cq: CallbackQuery, state: FSMContext) -> None:
     # Клавиатура выбора поля для редактирования
     edit_markup = InlineKeyboardMarkup(inline_keyboard=[
@@ -350,13 +272,13 @@ async def edit_post_handler(cq: CallbackQuery, state: FSMContext) -> None:
     await cq.answer()
 
 
-@router.callback_query(PostState.editing_choice, F.data == "back_to_preview")
+@router.callback_query(PostState.editing_choice, data="back_to_preview")
 async def back_to_preview(cq: CallbackQuery, state: FSMContext) -> None:
     await show_preview(cq.message, state)
     await cq.answer()
 
 
-@router.callback_query(PostState.editing_choice, F.data.startswith("edit_field:"))
+@router.callback_query(PostState.editing_choice, prefix="edit_field")
 async def handle_field_edit(cq: CallbackQuery, state: FSMContext) -> None:
     field = cq.data.split(":")[1]
 
@@ -401,19 +323,42 @@ async def handle_field_edit(cq: CallbackQuery, state: FSMContext) -> None:
     await cq.answer()
 
 
-@router.callback_query(PostState.preview, F.data == "confirm_post")
+@router.callback_query(PostState.preview, data="confirm_post")
 async def confirm_post_handler(cq: CallbackQuery, state: FSMContext) -> None:
     data = await state.get_data()
     post_id = data['post_id']
 
-    # Сохранение поста в хранилище
-    storage.save_post(post_id, {
+    # Сохранение поста в хранилище: записывается только сам пост
+    post = Post.from_dict(post_id, {
         'text': data['text'],
         'image': data.get('image', ''),
         'buttons': data.get('buttons', []),
         'private': data['private'],
-        'post_id': post_id
-    })
+    }, user_id=cq.from_user.id)
+    # После перезапуска или истечения брони проверка ID требует всех постов: они разбираются в пуле процессов
+    await storage.ensure_loaded()
+    reason = None
+    try:
+        storage.save_post(cq.from_user.id, post)
+    except PostLimitsExceeded as e:
+        # Пост не пройдёт ограничения Bot API: сообщаем причины вместо ошибки при отправке
+        errors = "\n".join(f"• {escape_html(error)}" for error in e.check.errors)
+        reason = f"пост превышает ограничения Telegram:\n{errors}\n\nИзмените пост и подтвердите ещё раз."
+    except PostIdTaken:
+        reason = "ID уже занят. Измените ID и подтвердите ещё раз."
+    except StorageError:
+        reason = "ошибка хранилища. Попробуйте подтвердить ещё раз позже."
+
+    if reason is not None:
+        await cq.message.edit_text(
+            f"❌ Не удалось сохранить пост: {reason}",
+            reply_markup=make_inline_markup([
+                [InlineKeyboardButton(text="Изменить", callback_data="edit_post")],
+                [InlineKeyboardButton(text="Отменить создание", callback_data="cancel_creation")],
+            ])
+        )
+        await cq.answer()
+        return
 
     await cq.message.edit_text(f"✅ Пост успешно создан с ID: <code>{post_id}</code>")
     await state.clear()
@@ -1,22 +1,23 @@
 from math import ceil
 from typing import Final
 
-from aiogram import Router, F
+from aiogram import F
 from aiogram.fsm.context import FSMContext
 from aiogram.types import (
     Message, CallbackQuery,
-    InlineKeyboardButton, InlineKeyboardMarkup,
-    SwitchInlineQueryChosenChat, CopyTextButton
+    InlineKeyboardButton, InlineKeyboardMarkup
 )
-from aiogram.exceptions import TelegramBadRequest
 from aiogram.utils.markdown import hide_link
 
-from bot.core import storage
-from bot.utils import pagination_btn
+from bot.core import storage, sendability, PostListCallback, ViewPostCallback, DeletePostCallback
+from bot.templates import transition
+from bot.utils import pagination_btn, CallbackRouter, escape_html
 
-router: Router = Router(name="posts_manager_router")
+router: CallbackRouter = CallbackRouter(name="posts_manager_router")
 
 PAGE_SIZE: Final[int] = 5
+# callback_data кнопок списка старого формата: они остаются в уже отправленных сообщениях
+LEGACY_PREFIXES: Final[tuple[str, ...]] = ("view_post_", "delete_post_", "open_post_list")
 
 async def send_posts_list(
     message: Message = None,
@@ -25,7 +26,8 @@ async def send_posts_list(
 ) -> None:
     """Отправляет список постов пользователя с пагинацией."""
     user_id = message.from_user.id if message else callback_query.from_user.id
-    posts = storage.load_user_posts(user_id)
+    # Для списка достаточно метаданных: тела постов не читаются
+    posts = storage.list_user_posts(user_id)
 
     if not posts:
         msg = "Нет сохранённых постов."
@@ -35,22 +37,19 @@ async def send_posts_list(
             await callback_query.answer(msg, show_alert=True)
         return
 
-    post_ids = list(posts.keys())
-    total = len(post_ids)
+    total = len(posts)
     pages = ceil(total / PAGE_SIZE)
     page = max(0, min(page, pages - 1))
 
     start = page * PAGE_SIZE
     end = start + PAGE_SIZE
-    current_ids = post_ids[start:end]
 
     rows: list[list[InlineKeyboardButton]] = []
-    for pid in current_ids:
-        post = posts[pid]
-        priv = "🔒" if post.get("private") else "🔓"
+    for post in posts[start:end]:
+        priv = "🔒" if post.private else "🔓"
         btn = InlineKeyboardButton(
-            text=f"{priv} Пост {pid}",
-            callback_data=f"view_post_{pid}"
+            text=f"{priv} Пост {post.post_id}",
+            callback_data=ViewPostCallback(key=post.key).pack()
         )
         rows.append([btn])
 
@@ -59,7 +58,8 @@ async def send_posts_list(
         action="open_post_list",
         page=page,
         total_posts=total,
-        bt_page=PAGE_SIZE
+        bt_page=PAGE_SIZE,
+        callback=lambda p: PostListCallback(page=p).pack()
     )
     if nav_buttons:
         rows.append(nav_buttons)
@@ -70,17 +70,10 @@ async def send_posts_list(
     keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
     header: str = "Список ваших постов:"
 
-    try:
-        if callback_query:
-            await callback_query.message.edit_text(header, reply_markup=keyboard)
-        else:
-            await message.answer(header, reply_markup=keyboard)
-    except TelegramBadRequest:
-        if callback_query:
-            await callback_query.message.delete()
-            await callback_query.message.answer(header, reply_markup=keyboard)
-        else:
-            await message.answer(header, reply_markup=keyboard)
+    if callback_query:
+        await transition(callback_query, header, keyboard)
+    else:
+        await message.answer(header, reply_markup=keyboard)
 
 # --- Хендлеры списка ---
 @router.message(F.text.lower() == "посмотреть список📋")
@@ -89,121 +82,86 @@ async def cmd_list(message: Message, state: FSMContext):
     await state.clear()
     await send_posts_list(message=message)
 
-@router.callback_query(F.data == "open_post_list")
-async def cb_open_list(cq: CallbackQuery, state: FSMContext):
+@router.callback_query(PostListCallback.filter())
+async def cb_paginate(cq: CallbackQuery, callback_data: PostListCallback, state: FSMContext):
     await state.clear()
-    await send_posts_list(callback_query=cq)
+    await send_posts_list(callback_query=cq, page=callback_data.page)
     await cq.answer()
 
-@router.callback_query(F.data.startswith("open_post_list_page_"))
-async def cb_paginate(cq: CallbackQuery, state: FSMContext):
-    try:
-        page = int(cq.data.rsplit("_", 1)[-1])
-    except ValueError:
-        await cq.answer("Некорректная страница", show_alert=True)
-        return
-    await state.clear()
-    await send_posts_list(callback_query=cq, page=page)
-    await cq.answer()
-
-@router.callback_query(F.data == "cancel_list")
+@router.callback_query(data="cancel_list")
 async def cb_cancel(cq: CallbackQuery):
     await cq.message.delete()
     await cq.answer()
 
-@router.callback_query(F.data.startswith("view_post_"))
-async def view_post_callback(cq: CallbackQuery):
+@router.callback_query(ViewPostCallback.filter())
+async def view_post_callback(cq: CallbackQuery, callback_data: ViewPostCallback):
     """Просмотр отдельного поста"""
-    pid = cq.data.replace("view_post_", "")
     uid = cq.from_user.id
-    posts = storage.load_user_posts(uid)
-    if pid not in posts:
+    pid = storage.resolve_key(uid, callback_data.key)
+    post = storage.get_post(pid) if pid is not None else None
+    if post is None:
         await cq.answer("Пост не найден", show_alert=True)
         return
 
-    post = posts[pid]
-    text = post.get("text", "")
-    img = post.get("image", "")
-    if img.startswith("http"):
-        text = f"{hide_link(img)}{text}"
-
-    rows: list[list[InlineKeyboardButton]] = []
-    for row in post.get("buttons", []):
-        btns: list[InlineKeyboardButton] = []
-        for b in row:
-            if "copy_text" in b:
-                btns.append(
-                    InlineKeyboardButton(
-                        text=b["text"],
-                        copy_text=CopyTextButton(text=b["copy_text"])
-                    )
-                )
-            elif "switch_inline_query" in b:
-                btns.append(
-                    InlineKeyboardButton(
-                        text=b["text"],
-                        switch_inline_query=b["switch_inline_query"]
-                    )
-                )
-            elif "switch_inline_query_current_chat" in b:
-                btns.append(
-                    InlineKeyboardButton(
-                        text=b["text"],
-                        switch_inline_query_current_chat=b["switch_inline_query_current_chat"]
-                    )
-                )
-            elif "switch_inline_query_chosen_chat" in b:
-                raw = b["switch_inline_query_chosen_chat"]
-                cfg = raw if isinstance(raw, dict) else {
-                    "query": raw,
-                    "allow_user_chats": True
-                }
-                btns.append(
-                    InlineKeyboardButton(
-                        text=b["text"],
-                        switch_inline_query_chosen_chat=SwitchInlineQueryChosenChat(**cfg)
-                    )
-                )
-            elif "url" in b:
-                url = b["url"]
-                if url.lower().endswith("void"):
-                    btns.append(
-                        InlineKeyboardButton(text=b["text"], callback_data="void")
-                    )
-                else:
-                    btns.append(
-                        InlineKeyboardButton(text=b["text"], url=url)
-                    )
-            elif "callback_data" in b:
-                btns.append(
-                    InlineKeyboardButton(text=b["text"], callback_data=b["callback_data"])
-                )
-        if btns:
-            rows.append(btns)
+    check = sendability(post)
+    if check.sendable:
+        text = post.text
+        if post.image.startswith("http"):
+            text = f"{hide_link(post.image)}{text}"
+        rows: list[list[InlineKeyboardButton]] = post.inline_rows()
+    else:
+        # Пост не пройдёт ограничения Bot API: вместо него показываются причины, чтобы его можно было удалить
+        errors = "\n".join(f"• {escape_html(e)}" for e in check.errors)
+        text = f"⚠️ Пост <code>{pid}</code> не может быть отправлен:\n{errors}"
+        rows = []
 
     # Удалить / назад
     rows.append([
-        InlineKeyboardButton(text="Удалить❌", callback_data=f"delete_post_{pid}"),
+        InlineKeyboardButton(text="Удалить❌", callback_data=DeletePostCallback(key=post.key).pack()),
         InlineKeyboardButton(text="Отправить↪️", switch_inline_query=f"{pid}")])
 
-    rows.append([InlineKeyboardButton(text="Назад◀️", callback_data="open_post_list")])
+    rows.append([InlineKeyboardButton(text="Назад◀️", callback_data=PostListCallback().pack())])
 
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
 
-    await cq.message.answer(text=text, reply_markup=keyboard)
-    await cq.message.delete()
+    await transition(cq, text, keyboard)
     await cq.answer()
 
 
-@router.callback_query(lambda c: c.data and c.data.startswith("delete_post_"))
-async def delete_post_callback(cq: CallbackQuery, state: FSMContext):
+@router.callback_query(DeletePostCallback.filter())
+async def delete_post_callback(cq: CallbackQuery, callback_data: DeletePostCallback, state: FSMContext):
     """Удаление поста."""
-    pid = cq.data.replace("delete_post_", "")
     uid = cq.from_user.id
-    if storage.delete_user_post(uid, pid):
+    pid = storage.resolve_key(uid, callback_data.key)
+    if pid is not None and storage.delete_user_post(uid, pid):
         await cq.answer(f"Пост {pid} удалён")
         await state.clear()
         await send_posts_list(callback_query=cq)
     else:
         await cq.answer(text="Не удалось удалить пост", show_alert=True)
+
+
+@router.callback_query(F.data.startswith(LEGACY_PREFIXES))
+async def legacy_list_callback(cq: CallbackQuery, state: FSMContext):
+    """
+    Кнопки списка старого формата (view_post_/delete_post_/open_post_list…).
+    Просмотр открывает пост, если он ещё принадлежит пользователю; остальные кнопки,
+    включая удаление по устаревшей кнопке, заново показывают список.
+    """
+    await state.clear()
+    uid = cq.from_user.id
+    data = cq.data
+    if data.startswith("view_post_"):
+        storage.fault_in(uid)
+        post = storage.global_posts.get(data[len("view_post_"):])
+        if post is not None and post.user_id == uid:
+            await view_post_callback(cq, ViewPostCallback(key=post.key))
+            return
+
+    page = 0
+    if data.startswith("open_post_list_page_"):
+        tail = data.rsplit("_", 1)[-1]
+        page = int(tail) if tail.isdigit() else 0
+    await send_posts_list(callback_query=cq, page=page)
+    await cq.answer()
@@ -1 +1,2 @@
 from .message_callback import *
+from .transition import *
@@ -0,0 +1,50 @@
+from asyncio import gather
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup
+
+# Настройка экспорта
+__all__ = ('transition',)
+
+
+async def transition(
+    callback_query: CallbackQuery,
+    text: str,
+    markup: Optional[InlineKeyboardMarkup] = None
+) -> None:
+    """
+    Переводит сообщение callback-запроса в новое состояние за минимум запросов.
+    Текстовое сообщение правится на месте: если текст не изменился — правится
+    только клавиатура. Сообщение с медиа или недоступное сообщение заменяется
+    новым, при этом отправка и удаление старого выполняются одновременно.
+    :param callback_query: Объект callback-запроса.
+    :param text: Новый текст сообщения.
+    :param markup: Новая инлайн-клавиатура.
+    """
+    message = callback_query.message
+
+    # Недоступное (слишком старое) сообщение нельзя ни править, ни удалить
+    if not isinstance(message, Message):
+        await callback_query.bot.send_message(chat_id=message.chat.id, text=text, reply_markup=markup)
+        return
+
+    if message.text is not None:
+        try:
+            if message.html_text == text:
+                await message.edit_reply_markup(reply_markup=markup)
+            else:
+                await message.edit_text(text=text, reply_markup=markup)
+            return
+        except TelegramBadRequest as e:
+            if "message is not modified" in e.message:
+                return
+
+    # Отправка нового и удаление старого независимы друг от друга
+    sent, deleted = await gather(
+        message.answer(text=text, reply_markup=markup),
+        message.delete(),
+        return_exceptions=True
+    )
+    if isinstance(sent, BaseException):
+        raise sent
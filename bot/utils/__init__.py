@@ -1,4 +1,9 @@
 from .interesting_facts import *
-from .md2_escape import *
+from .formatting import *
 from .usernames import *
 from .pagination import *
+from .button_parser import *
+from .callback_router import *
+from .lru import *
+from .persistent import *
+from .command_matcher import *
@@ -0,0 +1,184 @@
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Final, Optional
+
+from bot.core.models import Button, Notification
+
+# Настройка экспорта в модули
+__all__ = ('ButtonSyntaxError', 'ButtonParseResult', 'parse_button_block', 'parse_buttons')
+
+# Грамматика поля кнопки: ключевое слово перед ':' определяет вид поля.
+# Текст делится str.split, а не одним регулярным выражением по всему блоку: на CPython
+# разметка блока регулярным выражением медленнее, чем весь прежний разбор
+_KEYWORDS: Final[dict[str, str]] = {
+    "msg": "msg",
+    "ntf": "ntf",
+    "notification": "ntf",
+    "copy": "copy",
+    "inline": "inline",
+    "inline_current": "inline_current",
+    "inline_chosen": "inline_chosen",
+}
+_URL_PREFIXES: Final[tuple[str, ...]] = ("http", "tg://")
+_IDS: Final[re.Pattern] = re.compile(r"\d+(?:\s*,\s*\d+)*")
+_ID_SPLIT: Final[re.Pattern] = re.compile(r"\s*,\s*")
+
+
+class ButtonSyntaxError(ValueError):
+    """Ошибка синтаксиса кнопки с позицией в исходном тексте."""
+
+    def __init__(self, message: str, line: int, column: int, source: str = "") -> None:
+        """
+        :param message: Описание ошибки.
+        :param line: Номер строки (с единицы).
+        :param column: Номер колонки (с единицы).
+        :param source: Исходный текст кнопки.
+        """
+        super().__init__(f"Строка {line}, колонка {column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+        self.source = source
+
+    def __reduce__(self):
+        # Для передачи между процессами: стандартный pickle исключений передаёт только args
+        return type(self), (self.message, self.line, self.column, self.source)
+
+
+@dataclass(slots=True)
+class ButtonParseResult:
+    """Результат разбора блока кнопок: ряды кнопок и все найденные ошибки."""
+    rows: list[list[Button]] = field(default_factory=list)
+    errors: list[ButtonSyntaxError] = field(default_factory=list)
+
+    def as_dicts(self) -> list[list[dict[str, Any]]]:
+        """Возвращает ряды кнопок в формате хранилища постов."""
+        return [[btn.to_dict() for btn in row] for row in self.rows]
+
+
+def _build_button(parts: list[str]) -> Button:
+    """
+    Собирает кнопку из её полей.
+
+    :param parts: Поля кнопки, разделённые '|', первое — текст кнопки.
+    :return: Готовая кнопка. callback_data уведомления назначает хранилище при сохранении.
+    :raises ValueError: Если у кнопки пустой текст или нет действия.
+    """
+    text = parts[0].strip()
+    if not text:
+        raise ValueError("пустой текст кнопки")
+
+    btn = Button(text=text)
+    notification: Optional[str] = None
+    show_alert = False
+    allowed_ids: Optional[list[int]] = None
+    unauthorized_message: Optional[str] = None
+    has_action = False
+    for part in parts[1:]:
+        value = part.strip()
+        if not value:
+            continue
+        has_action = True
+
+        # вид поля: ключевое слово перед ':', затем void, ссылка, список ID
+        head, sep, arg = value.partition(":")
+        kind = _KEYWORDS.get(head) if sep else None
+        if kind is None:
+            arg = value
+            if value == "void":
+                kind = "void"
+            elif value.startswith(_URL_PREFIXES):
+                kind = "url"
+            elif value[0].isdigit() and _IDS.fullmatch(value):
+                kind = "ids"
+
+        if kind == "void":
+            btn.url = "http://void"
+        elif kind == "url":
+            btn.url = arg
+        elif kind == "msg":
+            # первое msg: — уведомление с алертом, второе — для неавторизованных
+            if notification is None:
+                notification, show_alert = arg, True
+            elif allowed_ids is not None:
+                unauthorized_message = arg
+        elif kind == "ntf":
+            if notification is None:
+                notification, show_alert = arg, False
+        elif kind == "ids":
+            allowed_ids = [int(x) for x in _ID_SPLIT.split(arg)]
+        elif kind == "copy":
+            btn.callback_data = f"copy_{uuid.uuid4().hex}"
+            btn.copy_text = arg
+        elif kind == "inline":
+            btn.switch_inline_query = arg
+        elif kind == "inline_current":
+            btn.switch_inline_query_current_chat = arg
+        elif kind == "inline_chosen":
+            btn.switch_inline_query_chosen_chat = arg
+        elif btn.callback_data is None and btn.url is None:
+            # произвольный callback_data (если ещё не задан)
+            btn.callback_data = arg
+
+    if not has_action:
+        raise ValueError(f"у кнопки '{text}' нет действия после '|'")
+    if notification is not None:
+        btn.callback_data = None
+        btn.notification = Notification(
+            text=notification,
+            show_alert=show_alert,
+            allowed_ids=frozenset(allowed_ids) if allowed_ids is not None else None,
+            unauthorized_message=unauthorized_message,
+        )
+    return btn
+
+
+def parse_button_block(text: str) -> ButtonParseResult:
+    """
+    Разбирает блок кнопок: строки, кнопки и поля делятся ``str.split``, а вид поля
+    определяется по таблице ключевых слов.
+    Кнопки с ошибками пропускаются, а ошибки собираются с позициями,
+    поэтому одна неверная кнопка не прерывает разбор остальных.
+
+    Поддерживается синтаксис:
+      Текст | msg:Только для боссов | 123,456 | msg:Для всех остальных
+      Текст | ntf:Без алерта | 789 | msg:Нет доступа
+      Кнопка1 | void ; Кнопка2 | https://example.com
+
+    :param text: Текст с описанием кнопок.
+    :return: Ряды кнопок и список ошибок.
+    """
+    result = ButtonParseResult()
+
+    for line_no, line in enumerate(text.splitlines(), 1):
+        row: list[Button] = []
+        column = 1
+        for raw in line.split(";"):
+            if raw and not raw.isspace():
+                # позиция — первый непробельный символ кнопки
+                start = column + len(raw) - len(raw.lstrip())
+                try:
+                    btn = _build_button(raw.split("|"))
+                except ValueError as e:
+                    result.errors.append(ButtonSyntaxError(str(e), line_no, start, raw.strip()))
+                else:
+                    row.append(btn)
+            column += len(raw) + 1
+        if row:
+            result.rows.append(row)
+    return result
+
+
+def parse_buttons(text: str) -> list[list[dict[str, Any]]]:
+    """
+    Разбирает блок кнопок в формат хранилища постов.
+
+    :param text: Текст с описанием кнопок.
+    :return: Ряды кнопок в виде словарей.
+    :raises ButtonSyntaxError: Первая найденная ошибка, если разбор неуспешен.
+    """
+    result = parse_button_block(text)
+    if result.errors:
+        raise result.errors[0]
+    return result.as_dicts()
@@ -0,0 +1,121 @@
+from heapq import merge
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import CallbackType, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters.callback_data import CallbackQueryFilter
+from aiogram.types import TelegramObject
+
+# Настройка экспорта в модули
+__all__ = ('CallbackRouter', 'CallbackPrefixObserver',)
+
+_Keys = Optional[Union[str, Sequence[str]]]
+# Обработчик с его порядковым номером регистрации
+_Ranked = Tuple[int, HandlerObject]
+
+
+def _as_tuple(value: _Keys) -> tuple[str, ...]:
+    """Приводит одно значение или набор значений к кортежу строк."""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+class CallbackPrefixObserver(TelegramEventObserver):
+    """
+    Наблюдатель callback-запросов с индексом по callback_data.
+
+    Обработчик, зарегистрированный с ``data=`` (точное совпадение) или ``prefix=``
+    (часть до первого ':'), а также с фильтром ``CallbackData.filter()``, попадает
+    в словарь и выбирается одним поиском; остальные фильтры обработчика проверяются
+    как обычно. Кандидаты из индекса и обработчики без ключа проверяются в порядке
+    регистрации, поэтому, как и в aiogram, срабатывает первый зарегистрированный.
+    """
+
+    def __init__(self, router: Router, event_name: str) -> None:
+        super().__init__(router=router, event_name=event_name)
+        self._exact: Dict[str, List[_Ranked]] = {}
+        self._prefixed: Dict[str, List[_Ranked]] = {}
+        self._scanned: List[_Ranked] = []
+
+    def register(
+        self,
+        callback: CallbackType,
+        *filters: CallbackType,
+        flags: Optional[Dict[str, Any]] = None,
+        data: _Keys = None,
+        prefix: _Keys = None,
+        **kwargs: Any,
+    ) -> CallbackType:
+        """
+        Регистрирует обработчик.
+
+        :param callback: Обработчик.
+        :param filters: Дополнительные фильтры.
+        :param flags: Флаги обработчика.
+        :param data: Значения callback_data для точного совпадения.
+        :param prefix: Префиксы callback_data (часть до первого ':').
+        :return: Переданный обработчик.
+        """
+        super().register(callback, *filters, flags=flags, **kwargs)
+        ranked = (len(self.handlers) - 1, self.handlers[-1])
+
+        exact = _as_tuple(data)
+        prefixes = _as_tuple(prefix) + tuple(
+            f.callback_data.__prefix__ for f in filters if isinstance(f, CallbackQueryFilter)
+        )
+        for key in exact:
+            self._exact.setdefault(key, []).append(ranked)
+        if not exact:
+            for key in prefixes:
+                self._prefixed.setdefault(key, []).append(ranked)
+        if not exact and not prefixes:
+            self._scanned.append(ranked)
+        return callback
+
+    async def _propagate(self, handlers: Iterable[_Ranked], event: TelegramObject, kwargs: Dict[str, Any]) -> Any:
+        """Проверяет обработчики по порядку и вызывает первый подходящий."""
+        for _, handler in handlers:
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        """Выбирает обработчики по callback_data и проверяет их вместе с неиндексированными в порядке регистрации."""
+        data = getattr(event, "data", None)
+        candidates = [self._scanned] if self._scanned else []
+        if data is not None:
+            for routed in (self._exact.get(data), self._prefixed.get(data.partition(":")[0])):
+                if routed:
+                    candidates.append(routed)
+        if not candidates:
+            return UNHANDLED
+        if len(candidates) == 1:
+            return await self._propagate(candidates[0], event, kwargs)
+        return await self._propagate(merge(*candidates), event, kwargs)
+
+
+class CallbackRouter(Router):
+    """Роутер, в котором callback-запросы распределяются по индексу callback_data."""
+
+    def __init__(self, *, name: Optional[str] = None) -> None:
+        """
+        :param name: Имя роутера.
+        """
+        super().__init__(name=name)
+        self.callback_query = CallbackPrefixObserver(router=self, event_name="callback_query")
+        self.observers["callback_query"] = self.callback_query
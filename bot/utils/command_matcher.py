@@ -0,0 +1,162 @@
+from typing import Any, Awaitable, Callable, Dict, Final, Iterable, Mapping, Optional
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.filters import CommandObject, Filter
+from aiogram.types import Message, TelegramObject
+
+from configs import COMMANDS, BotSettings
+
+# Настройка экспорта в модули
+__all__ = ('LAYOUTS', 'swap_layout', 'build_command_table', 'CommandMatcher', 'CommandMiddleware', 'CommandFilter',
+           'command_matcher')
+
+
+def _layout(source: str, target: str) -> Dict[int, str]:
+    """Таблица для ``str.translate``: символ клавиши в одной раскладке → символ той же клавиши в другой."""
+    return str.maketrans(source, target)
+
+
+# Клавиши в порядке QWERTY и символы тех же клавиш в русской и украинской раскладках
+_EN: Final[str] = "`qwertyuiop[]asdfghjkl;'zxcvbnm,."
+_RU: Final[str] = "ёйцукенгшщзхъфывапролджэячсмитьбю"
+_UA_EN: Final[str] = "qwertyuiop[]asdfghjkl;'zxcvbnm,.\\"
+_UA: Final[str] = "йцукенгшщзхїфівапролджєячсмитьбюґ"
+
+# Переводы между раскладками: текст, набранный не в той раскладке, → задуманный текст
+LAYOUTS: Final[Dict[str, Dict[int, str]]] = {
+    "en-ru": _layout(_EN, _RU),
+    "ru-en": _layout(_RU, _EN),
+    "en-ua": _layout(_UA_EN, _UA),
+    "ua-en": _layout(_UA, _UA_EN),
+}
+
+
+def swap_layout(text: str, layout: str) -> str:
+    """
+    Переводит текст, набранный в одной раскладке, в другую: «ыефке» → «start».
+
+    :param text: Текст.
+    :param layout: Ключ перевода из ``LAYOUTS``, например ``"ru-en"``.
+    :return: Текст в другой раскладке.
+    """
+    return text.translate(LAYOUTS[layout])
+
+
+def build_command_table(commands: Mapping[str, Iterable[str]],
+                        layouts: Iterable[str] = tuple(LAYOUTS)) -> Dict[str, str]:
+    """
+    Собирает таблицу «написание команды → команда».
+    Для каждого написания добавляются его варианты во всех раскладках; явно заданные
+    написания имеют приоритет над сгенерированными, а при совпадении побеждает первая команда.
+
+    :param commands: Команда → её написания (из ``configs.cmd_list.COMMANDS``).
+    :param layouts: Ключи переводов из ``LAYOUTS``.
+    :return: Написание в нижнем регистре → команда.
+    """
+    layouts = tuple(layouts)
+    table: Dict[str, str] = {}
+    for name, aliases in commands.items():
+        for alias in aliases:
+            table.setdefault(alias.casefold(), name)
+    for name, aliases in commands.items():
+        for alias in aliases:
+            alias = alias.casefold()
+            for layout in layouts:
+                table.setdefault(swap_layout(alias, layout), name)
+    return table
+
+
+class CommandMatcher:
+    """
+    Сопоставление сообщений с командами по заранее собранной таблице.
+
+    Префикс проверяется по множеству, команда находится одним поиском в словаре,
+    без перебора фильтров и списков написаний.
+    """
+    __slots__ = ("prefix", "table")
+
+    def __init__(self, commands: Mapping[str, Iterable[str]] = COMMANDS, prefix: str = BotSettings.PREFIX) -> None:
+        """
+        :param commands: Команда → её написания.
+        :param prefix: Допустимые символы префикса команды.
+        """
+        self.prefix: frozenset[str] = frozenset(prefix)
+        self.table: Dict[str, str] = build_command_table(commands)
+
+    def resolve(self, text: Optional[str]) -> Optional[tuple[str, CommandObject]]:
+        """
+        Определяет команду сообщения.
+
+        :param text: Текст сообщения.
+        :return: Имя команды и разобранная команда (как у ``aiogram.filters.Command``) или None.
+        """
+        if not text or text[0] not in self.prefix:
+            return None
+        full_command, *args = text.split(maxsplit=1)
+        command, _, mention = full_command[1:].partition("@")
+        name = self.table.get(command.casefold())
+        if name is None:
+            return None
+        return name, CommandObject(
+            prefix=full_command[0],
+            command=command,
+            mention=mention or None,
+            args=args[0] if args else None,
+        )
+
+
+# Таблица команд бота, собранная при запуске
+command_matcher: CommandMatcher = CommandMatcher()
+
+
+class CommandMiddleware(BaseMiddleware):
+    """
+    Outer-middleware для сообщений, определяющий команду один раз на сообщение.
+
+    Кладёт в данные обработчиков ``command_name`` (ключ ``COMMANDS``) и ``command: CommandObject``,
+    как ``aiogram.filters.Command``. Команды с упоминанием другого бота не определяются.
+    """
+
+    def __init__(self, matcher: CommandMatcher = command_matcher) -> None:
+        """
+        :param matcher: Таблица команд.
+        """
+        self.matcher = matcher
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Message):
+            resolved = self.matcher.resolve(event.text or event.caption)
+            if resolved is not None:
+                name, command = resolved
+                bot: Optional[Bot] = data.get("bot")
+                if command.mention and bot is not None:
+                    me = await bot.me()
+                    if me.username and command.mention.lower() != me.username.lower():
+                        resolved = None
+                if resolved is not None:
+                    data["command_name"] = name
+                    data["command"] = command
+        return await handler(event, data)
+
+
+class CommandFilter(Filter):
+    """
+    Фильтр команды с учётом всех её написаний и раскладок.
+    Сравнивает только имя команды, уже определённое ``CommandMiddleware``;
+    ``command: CommandObject`` обработчик получает из данных middleware.
+    """
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        """
+        :param name: Имя команды — ключ ``COMMANDS``.
+        """
+        self.name = name
+
+    async def __call__(self, message: Message, command_name: Optional[str] = None) -> bool:
+        return command_name == self.name
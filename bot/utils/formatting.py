@@ -0,0 +1,207 @@
+import re
+from html import unescape
+from typing import Callable, Dict, Final, List, Optional, Tuple
+
+from configs.config import BotSettings
+
+# Настройка экспорта в модули
+__all__ = ('escape_md2', 'escape_markdown', 'escape_html', 'escape_text', 'check_html', 'html_stats', 'HTML_TAGS')
+
+# Специальные символы MarkdownV2; обратная косая черта идёт первой, чтобы не экранировать добавленные
+_MD2_SPECIAL: Final[str] = "\\_*[]()~`>#+-=|{}.!"
+# Специальные символы устаревшего Markdown
+_MARKDOWN_SPECIAL: Final[str] = "\\_*`["
+
+
+def _escaper(special: str) -> Callable[[str], str]:
+    """
+    Собирает функцию экранирования заданных символов обратной косой чертой.
+
+    Цепочка ``str.replace`` с проверкой ``in`` обходит текст на C по разу на символ и
+    для текста без спецсимволов не создаёт новых строк; это быстрее и ``str.translate``
+    (медленный на кириллице), и ``re.sub`` с подстановкой на каждое совпадение.
+    """
+    pairs: Tuple[Tuple[str, str], ...] = tuple((c, "\\" + c) for c in special)
+
+    def escape(text: str) -> str:
+        for char, escaped in pairs:
+            if char in text:
+                text = text.replace(char, escaped)
+        return text
+
+    return escape
+
+
+escape_md2: Callable[[str], str] = _escaper(_MD2_SPECIAL)
+escape_md2.__doc__ = "Экранирует текст для parse_mode MarkdownV2."
+
+escape_markdown: Callable[[str], str] = _escaper(_MARKDOWN_SPECIAL)
+escape_markdown.__doc__ = "Экранирует текст для устаревшего parse_mode Markdown."
+
+
+def escape_html(text: str) -> str:
+    """Экранирует текст для parse_mode HTML: ``&``, ``<`` и ``>``."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+# parse_mode в нижнем регистре → функция экранирования
+_ESCAPERS: Final[Dict[str, Callable[[str], str]]] = {
+    "html": escape_html,
+    "markdownv2": escape_md2,
+    "markdown": escape_markdown,
+}
+
+
+def escape_text(text: str, parse_mode: Optional[str] = BotSettings.PARSE_MODE) -> str:
+    """
+    Экранирует текст для вставки в сообщение с заданной разметкой.
+
+    :param text: Текст.
+    :param parse_mode: Режим разметки ('HTML', 'MarkdownV2' или 'Markdown', регистр не важен);
+        None — без разметки, текст возвращается как есть.
+    :return: Экранированный текст.
+    :raises ValueError: Если parse_mode задан некорректно.
+    """
+    if parse_mode is None:
+        return text
+    escaper = _ESCAPERS.get(parse_mode.strip().lower())
+    if escaper is None:
+        raise ValueError(
+            f"Недопустимое значение parse_mode: '{parse_mode}'. Ожидалось 'HTML', 'MarkdownV2' или 'Markdown'"
+        )
+    return escaper(text)
+
+
+# Теги, которые Telegram принимает в parse_mode HTML
+HTML_TAGS: Final[frozenset[str]] = frozenset({
+    "b", "strong", "i", "em", "u", "ins", "s", "strike", "del",
+    "span", "tg-spoiler", "a", "tg-emoji", "code", "pre", "blockquote",
+})
+# Именованные сущности, которые понимает Telegram
+_ENTITIES: Final[frozenset[str]] = frozenset({"lt", "gt", "amp", "quot"})
+
+# Тег, сущность или одиночные '<' и '&', не входящие в них
+_TOKEN: Final[re.Pattern] = re.compile(
+    r"<(/?)([A-Za-z][\w-]*)([^<>]*)>"
+    r"|&(?:#(\d+|[xX][0-9A-Fa-f]+)|([A-Za-z]+));"
+    r"|[<&]"
+)
+# Атрибут тега: имя и необязательное значение в кавычках или без
+_ATTR: Final[re.Pattern] = re.compile(
+    r"\s*([A-Za-z][\w-]*)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+)))?\s*"
+)
+
+
+def _parse_attrs(raw: str) -> Optional[Dict[str, str]]:
+    """Разбирает атрибуты тега; None, если строка атрибутов некорректна."""
+    attrs: Dict[str, str] = {}
+    pos = 0
+    raw = raw.rstrip("/ \t\r\n")
+    while pos < len(raw):
+        match = _ATTR.match(raw, pos)
+        if match is None or match.end() == pos:
+            return None
+        name, dq, sq, bare = match.groups()
+        attrs[name.lower()] = dq if dq is not None else sq if sq is not None else bare or ""
+        pos = match.end()
+    return attrs
+
+
+def _check_open(name: str, attrs: Dict[str, str], parent: Optional[str], stack: List[str]) -> Optional[str]:
+    """
+    Проверяет открывающий тег; возвращает текст ошибки или None.
+    Неизвестные атрибуты Telegram игнорирует, поэтому проверяются только значимые.
+    """
+    if parent == "code" or (parent == "pre" and name != "code"):
+        return f"тег <{name}> не может находиться внутри <{parent}>"
+    if name == "blockquote" and "blockquote" in stack:
+        return "цитаты <blockquote> не могут быть вложенными"
+
+    if name == "a" and not attrs.get("href"):
+        return "у тега <a> не задан атрибут href"
+    if name == "tg-emoji" and not attrs.get("emoji-id"):
+        return "у тега <tg-emoji> не задан атрибут emoji-id"
+    if name == "span" and attrs.get("class") != "tg-spoiler":
+        return 'тег <span> поддерживается только с class="tg-spoiler"'
+    if name == "code" and "class" in attrs and (parent != "pre" or not attrs["class"].startswith("language-")):
+        return 'у <code> допустим только class="language-…" и только внутри <pre>'
+    return None
+
+
+def check_html(text: str, limit: int = 10) -> List[str]:
+    """
+    Проверяет HTML-разметку текста по правилам Telegram, не отправляя его.
+
+    Проверяются допустимые теги, значимые атрибуты, вложенность, парность тегов,
+    сущности и одиночные '<' и '&'. Текст без '<' и '&' проверяется за один поиск.
+
+    :param text: Текст в разметке HTML.
+    :param limit: Максимальное число возвращаемых ошибок.
+    :return: Список ошибок с позициями; пустой, если разметка корректна.
+    """
+    if "<" not in text and "&" not in text:
+        return []
+
+    errors: List[str] = []
+    stack: List[str] = []
+    for match in _TOKEN.finditer(text):
+        if len(errors) >= limit:
+            break
+        pos = match.start() + 1
+        closing, name, raw_attrs, number, entity = match.groups()
+
+        if name is not None:
+            name = name.lower()
+            if name not in HTML_TAGS:
+                errors.append(f"Позиция {pos}: неподдерживаемый тег <{name}>")
+            elif closing:
+                if not stack:
+                    errors.append(f"Позиция {pos}: лишний закрывающий тег </{name}>")
+                elif stack[-1] != name:
+                    errors.append(f"Позиция {pos}: закрывающий тег </{name}> вместо </{stack[-1]}>")
+                    if name in stack:
+                        del stack[len(stack) - 1 - stack[::-1].index(name):]
+                else:
+                    stack.pop()
+            else:
+                attrs = _parse_attrs(raw_attrs)
+                error = (f"некорректные атрибуты тега <{name}>" if attrs is None
+                         else _check_open(name, attrs, stack[-1] if stack else None, stack))
+                if error is not None:
+                    errors.append(f"Позиция {pos}: {error}")
+                stack.append(name)
+        elif entity is not None:
+            if entity not in _ENTITIES:
+                errors.append(f"Позиция {pos}: неизвестная сущность &{entity}; — замените '&' на &amp;")
+        elif number is None:
+            char = match.group()
+            escaped = "&lt;" if char == "<" else "&amp;"
+            errors.append(f"Позиция {pos}: символ '{char}' вне тега — замените его на {escaped}")
+
+    if stack and len(errors) < limit:
+        errors.append(f"Не закрыты теги: {', '.join(f'<{name}>' for name in reversed(stack))}")
+    return errors
+
+
+# Любой тег и открывающий тег
+_ANY_TAG: Final[re.Pattern] = re.compile(r"</?[A-Za-z][^<>]*>")
+_OPEN_TAG: Final[re.Pattern] = re.compile(r"<[A-Za-z]")
+
+
+def html_stats(text: str) -> Tuple[str, int]:
+    """
+    Возвращает текст без разметки, каким его увидит получатель, и число сущностей в нём.
+    Сущностью считается каждый открывающий тег; разметка считается корректной (см. ``check_html``).
+
+    :param text: Текст в разметке HTML.
+    :return: Текст без тегов с раскрытыми сущностями и число открывающих тегов.
+    """
+    if "<" not in text and "&" not in text:
+        return text, 0
+    return unescape(_ANY_TAG.sub("", text)), len(_OPEN_TAG.findall(text))
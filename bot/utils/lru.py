@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+# Настройка экспорта в модули
+__all__ = ('LRUCache',)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Кэш ограниченного размера: при переполнении вытесняется давно не использованная запись.
+
+    Методы не содержат ожиданий, поэтому безопасны для корутин одного цикла событий.
+    Размер 0 отключает кэш.
+    """
+    __slots__ = ("maxsize", "hits", "misses", "_data")
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        :param maxsize: Максимальное количество записей.
+        """
+        self.maxsize = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Возвращает значение по ключу и отмечает его как недавно использованное."""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Сохраняет значение, вытесняя самые старые записи сверх размера."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._data.clear()
@@ -1,3 +1,5 @@
+from typing import Callable, Optional
+
 from aiogram.types import InlineKeyboardButton
 
 # Настройка экспорта в модули
@@ -6,7 +8,8 @@ __all__ = ('pagination_btn',)
 def pagination_btn(action: str,
                    page: int = 0,
                    total_posts: int = 0,
-                   bt_page: int = 5) -> list[InlineKeyboardButton]:
+                   bt_page: int = 5,
+                   callback: Optional[Callable[[int], str]] = None) -> list[InlineKeyboardButton]:
     """
     Создает кнопки для пагинации.
 
@@ -14,15 +17,20 @@ def pagination_btn(action: str,
     :param page: Номер начальной страницы, по умолчанию 0.
     :param total_posts: Количество постов.
     :param bt_page: Количество кнопок на одной странице.
+    :param callback: Функция, собирающая callback_data по номеру страницы.
+                     По умолчанию используется формат ``{action}_page_{page}``.
     :return: Готовый лист списка инлайн-кнопок.
     """
+    if callback is None:
+        callback = lambda p: f"{action}_page_{p}"
+
     navigation_buttons: list[InlineKeyboardButton] = []
     if page > 0:
         navigation_buttons.append(InlineKeyboardButton(
-            text="←", callback_data=f"{action}_page_{page - 1}"
+            text="←", callback_data=callback(page - 1)
         ))
     if (page + 1) * bt_page < total_posts:
         navigation_buttons.append(InlineKeyboardButton(
-            text="→", callback_data=f"{action}_page_{page + 1}"
+            text="→", callback_data=callback(page + 1)
         ))
     return navigation_buttons
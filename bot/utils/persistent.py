@@ -0,0 +1,185 @@
+from collections.abc import ItemsView, KeysView, ValuesView
+from itertools import chain
+from typing import Any, Dict, Final, Generic, Hashable, Iterator, Mapping, Optional, Tuple, TypeVar, Union
+
+# Настройка экспорта в модули
+__all__ = ('PersistentMap',)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Ветвь дерева делит ключи по 5 битам хэша на 32 дочерних узла
+_BITS: Final[int] = 5
+_MASK: Final[int] = (1 << _BITS) - 1
+# Лист (обычный словарь) больше этого размера делится на ветвь. Крупные листья
+# ускоряют перебор (он идёт по словарям листьев на C), мелкие — копирование при записи
+_LEAF_SIZE: Final[int] = 128
+# Глубже хэш не делится: листы с совпадающими битами хэша просто растут
+_MAX_SHIFT: Final[int] = 60
+
+# Узел дерева: лист-словарь, ветвь из 32 дочерних узлов (None — пусто)
+_Node = Union[Dict[Any, Any], Tuple[Any, ...]]
+
+
+def _split(leaf: Dict[Any, Any], shift: int) -> _Node:
+    """Делит переполненный лист на ветвь по битам хэша начиная с ``shift``."""
+    children: list = [None] * (_MASK + 1)
+    for key, value in leaf.items():
+        index = hash(key) >> shift & _MASK
+        if children[index] is None:
+            children[index] = {}
+        children[index][key] = value
+    for index, child in enumerate(children):
+        if child is not None and len(child) > _LEAF_SIZE and shift + _BITS < _MAX_SHIFT:
+            children[index] = _split(child, shift + _BITS)
+    return tuple(children)
+
+
+def _assoc(node: Optional[_Node], key: Any, value: Any, h: int, shift: int) -> Tuple[_Node, bool]:
+    """Возвращает копию пути к ключу с новым значением и признак добавления ключа."""
+    if node is None:
+        return {key: value}, True
+    if type(node) is tuple:
+        index = h >> shift & _MASK
+        child, added = _assoc(node[index], key, value, h, shift + _BITS)
+        return node[:index] + (child,) + node[index + 1:], added
+    leaf = dict(node)
+    added = key not in leaf
+    leaf[key] = value
+    if len(leaf) > _LEAF_SIZE and shift < _MAX_SHIFT:
+        return _split(leaf, shift), added
+    return leaf, added
+
+
+def _dissoc(node: Optional[_Node], key: Any, h: int, shift: int) -> Optional[_Node]:
+    """Возвращает копию пути без ключа; пустые узлы заменяются на None."""
+    if type(node) is tuple:
+        index = h >> shift & _MASK
+        child = _dissoc(node[index], key, h, shift + _BITS)
+        node = node[:index] + (child,) + node[index + 1:]
+        return node if any(c is not None for c in node) else None
+    leaf = dict(node)
+    del leaf[key]
+    return leaf or None
+
+
+def _leaves(node: Optional[_Node]) -> Iterator[Dict[Any, Any]]:
+    """Перебирает листья дерева; обход идёт по стеку, без вложенных генераторов на каждый уровень."""
+    if type(node) is not tuple:
+        if node:
+            yield node
+        return
+    stack = [iter(node)]
+    while stack:
+        for child in stack[-1]:
+            if child is None:
+                continue
+            if type(child) is tuple:
+                stack.append(iter(child))
+                break
+            yield child
+        else:
+            stack.pop()
+
+
+class PersistentMap(Mapping[K, V], Generic[K, V]):
+    """
+    Неизменяемый словарь с дешёвым получением изменённой копии.
+
+    Ключи разложены по дереву из ветвей по 32 дочерних узла (по битам хэша ключа)
+    с небольшими словарями в листьях. ``set`` и ``delete`` копируют только путь
+    к ключу — несколько кортежей по 32 ссылки и один лист, — а остальные узлы
+    остаются общими с исходным словарём. Поэтому изменение одного ключа стоит
+    O(log N) независимо от размера словаря, а прежняя версия остаётся целой.
+    Поиск — несколько индексаций кортежа и поиск в словаре листа.
+    """
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, items: Optional[Mapping[K, V]] = None) -> None:
+        """
+        :param items: Начальное содержимое; строится за O(N) без копирования путей.
+        """
+        root: Dict[Any, Any] = dict(items) if items else {}
+        self._root: Optional[_Node] = (_split(root, 0) if len(root) > _LEAF_SIZE else root) or None
+        self._len: int = len(root)
+
+    @classmethod
+    def _of(cls, root: Optional[_Node], length: int) -> "PersistentMap[K, V]":
+        """Создаёт словарь по готовому дереву."""
+        new = cls.__new__(cls)
+        new._root = root
+        new._len = length
+        return new
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, key: K) -> V:
+        node = self._root
+        h = hash(key)
+        shift = 0
+        while type(node) is tuple:
+            node = node[h >> shift & _MASK]
+            shift += _BITS
+        if node is None:
+            raise KeyError(key)
+        return node[key]
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        node = self._root
+        h = hash(key)
+        shift = 0
+        while type(node) is tuple:
+            node = node[h >> shift & _MASK]
+            shift += _BITS
+        if node is None:
+            return default
+        return node.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[K]:
+        return chain.from_iterable(_leaves(self._root))
+
+    def keys(self) -> KeysView[K]:
+        return KeysView(self)
+
+    def values(self) -> ValuesView[V]:
+        return _Values(self)
+
+    def items(self) -> ItemsView[K, V]:
+        return _Items(self)
+
+    def set(self, key: K, value: V) -> "PersistentMap[K, V]":
+        """Возвращает копию словаря с заданным значением ключа."""
+        root, added = _assoc(self._root, key, value, hash(key), 0)
+        return self._of(root, self._len + added)
+
+    def delete(self, key: K) -> "PersistentMap[K, V]":
+        """Возвращает копию словаря без ключа; сам словарь, если ключа нет."""
+        if key not in self:
+            return self
+        return self._of(_dissoc(self._root, key, hash(key), 0), self._len - 1)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+_MISSING: Final[object] = object()
+
+
+class _Items(ItemsView):
+    """Пары словаря: листья перебираются целиком, без поиска каждого ключа."""
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        return chain.from_iterable(map(dict.items, _leaves(self._mapping._root)))
+
+
+class _Values(ValuesView):
+    """Значения словаря: листья перебираются целиком, без поиска каждого ключа."""
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(map(dict.values, _leaves(self._mapping._root)))
@@ -1,54 +1,56 @@
 from typing import Final
 
-# Список команд по ключу
+# Список команд по ключу.
+# Написания в другой раскладке клавиатуры («ыефке» для start) не перечисляются:
+# их генерирует bot.utils.command_matcher при запуске
 COMMANDS: Final[dict[str, list[str]]] = {
     "start": [
         "start", "старт", "почати",
-        "ыефке", "cnfhn", "on", "вкл", "щт", "drk"
+        "on", "вкл"
     ],
     "help": [
         "help", "помощь", "допомога",
-        "рудзщь", "dopomoga", "?"
+        "dopomoga", "?"
     ],
     "menu": [
         "menu", "меню", "менюшка",
-        "ьщкф", "menyu"
+        "menyu"
     ],
     "create": [
         "create", "создать", "створити",
-        "сщзду", "sozdat", "stvoriti"
+        "sozdat", "stvoriti"
     ],
     "report": [
         "report", "репорт", "скарга",
-        "кщзщтв", "repert"
+        "repert"
     ],
     "mute": [
         "mute", "заглушить", "заглушити",
-        "угуыщцук", "zaglushit"
+        "zaglushit"
     ],
     "kick": [
         "kick", "кик", "викинути",
-        "куиф", "vikynuty"
+        "vikynuty"
     ],
     "ban": [
         "ban", "бан", "забанити",
-        "ьфд", "zabanyty"
+        "zabanyty"
     ],
     "stats": [
         "stats", "статистика", "статистика",
-        "ыпщз", "statystyka"
+        "statystyka"
     ],
     "settings": [
         "settings", "настройки", "налаштування",
-        "гшеукефьз", "nastroyky"
+        "nastroyky"
     ],
     "info": [
         "info", "инфо", "інфо",
-        "шкещ", "info"
+        "info"
     ],
     "feedback": [
         "feedback", "обратная связь", "зворотній зв’язок",
-        "гуеекфьз", "obratnaia_svyaz"
+        "obratnaia_svyaz"
     ],
     "subscribe": [
         "subscribe", "подписаться", "підписатися",
@@ -60,18 +62,18 @@ COMMANDS: Final[dict[str, list[str]]] = {
     ],
     "language": [
         "language", "язык", "мова",
-        "йцукефь", "mova"
+        "mova"
     ],
     "cancel": [
         "cancel", "отмена", "скасувати",
-        "утпщге", "skasuvaty"
+        "skasuvaty"
     ],
     "list": [
         "list", "список", "список",
-        "дшззщк", "spysok"
+        "spysok"
     ],
     "forward": [
         "forward", "переслать", "переслати",
-        "дшпекщву", "pereslaty"
+        "pereslaty"
     ],
 }
@@ -107,6 +107,39 @@ class Settings(BaseSettings):
     EDIT_STORIES: bool = True
     DELETE_STORIES: bool = True
 
+    # Ограничение исходящих запросов
+    RATE_GLOBAL: float = 30.0
+    RATE_PRIVATE_CHAT: float = 1.0
+    RATE_GROUP_CHAT: float = 0.33
+    RATE_BURST: int = 3
+    RATE_MAX_RETRIES: int = 3
+    CALLBACK_DEDUP_WINDOW: float = 0.7
+
+    # Параллельная обработка апдейтов
+    UPDATES_CONCURRENCY: int = 64
+    UPDATES_USER_PENDING: int = 8
+
+    # Фоновые задачи в пуле процессов (0 процессов — выполнять в основном процессе)
+    TASKS_WORKERS: int = 2
+    TASKS_INLINE_FILES: int = 32
+
+    # Хранилище постов
+    POSTS_PRELOAD: bool = False
+    POSTS_WATCH: bool = True
+    POSTS_WATCH_INTERVAL: float = 2.0
+    POSTS_RESERVE_TTL: float = 900.0
+    POSTS_BODY_CACHE_MB: int = 32
+    POSTS_INDEX: bool = True
+
+    # Инлайн-режим
+    INLINE_CACHE_SIZE: int = 512
+    INLINE_CACHE_TIME: int = 30
+    INLINE_DEBOUNCE: float = 0.0
+
+    # Популярность постов по выбранным инлайн-результатам
+    POPULARITY_HALF_LIFE: float = 7 * 24 * 3600.0
+    POPULARITY_FLUSH_INTERVAL: float = 60.0
+
     # ================= ВАЛИДАТОРЫ =================
 
     @field_validator('PYTHONUNBUFFERED')
@@ -144,6 +177,48 @@ class Settings(BaseSettings):
             raise ValueError("ID не может быть отрицательным")
         return v
 
+    @field_validator('RATE_GLOBAL', 'RATE_PRIVATE_CHAT', 'RATE_GROUP_CHAT', 'RATE_BURST')
+    def validate_rates(cls, v: float) -> float:
+        """Проверка положительности лимитов запросов"""
+        if v <= 0:
+            raise ValueError("Лимит запросов должен быть больше нуля")
+        return v
+
+    @field_validator('UPDATES_CONCURRENCY', 'UPDATES_USER_PENDING')
+    def validate_concurrency(cls, v: int) -> int:
+        """Проверка положительности лимитов параллельной обработки"""
+        if v < 1:
+            raise ValueError("Лимит параллельной обработки должен быть не меньше 1")
+        return v
+
+    @field_validator('TASKS_WORKERS', 'TASKS_INLINE_FILES')
+    def validate_tasks(cls, v: int) -> int:
+        """Проверка неотрицательности настроек фоновых задач"""
+        if v < 0:
+            raise ValueError("Настройки фоновых задач не могут быть отрицательными")
+        return v
+
+    @field_validator('POSTS_WATCH_INTERVAL', 'POSTS_RESERVE_TTL', 'POPULARITY_HALF_LIFE', 'POPULARITY_FLUSH_INTERVAL')
+    def validate_posts_intervals(cls, v: float) -> float:
+        """Проверка положительности интервалов хранилища постов"""
+        if v <= 0:
+            raise ValueError("Интервалы хранилища постов должны быть больше нуля")
+        return v
+
+    @field_validator('POSTS_BODY_CACHE_MB')
+    def validate_posts_cache(cls, v: int) -> int:
+        """Проверка неотрицательности объёма кэша тел постов"""
+        if v < 0:
+            raise ValueError("Объём кэша тел постов не может быть отрицательным")
+        return v
+
+    @field_validator('INLINE_CACHE_SIZE', 'INLINE_CACHE_TIME', 'INLINE_DEBOUNCE')
+    def validate_inline(cls, v: float) -> float:
+        """Проверка неотрицательности настроек инлайн-режима"""
+        if v < 0:
+            raise ValueError("Настройки инлайн-режима не могут быть отрицательными")
+        return v
+
     @field_validator('WEBHOOK_URL')
     def validate_webhook_url(cls, v: str) -> str:
         """Базовая проверка URL вебхука"""
@@ -334,8 +409,52 @@ class RpValue:
     RP_OWNER: str = settings.RP_OWNER
 
 
+class RateLimit:
+    """Алиасы для ограничения исходящих запросов."""
+    GLOBAL: Final[float] = settings.RATE_GLOBAL
+    PRIVATE_CHAT: Final[float] = settings.RATE_PRIVATE_CHAT
+    GROUP_CHAT: Final[float] = settings.RATE_GROUP_CHAT
+    BURST: Final[int] = settings.RATE_BURST
+    MAX_RETRIES: Final[int] = settings.RATE_MAX_RETRIES
+    DEDUP_WINDOW: Final[float] = settings.CALLBACK_DEDUP_WINDOW
+
+
+class Updates:
+    """Алиасы для параллельной обработки входящих апдейтов."""
+    CONCURRENCY: Final[int] = settings.UPDATES_CONCURRENCY
+    USER_PENDING: Final[int] = settings.UPDATES_USER_PENDING
+
+
+class Tasks:
+    """Алиасы для выполнения тяжёлых задач в пуле процессов."""
+    WORKERS: Final[int] = settings.TASKS_WORKERS
+    INLINE_FILES: Final[int] = settings.TASKS_INLINE_FILES
+
+
+class Inline:
+    """Алиасы для ответов на инлайн-запросы."""
+    CACHE_SIZE: Final[int] = settings.INLINE_CACHE_SIZE
+    CACHE_TIME: Final[int] = settings.INLINE_CACHE_TIME
+    DEBOUNCE: Final[float] = settings.INLINE_DEBOUNCE
+    # Telegram принимает не больше 50 результатов в одном ответе
+    PAGE_SIZE: Final[int] = 50
+
+
 class Project:
     POSTS_DIR: ClassVar[Path] = Path('posts')
+    PRELOAD_POSTS: ClassVar[bool] = settings.POSTS_PRELOAD
+    WATCH_POSTS: ClassVar[bool] = settings.POSTS_WATCH
+    WATCH_INTERVAL: ClassVar[float] = settings.POSTS_WATCH_INTERVAL
+    RESERVE_TTL: ClassVar[float] = settings.POSTS_RESERVE_TTL
+    BODY_CACHE_BYTES: ClassVar[int] = settings.POSTS_BODY_CACHE_MB * 1024 * 1024
+    INDEX_POSTS: ClassVar[bool] = settings.POSTS_INDEX
+
+
+class Popularity:
+    """Алиасы для счётчиков популярности постов."""
+    HALF_LIFE: Final[float] = settings.POPULARITY_HALF_LIFE
+    FLUSH_INTERVAL: Final[float] = settings.POPULARITY_FLUSH_INTERVAL
+    FILE: Final[Path] = Project.POSTS_DIR / '.popularity.json'
 
 
 class Lists:
@@ -376,6 +495,11 @@ __all__ = (
     "BotEdit",
     "Project",
     "RpValue",
+    "RateLimit",
+    "Updates",
+    "Tasks",
+    "Inline",
+    "Popularity",
     'settings',
     'Lists',
 )
\ No newline at end of file
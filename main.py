@@ -3,7 +3,9 @@
 
 from asyncio import run
 from middleware.loggers import setup_logging
+from configs.config import Project, Updates
 from bot import *
+from bot.core import popularity, storage, tasks, watcher
 
 async def main() -> None:
     """Входная точка проекта. Запуск бота."""
@@ -16,10 +18,28 @@ async def main() -> None:
     # Подключение главного маршрутизатора
     dp.include_router(router)
 
-    # Включение опроса бота
-    await dp.start_polling(bot)
+    # Остановка пула фоновых задач вместе с ботом
+    dp.shutdown.register(tasks.shutdown)
+
+    # Счётчики популярности постов: загрузка при старте, периодическое сохранение и сохранение при остановке
+    dp.startup.register(popularity.start)
+    dp.shutdown.register(popularity.stop)
+
+    # Отслеживание изменений файлов постов в фоне
+    if Project.WATCH_POSTS:
+        dp.startup.register(watcher.start)
+        dp.shutdown.register(watcher.stop)
+
+    # Индекс метаданных постов сохраняется при остановке, чтобы следующий запуск не разбирал все файлы
+    dp.shutdown.register(storage.write_index)
+
+    # Включение опроса бота: апдейты обрабатываются задачами, не больше CONCURRENCY одновременно;
+    # при заполнении лимита опрос ждёт освобождения слота
+    await dp.start_polling(bot, handle_as_tasks=True, tasks_concurrency_limit=Updates.CONCURRENCY)
 
 
 # Вечная загрузка бота
 if __name__ == "__main__":
+    # Процессы пула создаются через fork до цикла событий, сессии бота и других потоков
+    tasks.start()
     run(main())
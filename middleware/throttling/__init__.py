@@ -0,0 +1,4 @@
+from .limiter import *
+from .dedup import *
+from .ordering import *
+from .supersede import *
@@ -0,0 +1,95 @@
+"""
+Подавление повторных нажатий на инлайн-кнопки.
+
+Повторный callback с теми же (пользователь, сообщение, данные), пришедший пока
+первый ещё обрабатывается или в течение короткого окна после него, сразу получает
+пустой ответ и не доходит до обработчиков.
+"""
+
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Final, Optional, Union
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from configs.config import RateLimit
+
+# Экспортируемые объекты
+__all__ = ('CallbackDedupMiddleware',)
+
+# Callback-данные, повтор которых не меняет результата. Данные старого формата
+# (view_post_/delete_post_/open_post_list) остаются в уже отправленных клавиатурах
+# и обрабатываются legacy_list_callback, пока он существует
+DEFAULT_PREFIXES: Final[tuple[str, ...]] = (
+    "pl:", "vp:", "dp:",
+    "view_post_", "delete_post_", "open_post_list",
+)
+
+# Порог, после которого из словаря вычищаются устаревшие ключи
+_PRUNE_THRESHOLD: Final[int] = 1_000
+
+_Key = tuple[int, Union[int, str], str]
+
+
+class CallbackDedupMiddleware(BaseMiddleware):
+    """
+    Outer-middleware для callback-запросов, схлопывающий быстрые повторы.
+
+    Пока ключ обрабатывается, его срок хранится как ``None``; после завершения
+    обработки — как момент окончания окна подавления.
+    """
+
+    def __init__(
+            self,
+            window: float = RateLimit.DEDUP_WINDOW,
+            prefixes: tuple[str, ...] = DEFAULT_PREFIXES,
+    ) -> None:
+        """
+        :param window: Длительность окна подавления после обработки, в секундах.
+        :param prefixes: Префиксы callback-данных, к которым применяется подавление.
+        """
+        self.window = window
+        self.prefixes = prefixes
+        self._seen: Dict[_Key, Optional[float]] = {}
+
+    @staticmethod
+    def _key(event: CallbackQuery) -> _Key:
+        """Собирает ключ нажатия: пользователь, сообщение и данные кнопки."""
+        message_id = event.message.message_id if event.message else event.inline_message_id
+        return event.from_user.id, message_id, event.data
+
+    def _is_duplicate(self, key: _Key, now: float) -> bool:
+        """Проверяет, обрабатывается ли ключ сейчас или не истекло ли его окно."""
+        if key not in self._seen:
+            return False
+        expires = self._seen[key]
+        return expires is None or expires > now
+
+    def _prune(self, now: float) -> None:
+        """Удаляет ключи с истёкшим окном."""
+        for key in [k for k, exp in self._seen.items() if exp is not None and exp <= now]:
+            del self._seen[key]
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: CallbackQuery,
+            data: Dict[str, Any],
+    ) -> Any:
+        if not event.data or not event.data.startswith(self.prefixes):
+            return await handler(event, data)
+
+        key = self._key(event)
+        now = monotonic()
+        if self._is_duplicate(key, now):
+            await event.answer()
+            return None
+
+        if len(self._seen) >= _PRUNE_THRESHOLD:
+            self._prune(now)
+
+        self._seen[key] = None
+        try:
+            return await handler(event, data)
+        finally:
+            self._seen[key] = monotonic() + self.window
@@ -0,0 +1,248 @@
+"""
+Планировщик исходящих запросов к Telegram Bot API.
+
+Особенности:
+* Корзины токенов на каждый чат и глобальная корзина на весь бот
+* Учёт ``retry_after`` из ответа 429: замораживается только корзина, через которую
+  прошёл запрос, — чата, интерактивных ответов или весь бот
+* Приоритет интерактивных ответов (``answerCallbackQuery``, ``answerInlineQuery``)
+  над правками и массовой отправкой сообщений
+"""
+
+from asyncio import CancelledError, Future, Task, get_running_loop, sleep, create_task
+from heapq import heappush, heappop
+from itertools import count
+from time import monotonic
+from typing import Final, Optional, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    Response, TelegramMethod,
+    AnswerCallbackQuery, AnswerInlineQuery,
+    EditMessageText, EditMessageReplyMarkup, EditMessageCaption, DeleteMessage,
+)
+from aiogram.methods.base import TelegramType
+
+from configs.config import RateLimit
+from middleware.loggers import loggers
+
+# Экспортируемые объекты
+__all__ = ('TokenBucket', 'SendScheduler',)
+
+# Приоритеты запросов: меньше — раньше
+PRIORITY_INTERACTIVE: Final[int] = 0
+PRIORITY_EDIT: Final[int] = 1
+PRIORITY_BULK: Final[int] = 2
+
+_INTERACTIVE_METHODS: Final[tuple[type, ...]] = (AnswerCallbackQuery, AnswerInlineQuery)
+_EDIT_METHODS: Final[tuple[type, ...]] = (
+    EditMessageText, EditMessageReplyMarkup, EditMessageCaption, DeleteMessage,
+)
+
+# Порог, после которого из словаря вычищаются простаивающие корзины чатов
+_CHAT_BUCKETS_PRUNE: Final[int] = 10_000
+
+
+class TokenBucket:
+    """
+    Корзина токенов с резервированием.
+
+    Токены могут уходить в минус: каждый вызов :meth:`reserve` занимает слот
+    и возвращает время ожидания до него, поэтому ожидающие обслуживаются по очереди.
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'frozen_until')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        :param rate: Скорость пополнения, токенов в секунду.
+        :param capacity: Максимальный запас токенов (размер всплеска).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.frozen_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Пополняет корзину за прошедшее время."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Возвращает время до появления свободного токена, не занимая его."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.frozen_until - now)
+
+    def consume(self, now: float) -> None:
+        """Забирает один токен."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def reserve(self, now: float) -> float:
+        """Занимает слот и возвращает время ожидания до него."""
+        wait = self.delay(now)
+        self.tokens -= 1
+        return wait
+
+    def refund(self) -> None:
+        """Возвращает слот, занятый :meth:`reserve`, если запрос так и не был отправлен."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def freeze(self, seconds: float) -> None:
+        """Запрещает выдачу токенов на ``seconds`` секунд."""
+        self.frozen_until = max(self.frozen_until, monotonic() + seconds)
+
+    def is_idle(self, now: float) -> bool:
+        """Проверяет, что корзина полна и не заморожена."""
+        self._refill(now)
+        return self.tokens >= self.capacity and self.frozen_until <= now
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Middleware сессии бота, пропускающий запросы через корзины токенов.
+
+    Запросы в один чат проходят через корзину этого чата в порядке поступления,
+    затем встают в общую очередь с приоритетом. Общая очередь выдаёт глобальные
+    токены сначала интерактивным ответам, затем правкам, затем остальным отправкам.
+    """
+
+    def __init__(
+            self,
+            global_rate: float = RateLimit.GLOBAL,
+            private_rate: float = RateLimit.PRIVATE_CHAT,
+            group_rate: float = RateLimit.GROUP_CHAT,
+            burst: int = RateLimit.BURST,
+            max_retries: int = RateLimit.MAX_RETRIES,
+    ) -> None:
+        """
+        :param global_rate: Лимит запросов в секунду на весь бот.
+        :param private_rate: Лимит сообщений в секунду в личный чат.
+        :param group_rate: Лимит сообщений в секунду в группу или канал.
+        :param burst: Допустимый всплеск запросов в один чат.
+        :param max_retries: Количество повторов после ответа 429.
+        """
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+
+        self._global: TokenBucket = TokenBucket(global_rate, global_rate)
+        # Интерактивные ответы не привязаны к чату; своя корзина нужна, чтобы 429 на них
+        # не замораживал массовую отправку
+        self._interactive: TokenBucket = TokenBucket(global_rate, global_rate)
+        self._chats: dict[Union[int, str], TokenBucket] = {}
+        self._queue: list[tuple[int, int, Future]] = []
+        self._seq = count()
+        self._pump: Optional[Task] = None
+
+    @staticmethod
+    def _priority(method: TelegramMethod) -> int:
+        """Определяет приоритет запроса по типу метода."""
+        if isinstance(method, _INTERACTIVE_METHODS):
+            return PRIORITY_INTERACTIVE
+        if isinstance(method, _EDIT_METHODS):
+            return PRIORITY_EDIT
+        return PRIORITY_BULK
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        """Возвращает корзину чата, создавая её при необходимости."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= _CHAT_BUCKETS_PRUNE:
+                now = monotonic()
+                for key in [k for k, b in self._chats.items() if b.is_idle(now)]:
+                    del self._chats[key]
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(self.group_rate if is_group else self.private_rate, self.burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _acquire(self, bucket: Optional[TokenBucket], priority: int) -> None:
+        """Дожидается токена корзины запроса и глобального токена с учётом приоритета."""
+        if bucket is None:
+            await self._acquire_global(priority)
+            return
+
+        wait = bucket.reserve(monotonic())
+        try:
+            if wait > 0:
+                await sleep(wait)
+            await self._acquire_global(priority)
+        except CancelledError:
+            # Запрос не отправлен: слот возвращается, иначе следующие отправки в чат сдвинутся
+            bucket.refund()
+            raise
+
+    async def _acquire_global(self, priority: int) -> None:
+        """Дожидается глобального токена с учётом приоритета."""
+        # Быстрый путь: очередь пуста и глобальный токен есть
+        now = monotonic()
+        if not self._queue and self._global.delay(now) <= 0:
+            self._global.consume(now)
+            return
+
+        waiter: Future = get_running_loop().create_future()
+        heappush(self._queue, (priority, next(self._seq), waiter))
+        if self._pump is None or self._pump.done():
+            self._pump = create_task(self._run_pump())
+        await waiter
+
+    async def _run_pump(self) -> None:
+        """Выдаёт глобальные токены ожидающим в порядке приоритета."""
+        while self._queue:
+            wait = self._global.delay(monotonic())
+            if wait > 0:
+                # После сна голова очереди могла смениться более приоритетным запросом
+                await sleep(wait)
+                continue
+
+            _, _, waiter = heappop(self._queue)
+            if waiter.done():
+                continue
+            self._global.consume(monotonic())
+            waiter.set_result(None)
+
+    def _bucket(self, method: TelegramMethod, priority: int) -> Optional[TokenBucket]:
+        """Возвращает корзину запроса: интерактивных ответов, чата или None для запросов вне чата."""
+        if priority == PRIORITY_INTERACTIVE:
+            return self._interactive
+        chat_id = getattr(method, 'chat_id', None)
+        return None if chat_id is None else self._chat_bucket(chat_id)
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """
+        Пропускает запрос через планировщик и повторяет его после ``retry_after``.
+
+        :param make_request: Следующий обработчик в цепочке сессии.
+        :param bot: Бот, выполняющий запрос.
+        :param method: Метод Telegram Bot API.
+        :return: Ответ Telegram.
+        """
+        priority = self._priority(method)
+        # Интерактивные ответы не являются сообщениями в чат и не расходуют его лимит
+        bucket = self._bucket(method, priority)
+
+        attempt = 0
+        while True:
+            await self._acquire(bucket, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                (bucket or self._global).freeze(e.retry_after)
+                loggers.warning(
+                    f"Flood control на {type(method).__name__} (чат {getattr(method, 'chat_id', None)}): "
+                    f"повтор {attempt}/{self.max_retries} через {e.retry_after} с",
+                    log_type='THROTTLE',
+                )
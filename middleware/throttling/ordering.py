@@ -0,0 +1,88 @@
+"""
+Порядок обработки апдейтов одного пользователя.
+
+При параллельной обработке (``handle_as_tasks``) апдейты разных пользователей
+выполняются одновременно, а сообщения и нажатия одного пользователя — строго
+по очереди, чтобы переходы FSM не перемешивались. Очередь пользователя ограничена:
+лишние апдейты отбрасываются, и один пользователь не занимает все слоты обработки.
+"""
+
+from asyncio import Lock
+from typing import Any, Awaitable, Callable, Dict, Final
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User
+
+from configs.config import Updates
+from middleware.loggers import loggers
+
+# Экспортируемые объекты
+__all__ = ('UserOrderingMiddleware',)
+
+# Типы апдейтов, которые обрабатываются по очереди; инлайн-запросы не упорядочиваются
+ORDERED_UPDATES: Final[frozenset[str]] = frozenset({"message", "edited_message", "callback_query"})
+
+
+class _Lane:
+    """Очередь апдейтов одного пользователя."""
+    __slots__ = ("lock", "pending")
+
+    def __init__(self) -> None:
+        self.lock: Lock = Lock()
+        self.pending: int = 0
+
+
+class UserOrderingMiddleware(BaseMiddleware):
+    """
+    Outer-middleware для апдейтов, сериализующий обработку в пределах пользователя.
+
+    Должен стоять после ``UserContextMiddleware`` диспетчера, чтобы в данных уже был
+    ``event_from_user``, но до ``FSMContextMiddleware``: состояние FSM читается только
+    после того, как подошла очередь апдейта. ``asyncio.Lock`` пробуждает ожидающих
+    в порядке прихода, поэтому апдейты пользователя выполняются в порядке получения.
+    """
+
+    def __init__(
+            self,
+            max_pending: int = Updates.USER_PENDING,
+            ordered: frozenset[str] = ORDERED_UPDATES,
+    ) -> None:
+        """
+        :param max_pending: Максимум апдейтов пользователя в обработке и ожидании.
+        :param ordered: Типы апдейтов, для которых соблюдается порядок.
+        """
+        self.max_pending = max_pending
+        self.ordered = ordered
+        self._lanes: Dict[int, _Lane] = {}
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: Dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        if user is None or event.event_type not in self.ordered:
+            return await handler(event, data)
+
+        lane = self._lanes.get(user.id)
+        if lane is None:
+            lane = self._lanes[user.id] = _Lane()
+
+        if lane.pending >= self.max_pending:
+            loggers.warning(
+                f"Очередь пользователя {user.id} переполнена ({lane.pending}), апдейт {event.update_id} отброшен",
+                log_type='THROTTLE',
+            )
+            if event.callback_query is not None:
+                await event.callback_query.answer()
+            return None
+
+        lane.pending += 1
+        try:
+            async with lane.lock:
+                return await handler(event, data)
+        finally:
+            lane.pending -= 1
+            if not lane.pending:
+                self._lanes.pop(user.id, None)
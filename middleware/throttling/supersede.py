@@ -0,0 +1,75 @@
+"""
+Отмена устаревших инлайн-запросов.
+
+Telegram присылает новый инлайн-запрос почти на каждое нажатие клавиши, а показан
+будет только ответ на последний. Когда от пользователя приходит новый запрос,
+обработка предыдущего отменяется; необязательная задержка (debounce) даёт
+пользователю допечатать, прежде чем запрос начнёт обрабатываться.
+"""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import InlineQuery, TelegramObject
+
+from configs.config import Inline
+from middleware.loggers import loggers
+
+# Экспортируемые объекты
+__all__ = ('InlineSupersedeMiddleware',)
+
+
+class InlineSupersedeMiddleware(BaseMiddleware):
+    """
+    Outer-middleware для инлайн-запросов: у пользователя выполняется только последний запрос.
+
+    Обработчик запускается отдельной задачей, поэтому отмена затрагивает только его,
+    а не задачу обработки апдейта. Отменённый запрос остаётся без ответа — Telegram
+    всё равно показывает только ответ на последний запрос.
+    """
+
+    def __init__(self, debounce: float = Inline.DEBOUNCE) -> None:
+        """
+        :param debounce: Задержка перед обработкой запроса в секундах; 0 отключает задержку.
+        """
+        self.debounce = debounce
+        self._running: Dict[int, Task] = {}
+
+    async def _run(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: InlineQuery,
+            data: Dict[str, Any],
+    ) -> Any:
+        if self.debounce > 0:
+            await sleep(self.debounce)
+        return await handler(event, data)
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: InlineQuery,
+            data: Dict[str, Any],
+    ) -> Any:
+        user_id = event.from_user.id
+        previous = self._running.get(user_id)
+        if previous is not None:
+            previous.cancel()
+
+        task = create_task(self._run(handler, event, data))
+        self._running[user_id] = task
+        try:
+            return await task
+        except CancelledError:
+            # Запрос вытеснен более новым; иначе отменена сама обработка апдейта
+            if self._running.get(user_id) is task:
+                raise
+            loggers.debug(
+                f"Инлайн-запрос {event.id} пользователя {user_id} вытеснен более новым",
+                log_type='THROTTLE',
+            )
+            return None
+        finally:
+            if self._running.get(user_id) is task:
+                del self._running[user_id]